@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Send path benchmark
+Starts a local stand-in for the Apps Script Web App (doPost/doGet, bulk
+requests, idempotency keys, the 302 to the content host) in a separate
+process and drives the headless send path against it:
+
+    python gcal_bench.py --events 2000 --workers 1,4,8 --chunk-sizes 1,25 -o bench.json
+
+Results (latency percentiles per request, events/s, CPU and memory) are
+written as JSON so runs can be compared between releases.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from gcal_events import parse_datetime
+from gcal_metrics import percentile
+from gcal_sender import RetryPolicy, TokenBucket, WebAppSession, send_events
+from gcal_store import Outbox
+
+BENCH_FORMAT_VERSION = 2
+DEFAULT_EVENTS = 1000
+DEFAULT_WORKER_LEVELS = '1,4,8'
+DEFAULT_CHUNK_SIZES = '1,25'
+SERVER_START_TIMEOUT = 10
+
+
+class MockWebAppHandler(BaseHTTPRequestHandler):
+    """Mimics doPost/doGet of google-apps-script.gs, with injected latency and failures."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK (~40 ms per response)
+    disable_nagle_algorithm = True
+    options = {}
+    events = {}  # eventId -> stored event
+    events_by_key = {}
+    redirects = {}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b'{}')
+        if isinstance(data.get('gzip'), str):
+            data = json.loads(gzip.decompress(base64.b64decode(data['gzip'])))
+        events = data['events'] if isinstance(data.get('events'), list) else None
+        count = len(events) if events is not None else 1
+        time.sleep(self.options['latency'] + self.options['event_latency'] * count)
+
+        roll = random.random()
+        if roll < self.options['throttle_rate']:
+            self.send_text(429, "Rate limit exceeded", {'Retry-After': str(self.options['retry_after'])})
+            return
+        if roll < self.options['throttle_rate'] + self.options['error_rate']:
+            self.send_text(500, "Internal error")
+            return
+
+        if events is not None:
+            payload = {'status': 'ok', 'results': [self.create_or_find(item) for item in events]}
+            if data.get('response') == 'minimal':
+                payload = {'status': 'ok', 'ids': [
+                    [idx, result['eventId']] if result['status'] == 'ok' else [idx, None, result['message']]
+                    for idx, result in enumerate(payload['results'])
+                ]}
+        else:
+            payload = self.create_or_find(data)
+        body = json.dumps(payload).encode('utf-8')
+
+        if self.options['redirect']:
+            # Apps Script answers with a 302 to script.googleusercontent.com
+            token = uuid.uuid4().hex
+            with self.lock:
+                self.redirects[token] = body
+            self.send_response(302)
+            self.send_header('Location', f"/echo?token={token}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_json(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/echo':
+            token = parse_qs(url.query).get('token', [''])[0]
+            with self.lock:
+                body = self.redirects.pop(token, None)
+            if body is None:
+                self.send_text(404, "Not found")
+            else:
+                self.send_json(body)
+            return
+        params = parse_qs(url.query)
+        if 'capabilities' in params:
+            self.send_json(json.dumps({'status': 'ok', 'capabilities': ['gzip', 'minimal']}).encode('utf-8'))
+            return
+        if 'start' in params and 'end' in params:
+            # Range query: events overlapping [start, end)
+            start = parse_datetime(params['start'][0])
+            end = parse_datetime(params['end'][0])
+            calendar = params.get('calendarId', ['primary'])[0]
+            with self.lock:
+                found = [
+                    dict(event, eventId=event_id) for event_id, event in self.events.items()
+                    if event['calendarId'] == calendar
+                    and parse_datetime(event['start']) < end and parse_datetime(event['end']) > start
+                ]
+            self.send_json(json.dumps({'status': 'ok', 'events': found}).encode('utf-8'))
+            return
+        self.send_text(200, "OK")
+
+    def create_or_find(self, data):
+        """Return the doPost result for one event, honouring idempotencyKey and action."""
+        if not isinstance(data, dict):
+            return {'status': 'error', 'message': 'Invalid event'}
+        action = data.get('action')
+        if action in ('update', 'delete'):
+            return self.update_or_delete(data)
+        if not data.get('title'):
+            return {'status': 'error', 'message': 'Invalid event'}
+        key = data.get('idempotencyKey')
+        stored = {field: data.get(field) or '' for field in ('title', 'start', 'end', 'description', 'location')}
+        stored['idempotencyKey'] = key
+        stored['calendarId'] = data.get('calendarId') or 'primary'
+        with self.lock:
+            if key and key in self.events_by_key:
+                return {'status': 'ok', 'eventId': self.events_by_key[key], 'duplicate': True}
+            event_id = f"{uuid.uuid4().hex}@google.com"
+            self.events[event_id] = stored
+            if key:
+                self.events_by_key[key] = event_id
+        return {'status': 'ok', 'eventId': event_id}
+
+    def update_or_delete(self, data):
+        """Apply a partial update or a delete to the stored event with data['eventId']."""
+        event_id = data.get('eventId')
+        with self.lock:
+            stored = self.events.get(event_id)
+            if data['action'] == 'delete':
+                if stored is None:
+                    return {'status': 'ok', 'eventId': event_id, 'deleted': False}
+                del self.events[event_id]
+                self.events_by_key.pop(stored.get('idempotencyKey'), None)
+                return {'status': 'ok', 'eventId': event_id, 'deleted': True}
+            if stored is None:
+                return {'status': 'error', 'message': f"Event not found: {event_id}"}
+            if data.get('title'):
+                stored['title'] = data['title']
+            if data.get('start') and data.get('end'):
+                stored['start'], stored['end'] = data['start'], data['end']
+            for field in ('description', 'location'):
+                if field in data:
+                    stored[field] = data[field] or ''
+        return {'status': 'ok', 'eventId': event_id, 'updated': True}
+
+    def send_json(self, body):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, status, text, headers=None):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(options, ready):
+    """Run the mock Web App until the process is terminated (child process entry point)."""
+    MockWebAppHandler.options = options
+    random.seed(options['seed'])
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockWebAppHandler)
+    server.daemon_threads = True
+    ready.put(server.server_port)
+    server.serve_forever()
+
+
+class MockWebApp:
+    """Mock Web App running in its own process, so it does not skew CPU figures."""
+
+    def __init__(self, options):
+        self.options = options
+        self.process = None
+        self.url = None
+
+    def __enter__(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=serve, args=(self.options, ready), daemon=True)
+        self.process.start()
+        port = ready.get(timeout=SERVER_START_TIMEOUT)
+        self.url = f"http://127.0.0.1:{port}/exec"
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+
+class TimedSession(WebAppSession):
+    """WebAppSession that records the latency of every POST (redirect included)."""
+
+    def __init__(self, pool_size):
+        super().__init__(pool_size=pool_size)
+        self.latencies = []
+        self.latency_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'POST':
+            return super().request(method, url, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().request(method, url, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.latency_lock:
+                self.latencies.append(elapsed)
+
+
+def latency_summary(latencies):
+    """Return p50/p95/p99/max/mean in milliseconds."""
+    values = sorted(latencies)
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None, 'mean': None}
+    return {
+        'p50': percentile(values, 50) * 1000,
+        'p95': percentile(values, 95) * 1000,
+        'p99': percentile(values, 99) * 1000,
+        'max': values[-1] * 1000,
+        'mean': sum(values) / len(values) * 1000,
+    }
+
+
+def max_rss_mb():
+    """Return the peak resident memory of this process in MB (None where unsupported).
+
+    The peak only grows, so it covers every run so far, not the last one.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def make_events(count, run_id):
+    """Yield count distinct events (unique per run, so no idempotent hits)."""
+    for i in range(count):
+        day = 1 + i % 28
+        hour = 8 + i % 10
+        yield {
+            'title': f"Bench {run_id} #{i}",
+            'start': f"2030-01-{day:02d}T{hour:02d}:00:00Z",
+            'end': f"2030-01-{day:02d}T{hour:02d}:30:00Z",
+            'description': "Benchmark event",
+            'location': "Room 1",
+        }
+
+
+def run_case(url, events, workers, chunk_size, max_attempts, base_delay, outbox, compress=False, minimal=False):
+    """Send one batch and return its measurements."""
+    session = TimedSession(pool_size=workers)
+    run_id = uuid.uuid4().hex[:8]
+    batch_id = outbox.create_batch(url, f"bench {run_id}") if outbox is not None else None
+    cpu_before = time.process_time()
+    try:
+        _, stats = send_events(
+            url,
+            make_events(events, run_id),
+            workers=workers,
+            chunk_size=chunk_size,
+            session=session,
+            retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=base_delay),
+            rate_limiter=TokenBucket(0),
+            keep_results=False,
+            outbox=outbox,
+            batch_id=batch_id,
+            compress=compress,
+            minimal_responses=minimal
+        )
+    finally:
+        session.close()
+    cpu = time.process_time() - cpu_before
+    return {
+        'workers': stats['workers'],
+        'chunk_size': stats['chunk_size'],
+        'events': stats['total'],
+        'failed': stats['failed'],
+        'retried': stats['retried'],
+        'requests': len(session.latencies),
+        'elapsed': stats['elapsed'],
+        'events_per_sec': stats['events_per_sec'],
+        'latency_ms': latency_summary(session.latencies),
+        'cpu_seconds': cpu,
+        'cpu_percent': cpu / stats['elapsed'] * 100 if stats['elapsed'] > 0 else 0.0,
+        'connections': stats['connection']['connections'],
+        'request_bytes': stats['request_bytes'],
+        'response_bytes': stats['response_bytes'],
+    }
+
+
+def parse_levels(value):
+    """Parse a comma separated list of positive integers."""
+    try:
+        levels = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma separated integers, got {value!r}")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"expected positive integers, got {value!r}")
+    return levels
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='gcal_bench.py',
+        description='Benchmark the send path against a local mock Apps Script Web App.'
+    )
+    parser.add_argument('--events', type=int, default=DEFAULT_EVENTS, help='events per run')
+    parser.add_argument('--workers', type=parse_levels, default=parse_levels(DEFAULT_WORKER_LEVELS),
+                        help='comma separated worker counts')
+    parser.add_argument('--chunk-sizes', type=parse_levels, default=parse_levels(DEFAULT_CHUNK_SIZES),
+                        help='comma separated events per request')
+    parser.add_argument('--latency', type=float, default=0.05, help='server seconds per request')
+    parser.add_argument('--event-latency', type=float, default=0.005, help='server seconds per event')
+    parser.add_argument('--no-redirect', dest='redirect', action='store_false',
+                        help='answer directly instead of the Apps Script 302')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=float, default=0.1, help='Retry-After sent with 429s')
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--base-delay', type=float, default=0.05, help='client backoff base delay')
+    parser.add_argument('--no-outbox', dest='outbox', action='store_false',
+                        help='do not journal sends (the headless command always does)')
+    parser.add_argument('--compress', action='store_true', help='gzip request bodies of bulk requests')
+    parser.add_argument('--minimal', action='store_true', help='ask for minimal bulk responses')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', default='-', help="JSON report file ('-' = stdout)")
+    parser.add_argument('-v', '--verbose', action='store_true', help='log failed requests to stderr')
+    return parser
+
+
+def main(argv=None):
+    """Run every workers x chunk size combination and write the JSON report."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(stream=sys.stderr, level=logging.ERROR if args.verbose else logging.CRITICAL)
+    options = {
+        'latency': args.latency,
+        'event_latency': args.event_latency,
+        'redirect': args.redirect,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'retry_after': args.retry_after,
+        'seed': args.seed,
+    }
+    report = {
+        'version': BENCH_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'events': args.events,
+        'server': options,
+        'client': {
+            'max_attempts': args.max_attempts,
+            'base_delay': args.base_delay,
+            'outbox': args.outbox,
+            'compress': args.compress,
+            'minimal': args.minimal,
+        },
+        'runs': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir, MockWebApp(options) as server:
+        outbox = Outbox(os.path.join(workdir, 'bench_outbox.db')) if args.outbox else None
+        try:
+            for chunk_size in args.chunk_sizes:
+                for workers in args.workers:
+                    run = run_case(server.url, args.events, workers, chunk_size,
+                                   args.max_attempts, args.base_delay, outbox, args.compress, args.minimal)
+                    report['runs'].append(run)
+                    latency = run['latency_ms']
+                    print(
+                        f"workers={workers} chunk={chunk_size}: {run['events_per_sec']:.1f} events/s, "
+                        f"p50 {latency['p50'] or 0:.1f} ms, p99 {latency['p99'] or 0:.1f} ms, "
+                        f"{run['request_bytes'] / 1024:.0f} KiB sent, {run['response_bytes'] / 1024:.0f} KiB received, "
+                        f"{run['failed']} failed",
+                        file=sys.stderr
+                    )
+        finally:
+            if outbox is not None:
+                outbox.close()
+    # Process-wide (the mock server runs apart): the largest footprint of any run
+    report['peak_rss_mb'] = max_rss_mb()
+
+    text = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Headless command line
+Sends events without the graphical interface (cron, batch hosts):
+
+    python gcal_cli.py send events.json more.jsonl > results.jsonl
+    cat events.json | python gcal_cli.py send -
+    python gcal_cli.py validate events.json
+    python gcal_cli.py send export.csv --columns "title=Subject,start=Begins,end=Ends"
+    python gcal_cli.py resume
+    python gcal_cli.py sent --shift-minutes 60 | python gcal_cli.py send
+    python gcal_cli.py watch inbox/
+
+Per-event results are written as JSON Lines; a summary goes to stderr.
+"python gcal_gui.py <command>" forwards to the same commands.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from datetime import datetime
+
+import requests
+from dotenv import load_dotenv
+
+from gcal_endpoints import EndpointPool, parse_endpoints
+from gcal_events import (
+    check_event, format_validation_errors, iter_events_from_file, iter_events_in_format,
+    mutation_event
+)
+from gcal_import import FORMATS, parse_column_map
+from gcal_sender import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE_LIMIT, DEFAULT_WORKERS,
+    RetryPolicy, TokenBucket, WebAppSession, clamp_attempts, clamp_chunk_size,
+    clamp_rate_limit, clamp_workers, send_events
+)
+from gcal_json import dumps as json_dumps
+from gcal_metrics import MetricsServer, SendMetrics, clamp_port, format_timing_summary
+from gcal_recurrence import compress_series, format_series
+from gcal_sync import CREATE, DELETE, UNCHANGED, UPDATE, plan_sync
+from gcal_store import DEDUP_DB_FILE, OUTBOX_DB_FILE, DedupIndex, Outbox
+from gcal_watch import (
+    DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, clamp_debounce, move_with_report, watch_folder
+)
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+WATCH_RESULTS_SUFFIX = '.results.jsonl'
+WATCH_REPORT_SUFFIX = '.report.json'
+WATCH_REPORT_FIELDS = ('batch_id', 'total', 'failed', 'invalid', 'skipped', 'input_error', 'elapsed')
+
+
+def load_settings():
+    """Return send settings from the environment and the .env file (like the GUI)."""
+    if os.path.exists('.env'):
+        load_dotenv()
+    return {
+        'url': os.getenv('WEB_APP_URL', ''),
+        'workers': clamp_workers(os.getenv('SEND_WORKERS', DEFAULT_WORKERS)),
+        'chunk_size': clamp_chunk_size(os.getenv('CHUNK_SIZE', DEFAULT_CHUNK_SIZE)),
+        'max_attempts': clamp_attempts(os.getenv('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+        'rate_limit': clamp_rate_limit(os.getenv('RATE_LIMIT', DEFAULT_RATE_LIMIT)),
+        'skip_sent': os.getenv('SKIP_SENT', '1') != '0',
+        'sync': os.getenv('SYNC_CALENDAR', '0') == '1',
+        'fold_series': os.getenv('FOLD_SERIES', '0') == '1',
+        'metrics_file': os.getenv('METRICS_FILE', ''),
+        'metrics_port': clamp_port(os.getenv('METRICS_PORT', 0)),
+        'calendar': os.getenv('CALENDAR_ID', ''),
+        'calendar_workers': clamp_workers(os.getenv('CALENDAR_WORKERS')) if os.getenv('CALENDAR_WORKERS') else 0,
+        'calendar_rate_limit': clamp_rate_limit(os.getenv('CALENDAR_RATE_LIMIT', 0)),
+        'csv_columns': os.getenv('CSV_COLUMNS', ''),
+        'endpoints': os.getenv('WEB_APP_ENDPOINTS', ''),
+        'compress': os.getenv('COMPRESS_REQUESTS', '1') != '0',
+        'minimal_responses': os.getenv('MINIMAL_RESPONSES', '1') != '0',
+        'watch_debounce': clamp_debounce(os.getenv('WATCH_DEBOUNCE', DEFAULT_DEBOUNCE)),
+    }
+
+
+def build_parser(settings):
+    """Build the argument parser; defaults come from the .env settings."""
+    parser = argparse.ArgumentParser(
+        description='Send events to Google Calendar via the Apps Script Web App.'
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='log requests to stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    send = commands.add_parser('send', help='send events from files or stdin')
+    send.add_argument('files', nargs='*', default=['-'],
+                      help="JSON, JSON Lines, CSV or iCalendar files ('-' or nothing reads stdin)")
+    add_input_options(send, settings)
+    add_target_options(send, settings)
+    add_send_options(send, settings)
+
+    resume = commands.add_parser('resume', help=f'send events left unsent in {OUTBOX_DB_FILE}')
+    add_send_options(resume, settings)
+
+    sent = commands.add_parser('sent', help='print the events of an earlier batch as update or delete actions')
+    sent.add_argument('--batch', type=int, help=f'batch id in {OUTBOX_DB_FILE} (default: the latest)')
+    sent.add_argument('--action', choices=('update', 'delete'), default='update')
+    sent.add_argument('--shift-minutes', type=int, default=0,
+                      help='move start and end of updated events by this many minutes')
+    sent.add_argument('-o', '--output', default='-', help="events file ('-' = stdout)")
+
+    validate = commands.add_parser('validate', help='check events without sending them')
+    validate.add_argument('files', nargs='*', default=['-'],
+                          help="JSON, JSON Lines, CSV or iCalendar files ('-' or nothing reads stdin)")
+    add_input_options(validate, settings)
+
+    watch = commands.add_parser('watch', help='send event files dropped into a folder, one after another')
+    watch.add_argument('folder', help='inbox folder to watch')
+    watch.add_argument('--done', help='folder for files sent without failures (default: FOLDER/done)')
+    watch.add_argument('--failed', help='folder for files with failed events (default: FOLDER/failed)')
+    watch.add_argument('--debounce', type=float, default=settings['watch_debounce'],
+                       help='seconds a file must stay unchanged before it is read (default: WATCH_DEBOUNCE)')
+    watch.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                       help='seconds between folder scans when inotify is not available')
+    watch.add_argument('--no-inotify', dest='inotify', action='store_false',
+                       help='always poll the folder')
+    watch.add_argument('--once', action='store_true',
+                       help='process the files already in the folder, then exit (for cron)')
+    add_input_options(watch, settings)
+    add_target_options(watch, settings)
+    add_send_options(watch, settings, output=False)
+    return parser
+
+
+def add_input_options(command, settings):
+    """Add the options that choose how input files are read."""
+    command.add_argument('--format', choices=('auto',) + FORMATS, default='auto',
+                         help='input format (default: from the file extension, JSON for stdin)')
+    command.add_argument('--columns', default=settings['csv_columns'],
+                         help='CSV column mapping such as "title=Subject,start=Begins" (default: CSV_COLUMNS)')
+
+
+def add_target_options(command, settings):
+    """Add the options that choose where and how new events are sent."""
+    command.add_argument('--url', default=settings['url'], help='Web App URL (default: WEB_APP_URL)')
+    command.add_argument('--calendar', default=settings['calendar'],
+                         help='calendar for events without a calendarId (default: CALENDAR_ID, else the default calendar)')
+    command.add_argument('--sync', action=argparse.BooleanOptionalAction, default=settings['sync'],
+                         help='read the calendar first and send only new and changed events '
+                              '(loads each input in memory)')
+    command.add_argument('--fold-series', action=argparse.BooleanOptionalAction, default=settings['fold_series'],
+                         help='send regular runs of identical events as one recurring series '
+                              '(loads each input in memory)')
+
+
+def add_send_options(command, settings, output=True):
+    """Add the options shared by the commands that send events."""
+    command.add_argument('--endpoints', default=settings['endpoints'],
+                         help='more Web App URLs to spread requests over, comma separated '
+                              '(default: WEB_APP_ENDPOINTS)')
+    command.add_argument('--workers', type=int, default=settings['workers'])
+    command.add_argument('--chunk-size', type=int, default=settings['chunk_size'],
+                         help='events per request (needs the bulk endpoint when > 1)')
+    command.add_argument('--max-attempts', type=int, default=settings['max_attempts'])
+    command.add_argument('--rate-limit', type=float, default=settings['rate_limit'],
+                         help='requests per second, 0 = unlimited')
+    command.add_argument('--calendar-workers', type=int, default=settings['calendar_workers'],
+                         help='requests in flight per calendar (default: --workers)')
+    command.add_argument('--calendar-rate-limit', type=float, default=settings['calendar_rate_limit'],
+                         help='requests per second per calendar, 0 = only --rate-limit applies')
+    command.add_argument('--compress', action=argparse.BooleanOptionalAction, default=settings['compress'],
+                         help='gzip large bulk requests for Web Apps that support it')
+    command.add_argument('--minimal-responses', action=argparse.BooleanOptionalAction,
+                         default=settings['minimal_responses'],
+                         help='ask for [index, eventId] bulk responses')
+    command.add_argument('--skip-sent', action=argparse.BooleanOptionalAction, default=settings['skip_sent'],
+                         help=f'skip events recorded in {DEDUP_DB_FILE}')
+    if output:
+        command.add_argument('-o', '--output', default='-', help="results file ('-' = stdout)")
+    command.add_argument('--metrics-file', default=settings['metrics_file'],
+                         help='append per-request timings to this JSON Lines file')
+    command.add_argument('--metrics-port', type=int, default=settings['metrics_port'],
+                         help='serve Prometheus metrics on 127.0.0.1:PORT/metrics while sending')
+
+
+def open_events(path, args):
+    """Return a lazy iterator of events from a file path or '-' for stdin."""
+    fmt = None if args.format == 'auto' else args.format
+    if path == '-':
+        return iter_events_in_format(sys.stdin, fmt or 'json', args.column_map)
+    return iter_events_from_file(path, args.column_map, fmt)
+
+
+def folded_events(source, events):
+    """Fold regular runs of events into recurring series; return (index, event) pairs."""
+    pairs, series = compress_series(events)
+    if series:
+        folded = sum(len(indexes) for indexes in series.values())
+        print(f"{source}: {folded} event(s) folded into {len(series)} recurring series", file=sys.stderr)
+        for line in format_series(series):
+            print(f"{source}: {line}", file=sys.stderr)
+    return pairs
+
+
+class BatchSender:
+    """Session, outbox, sent index, metrics and endpoint pools shared by the batches of one run.
+
+    Every event is journalled in the outbox, so an interrupted run can be
+    finished with the resume command.
+    """
+
+    def __init__(self, args, cancel_event=None):
+        self.args = args
+        self.cancel_event = cancel_event
+        self.workers = clamp_workers(args.workers)
+        self.session = WebAppSession(pool_size=self.workers)
+        self.rate_limiter = TokenBucket(clamp_rate_limit(args.rate_limit))
+        self.retry_policy = RetryPolicy(max_attempts=args.max_attempts)
+        self.dedup_index = DedupIndex(DEDUP_DB_FILE) if args.skip_sent else None
+        self.outbox = Outbox(OUTBOX_DB_FILE)
+        self.metrics = SendMetrics(args.metrics_file or None)
+        port = clamp_port(args.metrics_port)
+        self.metrics_server = MetricsServer(self.metrics, port) if port else None
+        self.pools = {}
+
+    def endpoint_pool(self, url):
+        """Return the shared pool of url plus the extra endpoints."""
+        if url not in self.pools:
+            self.pools[url] = EndpointPool(parse_endpoints(url, self.args.endpoints), self.session)
+        return self.pools[url]
+
+    def send(self, source, url, make_events, batch_id, out):
+        """Send one batch, write one JSON line per event to out, print its summary and return the stats.
+
+        make_events returns the events of a new batch; pass the batch_id of
+        an unfinished batch (and make_events=None) to resume it. With
+        --fold-series, results keep the positions of the unfolded events.
+        """
+        args = self.args
+        settled = None
+        # Resumed events already name their calendar
+        calendar_id = getattr(args, 'calendar', None) if batch_id is None else None
+        fold = batch_id is None and getattr(args, 'fold_series', False)
+        if batch_id is not None:
+            events, indexed = self.outbox.iter_queued(batch_id), True
+        elif getattr(args, 'sync', False):
+            if fold:
+                all_events = folded_events(source, make_events())
+            else:
+                all_events = list(enumerate(make_events(), start=1))
+            read_url = self.endpoint_pool(url).healthy_url()
+            events, settled, counts = plan_sync(self.session, read_url, all_events, calendar_id, indexed=True)
+            indexed = True
+            print(f"{source}: {counts[CREATE]} to create, {counts[UPDATE]} to update, "
+                  f"{counts[DELETE]} to delete, {counts[UNCHANGED]} already in the calendar",
+                  file=sys.stderr)
+            batch_id = self.outbox.create_batch(url, source)
+        else:
+            batch_id = self.outbox.create_batch(url, source)
+            if fold:
+                events, indexed = folded_events(source, make_events()), True
+            else:
+                events, indexed = make_events(), False
+
+        write_lock = threading.Lock()
+
+        def write_result(entry):
+            record = dict(entry, source=source)
+            line = json_dumps(record)
+            with write_lock:
+                out.write(line + '\n')
+
+        _, stats = send_events(
+            self.endpoint_pool(url),
+            events,
+            workers=self.workers,
+            on_result=write_result,
+            cancel_event=self.cancel_event,
+            chunk_size=args.chunk_size,
+            session=self.session,
+            retry_policy=self.retry_policy,
+            rate_limiter=self.rate_limiter,
+            dedup_index=self.dedup_index,
+            keep_results=False,
+            outbox=self.outbox,
+            batch_id=batch_id,
+            indexed=indexed,
+            metrics=self.metrics,
+            settled=settled,
+            calendar_id=calendar_id or None,
+            calendar_workers=args.calendar_workers,
+            calendar_rate_limit=clamp_rate_limit(args.calendar_rate_limit),
+            compress=args.compress,
+            minimal_responses=args.minimal_responses
+        )
+        out.flush()
+        stats['batch_id'] = batch_id
+        print(
+            f"{source}: {stats['total']} event(s), {stats['failed']} failed "
+            f"({stats['invalid']} invalid), "
+            f"{stats['skipped']} skipped in {stats['elapsed']:.2f}s "
+            f"({stats['events_per_sec']:.1f} events/s)",
+            file=sys.stderr
+        )
+        if args.verbose:
+            for line in format_timing_summary(stats['timing']):
+                print(f"{source}: {line}", file=sys.stderr)
+            print(f"{source}: {stats['request_bytes']} byte(s) sent, "
+                  f"{stats['response_bytes']} byte(s) received", file=sys.stderr)
+        if len(stats['endpoints']) > 1:
+            for endpoint in stats['endpoints']:
+                print(f"{source}: {endpoint['url']}: {endpoint['requests']} request(s), "
+                      f"{endpoint['errors']} failed{'' if endpoint['healthy'] else ', unhealthy'}",
+                      file=sys.stderr)
+        if stats['queued']:
+            print(f"{source}: {stats['queued']} event(s) left in {OUTBOX_DB_FILE}; "
+                  f"send them later with the resume command", file=sys.stderr)
+        if stats['input_error']:
+            print(f"{source}: stopped reading events: {stats['input_error']}", file=sys.stderr)
+        return stats
+
+    def close(self):
+        """Release every shared resource."""
+        for pool in self.pools.values():
+            pool.close()
+        self.session.close()
+        self.outbox.close()
+        self.metrics.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
+
+def send_batches(args, batches):
+    """Send (source, url, events, batch_id) batches and write one JSON line per event."""
+    sender = BatchSender(args)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    failed = 0
+    try:
+        for source, url, make_events, batch_id in batches:
+            stats = sender.send(source, url, make_events, batch_id, out)
+            failed += stats['failed'] + (1 if stats['input_error'] else 0)
+    except (OSError, ValueError, requests.exceptions.RequestException) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    finally:
+        sender.close()
+        if out is not sys.stdout:
+            out.close()
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def cmd_send(args):
+    """Send every input file (or stdin)."""
+    urls = parse_endpoints(args.url, args.endpoints)
+    if not urls:
+        print("Error: Web App URL is required (--url or WEB_APP_URL in .env)", file=sys.stderr)
+        return EXIT_USAGE
+    args.url = urls[0]
+    try:
+        args.column_map = parse_column_map(args.columns)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    batches = []
+    for path in args.files:
+        source = 'stdin' if path == '-' else path
+        make_events = lambda path=path: open_events(path, args)
+        batches.append((source, args.url, make_events, None))
+    return send_batches(args, batches)
+
+
+def cmd_resume(args):
+    """Send the events of every unfinished batch in the outbox."""
+    outbox = Outbox(OUTBOX_DB_FILE)
+    try:
+        unfinished = outbox.unfinished_batches()
+    finally:
+        outbox.close()
+    if not unfinished:
+        print("Nothing to resume", file=sys.stderr)
+        return EXIT_OK
+    batches = [
+        (f"{batch['source'] or 'batch'} (batch {batch['id']})", batch['url'], None, batch['id'])
+        for batch in unfinished
+    ]
+    return send_batches(args, batches)
+
+
+def cmd_sent(args):
+    """Write the events the Web App accepted in a batch as update/delete actions (JSON Lines)."""
+    outbox = Outbox(OUTBOX_DB_FILE)
+    try:
+        batch_id = args.batch if args.batch is not None else outbox.latest_batch_id()
+        found = outbox.sent_events(batch_id) if batch_id is not None else []
+    finally:
+        outbox.close()
+    if not found:
+        print("No sent events found", file=sys.stderr)
+        return EXIT_FAILURES
+    try:
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        for _, event, event_id in found:
+            out.write(json_dumps(mutation_event(event, event_id, args.action, args.shift_minutes)) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Batch {batch_id}: {len(found)} event(s) as {args.action}", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_validate(args):
+    """Report every invalid event (with its index) in each input."""
+    try:
+        args.column_map = parse_column_map(args.columns)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    invalid_total = 0
+    for path in args.files:
+        source = 'stdin' if path == '-' else path
+        invalid = []
+        count = 0
+        try:
+            for count, event in enumerate(open_events(path, args), start=1):
+                errors = check_event(event)[0]
+                if errors:
+                    invalid.append((count, errors))
+        except (OSError, ValueError) as e:
+            print(f"{source}: stopped reading events after {count}: {e}", file=sys.stderr)
+            invalid_total += 1
+        if invalid:
+            print(f"{source}:\n{format_validation_errors(invalid)}")
+        print(f"{source}: {count} event(s), {len(invalid)} invalid", file=sys.stderr)
+        invalid_total += len(invalid)
+    return EXIT_FAILURES if invalid_total else EXIT_OK
+
+
+def cmd_watch(args):
+    """Send every event file that lands in a folder, then move it to the done or failed folder.
+
+    Files are sent one after another by this process over one session,
+    outbox and sent index. Each file's results (JSON Lines) and summary
+    (JSON) are moved along with it as NAME.results.jsonl and
+    NAME.report.json. Runs until interrupted, or with --once until the
+    folder is empty.
+    """
+    urls = parse_endpoints(args.url, args.endpoints)
+    if not urls:
+        print("Error: Web App URL is required (--url or WEB_APP_URL in .env)", file=sys.stderr)
+        return EXIT_USAGE
+    args.url = urls[0]
+    try:
+        args.column_map = parse_column_map(args.columns)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.isdir(args.folder):
+        print(f"Error: {args.folder} is not a folder", file=sys.stderr)
+        return EXIT_USAGE
+    done_folder = args.done or os.path.join(args.folder, 'done')
+    failed_folder = args.failed or os.path.join(args.folder, 'failed')
+
+    stop_event = threading.Event()
+    cancel_event = threading.Event()
+
+    def stop(signum, frame):
+        # Finish the request in flight; unsent events stay in the outbox
+        print("Stopping...", file=sys.stderr)
+        stop_event.set()
+        cancel_event.set()
+
+    handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+    sender = BatchSender(args, cancel_event)
+    counts = {'done': 0, 'failed': 0}
+
+    def process(path):
+        name = os.path.basename(path)
+        results_path = os.path.join(args.folder, f".{name}{WATCH_RESULTS_SUFFIX}")
+        report_path = os.path.join(args.folder, f".{name}{WATCH_REPORT_SUFFIX}")
+        make_events = lambda: open_events(path, args)
+        report = {'source': name, 'started': datetime.now().isoformat(timespec='seconds')}
+        try:
+            with open(results_path, 'w', encoding='utf-8') as out:
+                stats = sender.send(name, args.url, make_events, None, out)
+        except (OSError, ValueError, requests.exceptions.RequestException) as e:
+            print(f"{name}: {e}", file=sys.stderr)
+            report['error'] = str(e)
+            ok = False
+        else:
+            if cancel_event.is_set():
+                # Interrupted: the file stays in the inbox and is read again on the next start;
+                # its unsent events are cancelled in the outbox, so only the file brings them back
+                print(f"{name}: left in {args.folder}", file=sys.stderr)
+                os.remove(results_path)
+                return
+            report.update((key, stats[key]) for key in WATCH_REPORT_FIELDS)
+            ok = not (stats['failed'] or stats['queued'] or stats['input_error'])
+        report['finished'] = datetime.now().isoformat(timespec='seconds')
+        try:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write(json_dumps(report) + '\n')
+            target = move_with_report(path, done_folder if ok else failed_folder, [results_path, report_path])
+        except OSError as e:
+            print(f"{name}: could not move the file: {e}", file=sys.stderr)
+            ok = False
+        else:
+            print(f"{name}: moved to {target}", file=sys.stderr)
+        counts['done' if ok else 'failed'] += 1
+
+    try:
+        watch_folder(args.folder, process, stop_event, debounce=args.debounce,
+                     poll_interval=args.poll_interval, once=args.once, use_inotify=args.inotify)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    finally:
+        sender.close()
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+    print(f"{counts['done'] + counts['failed']} file(s) processed, {counts['failed']} failed", file=sys.stderr)
+    return EXIT_FAILURES if counts['failed'] else EXIT_OK
+
+
+def main(argv=None):
+    """Command line entry point; returns the process exit code."""
+    settings = load_settings()
+    args = build_parser(settings).parse_args(argv)
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    if args.command == 'send':
+        return cmd_send(args)
+    if args.command == 'resume':
+        return cmd_resume(args)
+    if args.command == 'sent':
+        return cmd_sent(args)
+    if args.command == 'validate':
+        return cmd_validate(args)
+    if args.command == 'watch':
+        return cmd_watch(args)
+    return EXIT_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Web App endpoint pool
+Spreads requests over several deployments of the Web App, each with its own
+execution quota: every request goes to the healthy endpoint with the fewest
+requests in flight. Endpoints that keep failing are taken out and probed
+with a GET (like "Test Web App") until they answer again.
+"""
+
+import logging
+import re
+import threading
+import time
+
+FAILURE_THRESHOLD = 3  # consecutive failed requests before an endpoint is taken out
+PROBE_INTERVAL = 30  # seconds between health probes of an unhealthy endpoint
+PROBE_TIMEOUT = 10
+CAPABILITY_RETRY = 30  # seconds before a failed capability check is repeated, doubling
+CAPABILITY_RETRY_MAX = 600
+
+_SEPARATORS = re.compile(r'[\s,]+')
+
+
+def parse_endpoints(*values):
+    """Return the distinct URLs in values, in order; each value may list several."""
+    urls = []
+    for value in values:
+        for url in _SEPARATORS.split(value or ''):
+            if url and url not in urls:
+                urls.append(url)
+    return urls
+
+
+class Endpoint:
+    """One Web App URL and its request counters."""
+
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # consecutive
+        self.healthy = True
+        self.probing = False
+        self.capabilities = None  # set of optional features, once asked
+        self.capabilities_checking = False
+        self.capabilities_retry_at = 0.0  # time.monotonic() of the next check after a failure
+        self.capabilities_failures = 0  # consecutive failed checks
+
+    def snapshot(self):
+        """Return the counters as a dict."""
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'requests': self.requests,
+            'errors': self.errors,
+            'outstanding': self.outstanding,
+        }
+
+
+class EndpointPool:
+    """Least-outstanding-requests balancing with failover over Web App URLs.
+
+    Safe to share between sender threads and between batches, so health
+    information carries over. A request that fails on one endpoint is
+    retried on another (see WebAppClient.post); while every endpoint is
+    unhealthy, requests still go out and the first success brings its
+    endpoint back.
+    """
+
+    def __init__(self, urls, session=None, failure_threshold=FAILURE_THRESHOLD, probe_interval=PROBE_INTERVAL):
+        if isinstance(urls, str):
+            urls = parse_endpoints(urls)
+        if not urls:
+            raise ValueError("at least one Web App URL is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.session = session  # used for health probes
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.lock = threading.Lock()
+        self.capability_lock = threading.Lock()
+        self.closed = threading.Event()
+
+    @property
+    def urls(self):
+        """The endpoint URLs, in configured order."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def __str__(self):
+        return ', '.join(self.urls)
+
+    def acquire(self, exclude=None):
+        """Pick the endpoint for the next request and count it as outstanding.
+
+        Healthy endpoints other than exclude (the one that just failed) come
+        first; ties go to the endpoint that has had the fewest requests.
+        """
+        with self.lock:
+            candidates = (
+                [e for e in self.endpoints if e.healthy and e is not exclude]
+                or [e for e in self.endpoints if e.healthy]
+                or [e for e in self.endpoints if e is not exclude]
+                or self.endpoints
+            )
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.requests))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint, failed):
+        """Finish a request; failed marks a transport error or server failure."""
+        probe = False
+        with self.lock:
+            endpoint.outstanding -= 1
+            if not failed:
+                endpoint.failures = 0
+                if not endpoint.healthy:
+                    logging.info(f"Endpoint {endpoint.url} answered again")
+                    endpoint.healthy = True
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.healthy and endpoint.failures >= self.failure_threshold and len(self.endpoints) > 1:
+                logging.error(f"Endpoint {endpoint.url} failed {endpoint.failures} times in a row, taken out")
+                endpoint.healthy = False
+                probe = not endpoint.probing
+                endpoint.probing = True
+        if probe:
+            threading.Thread(
+                target=self.probe_until_healthy, args=(endpoint,),
+                name='gcal-endpoint-probe', daemon=True
+            ).start()
+
+    def has_alternative(self, endpoint):
+        """Return True when another healthy endpoint can take a retry."""
+        with self.lock:
+            return any(e.healthy and e is not endpoint for e in self.endpoints)
+
+    def healthy_url(self):
+        """Return the URL of the least busy healthy endpoint (for reads such as a sync)."""
+        with self.lock:
+            candidates = [e for e in self.endpoints if e.healthy] or self.endpoints
+            return min(candidates, key=lambda e: e.outstanding).url
+
+    def http_get(self):
+        """Return the GET function for probes (the shared session when there is one)."""
+        if self.session is not None:
+            return self.session.get
+        import requests
+        return requests.get
+
+    def supports(self, endpoint, capability):
+        """Return True when the endpoint announces capability (e.g. 'gzip').
+
+        Asked once per endpoint with GET ?capabilities=1; deployments of an
+        older script answer "OK" and support nothing optional. The check
+        runs in the calling thread without holding the pool's lock: other
+        threads treat the capability as missing until it is known. A failed
+        check is repeated after CAPABILITY_RETRY seconds (doubling up to
+        CAPABILITY_RETRY_MAX), or as soon as the endpoint passes a health
+        probe.
+        """
+        with self.capability_lock:
+            if endpoint.capabilities is not None:
+                return capability in endpoint.capabilities
+            if endpoint.capabilities_checking or time.monotonic() < endpoint.capabilities_retry_at:
+                return False
+            endpoint.capabilities_checking = True
+        capabilities = None
+        try:
+            capabilities = self.fetch_capabilities(endpoint)
+        finally:
+            with self.capability_lock:
+                endpoint.capabilities_checking = False
+                if capabilities is None:
+                    endpoint.capabilities_failures += 1
+                    delay = min(CAPABILITY_RETRY * 2 ** (endpoint.capabilities_failures - 1), CAPABILITY_RETRY_MAX)
+                    endpoint.capabilities_retry_at = time.monotonic() + delay
+                else:
+                    endpoint.capabilities_failures = 0
+                    endpoint.capabilities = capabilities
+        return capabilities is not None and capability in capabilities
+
+    def fetch_capabilities(self, endpoint):
+        """GET the optional features of an endpoint; None when the check failed."""
+        try:
+            response = self.http_get()(endpoint.url, params={'capabilities': '1'}, timeout=PROBE_TIMEOUT)
+        except Exception as e:
+            logging.info(f"Capability check of {endpoint.url} failed: {e}")
+            return None
+        if response.status_code != 200:
+            logging.info(f"Capability check of {endpoint.url} failed: HTTP {response.status_code}")
+            return None
+        try:
+            body = response.json()
+        except ValueError:
+            body = None  # plain "OK" from an older script
+        if isinstance(body, dict) and isinstance(body.get('capabilities'), list):
+            return frozenset(body['capabilities'])
+        return frozenset()
+
+    def probe(self, endpoint):
+        """GET the endpoint (the Web App's health check); return True when it answers 200."""
+        try:
+            return self.http_get()(endpoint.url, timeout=PROBE_TIMEOUT).status_code == 200
+        except Exception as e:
+            logging.info(f"Probe of {endpoint.url} failed: {e}")
+            return False
+
+    def probe_until_healthy(self, endpoint):
+        """Probe an unhealthy endpoint every probe_interval seconds until it answers."""
+        try:
+            while not self.closed.wait(self.probe_interval):
+                with self.lock:
+                    if endpoint.healthy:
+                        return
+                if self.probe(endpoint):
+                    with self.lock:
+                        endpoint.healthy = True
+                        endpoint.failures = 0
+                    with self.capability_lock:
+                        if not endpoint.capabilities:
+                            endpoint.capabilities = None
+                            endpoint.capabilities_retry_at = 0.0
+                    logging.info(f"Endpoint {endpoint.url} passed its health probe")
+                    return
+        finally:
+            with self.lock:
+                endpoint.probing = False
+
+    def snapshot(self):
+        """Return [{'url', 'healthy', 'requests', 'errors', 'outstanding'}] per endpoint."""
+        with self.lock:
+            return [endpoint.snapshot() for endpoint in self.endpoints]
+
+    def close(self):
+        """Stop the health probes."""
+        self.closed.set()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Event model helpers
+Normalises the accepted JSON shapes into a flat sequence of events and
+streams events from large files (JSON, CSV or iCalendar) without loading
+them into memory.
+"""
+
+import json
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from gcal_import import file_format, iter_events_from_csv, iter_events_from_ics
+
+READ_SIZE = 64 * 1024
+MAX_EVENT_CHARS = 1024 * 1024  # larger "events" are treated as invalid JSON
+PREVIEW_EVENTS = 5
+STREAM_FILE_TYPES = [
+    ("Event files", "*.json *.jsonl *.ndjson *.csv *.tsv *.ics"),
+    ("JSON / JSON Lines", "*.json *.jsonl *.ndjson"),
+    ("CSV", "*.csv *.tsv"),
+    ("iCalendar", "*.ics *.ical"),
+    ("All files", "*.*"),
+]
+
+OPTIONAL_TEXT_FIELDS = ('description', 'location', 'calendarId')
+ACTIONS = ('create', 'update', 'delete')
+MUTATION_FIELDS = (
+    'title', 'start', 'end', 'allDay', 'description', 'location', 'recurrence', 'timeZone', 'calendarId'
+)
+RRULE_FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+RRULE_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_REPORTED_ERRORS = 1000
+MAX_REPORTED_EXCEPTIONS = 5
+DATETIME_CACHE_SIZE = 65536
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'\s*')
+_ARRAY_SEPARATORS = re.compile(r'[\s,]*')
+_EVENTS_WRAPPER = re.compile(r'\s*\{\s*"events"\s*:\s*\[')
+_DATE = re.compile(r'\d{4}-\d\d-\d\d\Z')
+_CANONICAL_DATETIME = re.compile(
+    r'\d{4}-\d\d-\d\dT\d\d:\d\d(?::\d\d(?:\.\d{1,6})?)?(?:Z|[+-]\d\d:\d\d)\Z'
+)
+
+
+def extract_events(parsed):
+    """Return the list of events in a parsed JSON document.
+
+    Accepts a top-level list, an object with an 'events' list, or a single
+    event object.
+    """
+    if isinstance(parsed, list):
+        # Top-level array of events
+        if not parsed:
+            raise ValueError("Event list is empty")
+        return parsed
+    if isinstance(parsed, dict):
+        if 'events' in parsed:
+            # Object with 'events' key (list)
+            events = parsed.get('events')
+            if not isinstance(events, list) or not events:
+                raise ValueError("'events' must be a list with at least one event")
+            return events
+        # Single event as object
+        return [parsed]
+    raise ValueError("JSON must be an object or a list of events")
+
+
+def parse_datetime(value, tz_name=None):
+    """Parse an ISO-8601 date/time into an aware datetime.
+
+    Values without an offset are read in tz_name, or in the local time zone
+    of this computer when the event has no 'timeZone'.
+    """
+    if not isinstance(value, str):
+        raise ValueError("not a string")
+    if value.endswith(('Z', 'z')):
+        # fromisoformat() only accepts the UTC designator from Python 3.11
+        value = value[:-1] + '+00:00'
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(tz_name)) if tz_name else dt.astimezone()
+    return dt
+
+
+def parse_rrule(value):
+    """Parse the supported RRULE subset into a dict of its parts.
+
+    Accepts FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL, COUNT or UNTIL
+    and, for weekly rules, BYDAY with plain day codes, optionally prefixed
+    by "RRULE:". Raises ValueError for anything else.
+    """
+    if not isinstance(value, str):
+        raise ValueError("must be a string")
+    text = value.strip()
+    if text[:6].upper() == 'RRULE:':
+        text = text[6:]
+    parts = {}
+    for part in text.split(';'):
+        name, sep, part_value = part.partition('=')
+        name = name.strip().upper()
+        if not sep or not name or name in parts:
+            raise ValueError(f"bad part {part!r}")
+        parts[name] = part_value.strip().upper()
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY'}
+    if unknown:
+        raise ValueError(f"unsupported {', '.join(sorted(unknown))}")
+    if parts.get('FREQ') not in RRULE_FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(RRULE_FREQUENCIES)}")
+    for name in ('INTERVAL', 'COUNT'):
+        if name in parts and (not parts[name].isdigit() or int(parts[name]) < 1):
+            raise ValueError(f"{name} must be a positive integer")
+    if 'COUNT' in parts and 'UNTIL' in parts:
+        raise ValueError("use COUNT or UNTIL, not both")
+    if 'UNTIL' in parts:
+        until = parts['UNTIL']
+        try:
+            datetime.strptime(until, '%Y%m%dT%H%M%SZ' if 'T' in until else '%Y%m%d')
+        except ValueError:
+            raise ValueError("UNTIL must be YYYYMMDD or YYYYMMDDTHHMMSSZ")
+    if 'BYDAY' in parts:
+        if parts['FREQ'] != 'WEEKLY':
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        if not all(day in RRULE_WEEKDAYS for day in parts['BYDAY'].split(',')):
+            raise ValueError("BYDAY must list day codes (MO,TU,...)")
+    return parts
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _parse_and_format(value, tz_name):
+    """Return (datetime, normalised string); cached because schedules repeat values."""
+    dt = parse_datetime(value, tz_name)
+    # Values already in the extended format with an offset are kept verbatim;
+    # re-serialising every datetime would dominate the cost on large batches
+    if _CANONICAL_DATETIME.match(value):
+        return dt, value
+    return dt, dt.isoformat()
+
+
+def _normalize_datetime(value, tz_name, field, errors):
+    """Return (datetime, normalised string) or (None, None) after adding an error."""
+    try:
+        return _parse_and_format(value, tz_name)
+    except (ValueError, TypeError):
+        errors.append(f"'{field}' is not an ISO-8601 date/time: {value!r}")
+        return None, None
+
+
+def _normalize_date(value, field, errors):
+    """Return (date, value) for an all-day YYYY-MM-DD value, or (None, None) after adding an error."""
+    try:
+        if isinstance(value, str) and _DATE.match(value):
+            return date.fromisoformat(value), value
+    except ValueError:
+        pass
+    errors.append(f"'{field}' of an all-day event must be a date (YYYY-MM-DD): {value!r}")
+    return None, None
+
+
+def check_event(event):
+    """Validate an event and return (errors, start, end).
+
+    start and end are ISO-8601 strings with an explicit UTC offset, or None
+    when the event is invalid or carries no times (a delete, or an update
+    that keeps them). 'update' and 'delete' actions need an 'eventId'; an
+    update only needs the fields it changes. An optional 'recurrence' RRULE
+    (see parse_rrule) makes the event a series starting at start/end.
+    With "allDay": true, start and end are dates (YYYY-MM-DD, end
+    exclusive) and are returned as is.
+    """
+    if not isinstance(event, dict):
+        return ["event must be a JSON object"], None, None
+
+    errors = []
+    action = event.get('action', 'create')
+    if action not in ACTIONS:
+        errors.append(f"unknown 'action': {action!r} (use create, update or delete)")
+        action = 'create'
+    if action != 'create':
+        event_id = event.get('eventId')
+        if not event_id or not isinstance(event_id, str):
+            errors.append(f"'{action}' needs an 'eventId'")
+        if action == 'delete':
+            return errors, None, None
+
+    title = event.get('title')
+    if not title:
+        if action == 'create' or 'title' in event:
+            errors.append("missing 'title'")
+    elif not isinstance(title, str):
+        errors.append("'title' must be a string")
+    for field in OPTIONAL_TEXT_FIELDS:
+        value = event.get(field)
+        if value is not None and not isinstance(value, str):
+            errors.append(f"'{field}' must be a string")
+
+    tz_name = event.get('timeZone')
+    if tz_name is not None:
+        try:
+            ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            errors.append(f"unknown 'timeZone': {tz_name!r}")
+            tz_name = None
+
+    all_day = event.get('allDay')
+    if all_day is not None and not isinstance(all_day, bool):
+        errors.append("'allDay' must be true or false")
+        all_day = False
+
+    recurrence = event.get('recurrence')
+    if recurrence is not None:
+        try:
+            parse_rrule(recurrence)
+        except ValueError as e:
+            errors.append(f"invalid 'recurrence' {recurrence!r}: {e}")
+
+    exceptions = event.get('recurrenceExceptions')
+    if exceptions:
+        exceptions = exceptions if isinstance(exceptions, list) else [exceptions]
+        shown = ', '.join(str(value) for value in exceptions[:MAX_REPORTED_EXCEPTIONS])
+        if len(exceptions) > MAX_REPORTED_EXCEPTIONS:
+            shown += f" and {len(exceptions) - MAX_REPORTED_EXCEPTIONS} more"
+        errors.append(f"excluded or changed occurrences (EXDATE/RECURRENCE-ID) are not supported: {shown}; "
+                      f"remove 'recurrenceExceptions' to send the whole series")
+
+    start_value = event.get('start')
+    end_value = event.get('end')
+    start_dt = end_dt = start = end = None
+    if action == 'update' and start_value in (None, '') and end_value in (None, ''):
+        # Update that keeps the current times
+        return errors, None, None
+    if start_value in (None, ''):
+        errors.append("missing 'start'")
+    elif all_day:
+        start_dt, start = _normalize_date(start_value, 'start', errors)
+    else:
+        start_dt, start = _normalize_datetime(start_value, tz_name, 'start', errors)
+    if end_value in (None, ''):
+        errors.append("missing 'end'")
+    elif all_day:
+        end_dt, end = _normalize_date(end_value, 'end', errors)
+    else:
+        end_dt, end = _normalize_datetime(end_value, tz_name, 'end', errors)
+    if start_dt is not None and end_dt is not None and end_dt <= start_dt:
+        errors.append("'end' must be after 'start'")
+
+    if errors:
+        return errors, None, None
+    return errors, start, end
+
+
+def normalize_event(event):
+    """Validate an event and return (normalised_event, errors).
+
+    The normalised event has 'start' and 'end' as ISO-8601 with an explicit
+    UTC offset (dates for all-day events); when errors is not empty the event is returned as is.
+    """
+    errors, start, end = check_event(event)
+    if errors or start is None:
+        return event, errors
+    if start is event['start'] and end is event['end']:
+        return event, errors
+    normalized = dict(event)
+    normalized['start'] = start
+    normalized['end'] = end
+    return normalized, errors
+
+
+def mutation_event(event, event_id, action, shift_minutes=0):
+    """Return the 'update' or 'delete' payload for an event sent earlier as event_id.
+
+    Updates carry the fields of the original event, with start and end
+    moved by shift_minutes; deletes keep the title only to be readable.
+    Both name the event's calendar explicitly ('primary' for the default
+    one), so a different default calendar setting cannot redirect them.
+    """
+    calendar_id = event.get('calendarId') or 'primary'
+    if action == 'delete':
+        return {'action': 'delete', 'eventId': event_id, 'title': event.get('title'), 'calendarId': calendar_id}
+    mutation = {'action': 'update', 'eventId': event_id}
+    mutation.update((field, event[field]) for field in MUTATION_FIELDS if field in event)
+    mutation['calendarId'] = calendar_id
+    if shift_minutes and event.get('start') and event.get('end'):
+        shift = timedelta(minutes=shift_minutes)
+        if event.get('allDay'):
+            # Dates only move by whole days
+            mutation['start'] = (date.fromisoformat(event['start']) + shift).isoformat()
+            mutation['end'] = (date.fromisoformat(event['end']) + shift).isoformat()
+            return mutation
+        mutation['start'] = (parse_datetime(event['start']) + shift).isoformat()
+        mutation['end'] = (parse_datetime(event['end']) + shift).isoformat()
+    return mutation
+
+
+def validate_events(events):
+    """Check every event and return [(index, errors), ...] for the invalid ones.
+
+    Indexes are 1-based, like the send results.
+    """
+    invalid = []
+    for idx, event in enumerate(events, start=1):
+        errors = check_event(event)[0]
+        if errors:
+            invalid.append((idx, errors))
+    return invalid
+
+
+def format_validation_errors(invalid, limit=MAX_REPORTED_ERRORS):
+    """Return a readable report of validate_events() output."""
+    lines = [f"Event {idx}: {'; '.join(errors)}" for idx, errors in invalid[:limit]]
+    if len(invalid) > limit:
+        lines.append(f"... and {len(invalid) - limit} more invalid event(s)")
+    return "\n".join(lines)
+
+
+def _iter_json_values(f, buffer, in_array):
+    """Yield consecutive JSON values from a text stream.
+
+    In array mode values are separated by commas and the stream stops at
+    the closing bracket; otherwise values are separated by whitespace,
+    which covers JSON Lines and a single (pretty-printed) document.
+    """
+    skip = _ARRAY_SEPARATORS if in_array else _WHITESPACE
+    pos = 0
+    eof = False
+    while True:
+        pos = skip.match(buffer, pos).end()
+        if pos < len(buffer) and in_array and buffer[pos] == ']':
+            return
+        if pos == len(buffer) and eof:
+            if in_array:
+                raise ValueError("Unexpected end of file inside the events array")
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            value, end = _decoder.raw_decode(buffer, pos)
+            # A number at the end of the buffer may continue in the next read
+            if end == len(buffer) and not eof and not isinstance(value, (dict, list, str)):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+        except json.JSONDecodeError:
+            if eof or len(buffer) - pos > MAX_EVENT_CHARS:
+                raise
+            more = f.read(READ_SIZE)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        yield value
+        pos = end
+
+
+def iter_events_from_stream(f):
+    """Yield events one by one from a text stream.
+
+    Supports a top-level array, an object with an 'events' array, JSON
+    Lines and a single event object. Memory use is bounded by the read
+    size plus the largest single event.
+    """
+    buffer = f.read(READ_SIZE).lstrip('\ufeff')
+    stripped = buffer.lstrip()
+    if stripped.startswith('['):
+        values = _iter_json_values(f, stripped[1:], in_array=True)
+    else:
+        wrapper = _EVENTS_WRAPPER.match(buffer)
+        if wrapper:
+            values = _iter_json_values(f, buffer[wrapper.end():], in_array=True)
+        else:
+            values = _iter_json_values(f, buffer, in_array=False)
+
+    count = 0
+    for value in values:
+        if isinstance(value, list) or (isinstance(value, dict) and 'events' in value):
+            events = extract_events(value)
+        elif isinstance(value, dict):
+            events = [value]
+        else:
+            raise ValueError(f"Expected an event object, got {type(value).__name__}")
+        for event in events:
+            count += 1
+            yield event
+    if count == 0:
+        raise ValueError("Event list is empty")
+
+
+def iter_events_in_format(f, fmt='json', column_map=None):
+    """Yield events from a text stream in 'json', 'csv' (see gcal_import) or 'ics' format."""
+    if fmt == 'csv':
+        return iter_events_from_csv(f, column_map)
+    if fmt == 'ics':
+        return iter_events_from_ics(f)
+    return iter_events_from_stream(f)
+
+
+def iter_events_from_file(path, column_map=None, fmt=None):
+    """Yield events one by one from a JSON, JSON Lines, CSV or iCalendar file.
+
+    The format follows the file extension unless fmt is given; column_map
+    maps event fields to CSV columns.
+    """
+    fmt = fmt or file_format(path)
+    # newline='' keeps line breaks inside quoted CSV cells; utf-8-sig drops a BOM
+    with open(path, 'r', encoding='utf-8-sig', newline='' if fmt == 'csv' else None) as f:
+        yield from iter_events_in_format(f, fmt, column_map)
+
+
+def preview_events(path, count=PREVIEW_EVENTS, column_map=None):
+    """Return the first events of a file (raises on invalid content)."""
+    return list(islice(iter_events_from_file(path, column_map), count))
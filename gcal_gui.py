@@ -6,23 +6,82 @@ Author: AI Assistant
 Version: 1.0
 """
 
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Headless commands ("gcal_gui.py send ...") run without importing tkinter
+    from gcal_cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import json
-import requests
 import os
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
-from dotenv import load_dotenv, set_key
+
+# The network stack (requests, urllib3), dotenv and sqlite3 are imported
+# on first use, so the window appears without paying for them
+# (check with: python gcal_startup.py)
+from gcal_settings import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE_LIMIT, DEFAULT_WORKERS,
+    MAX_ATTEMPTS, MAX_CHUNK_SIZE, MAX_WORKERS, RetryPolicy, TokenBucket,
+    clamp_attempts, clamp_chunk_size, clamp_rate_limit, clamp_workers
+)
+from gcal_json import loads as json_loads
+from gcal_metrics import MetricsServer, SendMetrics, clamp_port, format_timing_summary
+from gcal_import import file_format, parse_column_map
+from gcal_recurrence import compress_series, format_series
+from gcal_results import ResultsView
+from gcal_events import (
+    STREAM_FILE_TYPES, extract_events, format_validation_errors, iter_events_from_file,
+    mutation_event, preview_events, validate_events
+)
+
+STARTUP_PROBE_ENV = 'GCAL_STARTUP_PROBE'  # set by gcal_startup.py: exit once drawn
+STARTUP_READY_MARK = 'gcal-ready'
+UI_POLL_MS = 16  # ~60 fps
+UI_POLL_BATCH = 200  # max queued UI updates handled per tick
+OUTBOX_CHECK_DELAY_MS = 500  # look for unfinished batches shortly after launch
+OUTBOX_RETRY_MS = 30000  # connectivity probe interval while events are queued
+
 
 class GoogleCalendarGUI:
     """Graphical interface to send events to Google Calendar via Web App."""
     
     def __init__(self, root):
         self.root = root
+        self.ui_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.session = None
+        self.rate_limiter = TokenBucket(DEFAULT_RATE_LIMIT)
+        self.dedup_index = None
+        self.outbox = None
+        self.metrics = None
+        self.metrics_server = None
+        self.outbox_job = None
+        self.resuming = False
+        self.sending = False
+        self.results_batch_id = None  # outbox batch listed in the Events tab
+        self.calendar_workers = None  # per-calendar limits, from .env
+        self.calendar_rate_limit = 0.0
+        self.csv_columns = ''  # CSV column mapping, from .env
+        self.extra_endpoints = ''  # more Web App URLs, from .env
+        self.endpoint_pool = None
+        self.compress = True  # request/response size options, from .env
+        self.minimal_responses = True
+        self.stream_path = None
+        self.parsed_cache = None  # (editor content digest, parsed document)
         self.setup_logging()
         self.setup_ui()
         self.load_config()
+        self.setup_metrics()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_ui_queue()
+        self.root.after(OUTBOX_CHECK_DELAY_MS, self.check_outbox)
         
     def setup_logging(self):
         """Configure logging system for technical errors."""
@@ -61,15 +120,91 @@ class GoogleCalendarGUI:
         self.url_entry = ttk.Entry(config_frame, textvariable=self.url_var, width=50)
         self.url_entry.grid(row=0, column=1, sticky="ew", padx=(5, 0), pady=2)
         
-        # Calendar ID (optional - script always uses default calendar)
+        # Calendar for events without their own calendarId ("primary" = default calendar)
         ttk.Label(config_frame, text="Calendar ID (optional):").grid(row=1, column=0, sticky="w", pady=2)
         self.calendar_var = tk.StringVar(value="primary")
         self.calendar_entry = ttk.Entry(config_frame, textvariable=self.calendar_var, width=50)
         self.calendar_entry.grid(row=1, column=1, sticky="ew", padx=(5, 0), pady=2)
         
+        # Number of concurrent requests to the Web App
+        ttk.Label(config_frame, text="Workers:").grid(row=2, column=0, sticky="w", pady=2)
+        send_options_frame = ttk.Frame(config_frame)
+        send_options_frame.grid(row=2, column=1, sticky="w", padx=(5, 0), pady=2)
+        
+        self.workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+        self.workers_spin = ttk.Spinbox(
+            send_options_frame,
+            from_=1,
+            to=MAX_WORKERS,
+            textvariable=self.workers_var,
+            width=5
+        )
+        self.workers_spin.pack(side=tk.LEFT)
+        
+        # Events packed in each POST (needs the bulk endpoint when > 1)
+        ttk.Label(send_options_frame, text="Events per request:").pack(side=tk.LEFT, padx=(15, 5))
+        self.chunk_size_var = tk.IntVar(value=DEFAULT_CHUNK_SIZE)
+        self.chunk_size_spin = ttk.Spinbox(
+            send_options_frame,
+            from_=1,
+            to=MAX_CHUNK_SIZE,
+            textvariable=self.chunk_size_var,
+            width=5
+        )
+        self.chunk_size_spin.pack(side=tk.LEFT)
+        
+        # Retries for timeouts, 429 and 5xx responses
+        ttk.Label(send_options_frame, text="Max attempts:").pack(side=tk.LEFT, padx=(15, 5))
+        self.attempts_var = tk.IntVar(value=DEFAULT_MAX_ATTEMPTS)
+        self.attempts_spin = ttk.Spinbox(
+            send_options_frame,
+            from_=1,
+            to=MAX_ATTEMPTS,
+            textvariable=self.attempts_var,
+            width=5
+        )
+        self.attempts_spin.pack(side=tk.LEFT)
+        
+        # Requests per second shared by all workers (0 = unlimited)
+        ttk.Label(send_options_frame, text="Rate limit (req/s):").pack(side=tk.LEFT, padx=(15, 5))
+        self.rate_limit_var = tk.DoubleVar(value=DEFAULT_RATE_LIMIT)
+        self.rate_limit_spin = ttk.Spinbox(
+            send_options_frame,
+            from_=0,
+            to=100,
+            increment=1,
+            textvariable=self.rate_limit_var,
+            width=5
+        )
+        self.rate_limit_spin.pack(side=tk.LEFT)
+        
+        # Skip events recorded in the local sent-events index
+        self.skip_sent_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            config_frame,
+            text="Skip events already sent",
+            variable=self.skip_sent_var
+        ).grid(row=3, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        
+        # Read the calendar first and send only new or changed events
+        self.sync_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            config_frame,
+            text="Sync with calendar (send only new and changed events)",
+            variable=self.sync_var
+        ).grid(row=4, column=0, columnspan=2, sticky="w")
+        
+        # Send regular runs of identical events as one recurring series
+        self.fold_series_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            config_frame,
+            text="Fold repeating events into recurring series",
+            variable=self.fold_series_var
+        ).grid(row=5, column=0, columnspan=2, sticky="w")
+        
         # Configuration buttons
         buttons_frame = ttk.Frame(config_frame)
-        buttons_frame.grid(row=2, column=1, sticky="e", pady=(10, 0))
+        buttons_frame.grid(row=3, column=1, sticky="e", pady=(10, 0))
         
         ttk.Button(
             buttons_frame, 
@@ -103,8 +238,10 @@ class GoogleCalendarGUI:
         
         ttk.Button(buttons_frame, text="Insert Test Template", 
                   command=self.insert_test_template).pack(side="left", padx=(0, 5))
-        ttk.Button(buttons_frame, text="Load JSON from file…", 
+        ttk.Button(buttons_frame, text="Load from file…", 
                   command=self.load_json_file).pack(side="left", padx=5)
+        ttk.Button(buttons_frame, text="Send file directly…", 
+                  command=self.send_file_directly).pack(side="left", padx=5)
         ttk.Button(buttons_frame, text="Format JSON", 
                   command=self.format_json).pack(side="left", padx=5)
         ttk.Button(buttons_frame, text="Clear", 
@@ -119,14 +256,34 @@ class GoogleCalendarGUI:
         )
         self.json_editor.grid(row=1, column=0, sticky="nsew")
         
-        # Send button
+        # Send controls
+        send_frame = ttk.Frame(editor_frame)
+        send_frame.grid(row=2, column=0, sticky="ew", pady=(10, 0))
+        send_frame.grid_columnconfigure(2, weight=1)
+        
         self.send_btn = ttk.Button(
-            editor_frame, 
+            send_frame, 
             text="Send to Web App", 
             command=self.send_to_webapp,
             style="Accent.TButton"
         )
-        self.send_btn.grid(row=2, column=0, pady=(10, 0))
+        self.send_btn.grid(row=0, column=0)
+        
+        self.cancel_btn = ttk.Button(
+            send_frame,
+            text="Cancel",
+            command=self.cancel_send,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.grid(row=0, column=1, padx=(5, 0))
+        
+        # Progress of the current batch
+        self.progress = ttk.Progressbar(send_frame, mode="determinate")
+        self.progress.grid(row=0, column=2, sticky="ew", padx=(10, 0))
+        
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(send_frame, textvariable=self.progress_var, width=32).grid(
+            row=0, column=3, sticky="e", padx=(10, 0))
         
     def create_response_section(self):
         """Create the response section."""
@@ -136,15 +293,32 @@ class GoogleCalendarGUI:
         response_frame.grid_columnconfigure(0, weight=1)
         response_frame.grid_rowconfigure(0, weight=1)
         
+        # Summary text and per-event results table
+        self.response_tabs = ttk.Notebook(response_frame)
+        self.response_tabs.grid(row=0, column=0, sticky="nsew")
+        
         # Response area
+        self.summary_tab = ttk.Frame(self.response_tabs)
+        self.summary_tab.grid_columnconfigure(0, weight=1)
+        self.summary_tab.grid_rowconfigure(0, weight=1)
         self.response_text = scrolledtext.ScrolledText(
-            response_frame, 
+            self.summary_tab, 
             height=8, 
             font=("Consolas", 9),
             state=tk.DISABLED,
             wrap=tk.WORD
         )
         self.response_text.grid(row=0, column=0, sticky="nsew")
+        self.response_tabs.add(self.summary_tab, text="Summary")
+        
+        # Rows are added as results arrive; bodies render when a row is expanded
+        self.results_view = ResultsView(
+            self.response_tabs,
+            on_edit=self.edit_results,
+            on_delete=self.delete_results,
+            padding=5
+        )
+        self.response_tabs.add(self.results_view, text="Events")
         
     def create_status_bar(self):
         """Create the status bar."""
@@ -157,20 +331,58 @@ class GoogleCalendarGUI:
         """Load configuration from .env file."""
         try:
             if os.path.exists('.env'):
+                from dotenv import load_dotenv
                 load_dotenv()
                 self.url_var.set(os.getenv('WEB_APP_URL', ''))
                 calendar_id = os.getenv('CALENDAR_ID', 'primary')
                 self.calendar_var.set(calendar_id)
+                self.workers_var.set(clamp_workers(os.getenv('SEND_WORKERS', DEFAULT_WORKERS)))
+                self.chunk_size_var.set(clamp_chunk_size(os.getenv('CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+                self.attempts_var.set(clamp_attempts(os.getenv('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)))
+                self.rate_limit_var.set(clamp_rate_limit(os.getenv('RATE_LIMIT', DEFAULT_RATE_LIMIT)))
+                self.skip_sent_var.set(os.getenv('SKIP_SENT', '1') != '0')
+                self.sync_var.set(os.getenv('SYNC_CALENDAR', '0') == '1')
+                self.fold_series_var.set(os.getenv('FOLD_SERIES', '0') == '1')
+                calendar_workers = os.getenv('CALENDAR_WORKERS', '')
+                self.calendar_workers = clamp_workers(calendar_workers) if calendar_workers else None
+                self.calendar_rate_limit = clamp_rate_limit(os.getenv('CALENDAR_RATE_LIMIT', 0))
+                self.csv_columns = os.getenv('CSV_COLUMNS', '')
+                self.extra_endpoints = os.getenv('WEB_APP_ENDPOINTS', '')
+                self.compress = os.getenv('COMPRESS_REQUESTS', '1') != '0'
+                self.minimal_responses = os.getenv('MINIMAL_RESPONSES', '1') != '0'
                 self.update_status("Configuration loaded from .env file")
         except Exception as e:
             logging.error(f"Error loading configuration: {e}")
             self.update_status("Error loading configuration")
             
+    def setup_metrics(self):
+        """Collect request timings; METRICS_FILE and METRICS_PORT in .env export them."""
+        path = os.getenv('METRICS_FILE', '')
+        try:
+            self.metrics = SendMetrics(path or None)
+        except OSError as e:
+            logging.error(f"Error opening metrics file {path}: {e}")
+            self.metrics = SendMetrics()
+        port = clamp_port(os.getenv('METRICS_PORT', 0))
+        if port:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, port)
+            except OSError as e:
+                logging.error(f"Error starting metrics endpoint on port {port}: {e}")
+            
     def save_config(self):
         """Save configuration to .env file."""
         try:
+            from dotenv import set_key
             set_key('.env', 'WEB_APP_URL', self.url_var.get())
             set_key('.env', 'CALENDAR_ID', self.calendar_var.get())
+            set_key('.env', 'SEND_WORKERS', str(self.get_workers()))
+            set_key('.env', 'CHUNK_SIZE', str(self.get_chunk_size()))
+            set_key('.env', 'MAX_ATTEMPTS', str(self.get_max_attempts()))
+            set_key('.env', 'RATE_LIMIT', str(self.get_rate_limit()))
+            set_key('.env', 'SKIP_SENT', '1' if self.skip_sent_var.get() else '0')
+            set_key('.env', 'SYNC_CALENDAR', '1' if self.sync_var.get() else '0')
+            set_key('.env', 'FOLD_SERIES', '1' if self.fold_series_var.get() else '0')
             self.update_status("Configuration saved to .env file")
             messagebox.showinfo("Success", "Configuration saved successfully!")
         except Exception as e:
@@ -187,31 +399,78 @@ class GoogleCalendarGUI:
             "location": "Test Location"
         }
         
+        self.exit_stream_mode()
         self.json_editor.delete(1.0, tk.END)
         self.json_editor.insert(1.0, json.dumps(template, indent=2, ensure_ascii=False))
         
     def load_json_file(self):
-        """Load a JSON file."""
+        """Load a JSON file, or convert a CSV / iCalendar file, into the editor."""
         file_path = filedialog.askopenfilename(
-            title="Select JSON file",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            title="Select events file",
+            filetypes=[("JSON files", "*.json")] + STREAM_FILE_TYPES[2:]
         )
         
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Validate JSON
-                    json.loads(content)
-                    self.json_editor.delete(1.0, tk.END)
-                    self.json_editor.insert(1.0, content)
-                    self.update_status(f"File loaded: {os.path.basename(file_path)}")
+                if file_format(file_path) != 'json':
+                    # Converted to JSON; large files are better sent with "Send File Directly"
+                    events = list(iter_events_from_file(file_path, parse_column_map(self.csv_columns)))
+                    content = json.dumps(events, indent=2, ensure_ascii=False)
+                    self.cache_parsed(content, events)
+                else:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                    # Validate JSON (kept for the send, keyed by the editor text)
+                    self.parse_editor_content(content.strip())
+                self.exit_stream_mode()
+                self.json_editor.delete(1.0, tk.END)
+                self.json_editor.insert(1.0, content)
+                self.update_status(f"File loaded: {os.path.basename(file_path)}")
             except json.JSONDecodeError as e:
                 messagebox.showerror("Error", f"Invalid JSON file: {e}")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid events file: {e}")
             except Exception as e:
                 logging.error(f"Error loading file: {e}")
                 messagebox.showerror("Error", f"Error loading file: {e}")
                 
+    def send_file_directly(self):
+        """Stream events from a large JSON, JSON Lines, CSV or iCalendar file straight to the Web App."""
+        file_path = filedialog.askopenfilename(
+            title="Select events file to send",
+            filetypes=STREAM_FILE_TYPES
+        )
+        if not file_path:
+            return
+            
+        try:
+            preview = preview_events(file_path, column_map=parse_column_map(self.csv_columns))
+        except (ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Invalid events file: {e}")
+            return
+        except Exception as e:
+            logging.error(f"Error reading file: {e}")
+            messagebox.showerror("Error", f"Error reading file: {e}")
+            return
+            
+        # The editor only shows a read-only preview; the file is read again while sending
+        self.stream_path = file_path
+        self.json_editor.config(state=tk.NORMAL)
+        self.json_editor.delete(1.0, tk.END)
+        self.json_editor.insert(1.0, json.dumps(preview, indent=2, ensure_ascii=False))
+        self.json_editor.config(state=tk.DISABLED)
+        name = os.path.basename(file_path)
+        self.update_status(f"Direct send: {name} (preview of the first {len(preview)} event(s))")
+        
+        if messagebox.askyesno("Send file", f"Send all events from {name} to the Web App?"):
+            self.send_to_webapp()
+            
+    def exit_stream_mode(self):
+        """Return the editor to normal editing after a direct file send."""
+        if self.stream_path is not None:
+            self.stream_path = None
+            self.json_editor.config(state=tk.NORMAL)
+            
     def format_json(self):
         """Format JSON in the editor."""
         try:
@@ -221,8 +480,9 @@ class GoogleCalendarGUI:
                 return
                 
             # Validate and format JSON
-            parsed = json.loads(content)
+            parsed = self.parse_editor_content(content)
             formatted = json.dumps(parsed, indent=2, ensure_ascii=False)
+            self.cache_parsed(formatted, parsed)
             
             self.json_editor.delete(1.0, tk.END)
             self.json_editor.insert(1.0, formatted)
@@ -234,8 +494,27 @@ class GoogleCalendarGUI:
             logging.error(f"Error formatting JSON: {e}")
             messagebox.showerror("Error", f"Error formatting JSON: {e}")
             
+    def content_digest(self, content):
+        """Return the digest that keys the parse cache."""
+        from hashlib import blake2b
+        return blake2b(content.encode('utf-8'), digest_size=16).digest()
+        
+    def parse_editor_content(self, content):
+        """Parse editor text, reusing the previous parse while the text is unchanged."""
+        digest = self.content_digest(content)
+        if self.parsed_cache is not None and self.parsed_cache[0] == digest:
+            return self.parsed_cache[1]
+        parsed = json_loads(content)
+        self.parsed_cache = (digest, parsed)
+        return parsed
+        
+    def cache_parsed(self, content, parsed):
+        """Remember the parsed document for editor text produced from it."""
+        self.parsed_cache = (self.content_digest(content), parsed)
+        
     def clear_json(self):
         """Clear the JSON editor."""
+        self.exit_stream_mode()
         self.json_editor.delete(1.0, tk.END)
         self.update_status("Editor cleared")
         
@@ -246,6 +525,13 @@ class GoogleCalendarGUI:
             messagebox.showerror("Error", "Web App URL is required")
             return
 
+        # Direct file mode: stream events from disk instead of the editor
+        if self.stream_path is not None:
+            path = self.stream_path
+            column_map = parse_column_map(self.csv_columns)
+            self.start_send(lambda: iter_events_from_file(path, column_map), total=None, source=path)
+            return
+
         # Read and validate JSON
         try:
             content = self.json_editor.get(1.0, tk.END).strip()
@@ -253,7 +539,7 @@ class GoogleCalendarGUI:
                 messagebox.showerror("Error", "JSON editor is empty")
                 return
 
-            parsed = json.loads(content)
+            parsed = self.parse_editor_content(content)
         except json.JSONDecodeError as e:
             messagebox.showerror("Error", f"Invalid JSON: {e}")
             return
@@ -263,92 +549,477 @@ class GoogleCalendarGUI:
 
         # Prepare list of events to send
         try:
-            events_to_send = []
-
-            if isinstance(parsed, list):
-                # Top-level array of events
-                if not parsed:
-                    raise ValueError("Event list is empty")
-                events_to_send = parsed
-            elif isinstance(parsed, dict):
-                if 'events' in parsed:
-                    # Object with 'events' key (list)
-                    events = parsed.get('events')
-                    if not isinstance(events, list) or not events:
-                        raise ValueError("'events' must be a list with at least one event")
-                    events_to_send = events
-                else:
-                    # Single event as object
-                    events_to_send = [parsed]
-            else:
-                raise ValueError("JSON must be an object or a list of events")
-
+            events_to_send = extract_events(parsed)
         except Exception as e:
             messagebox.showerror("Error", f"Error preparing events: {e}")
             return
 
-        # Send events (one POST per event)
-        self.update_status("Sending events...")
+        # Pre-flight validation: report every invalid event before any request
+        invalid = validate_events(events_to_send)
+        if invalid:
+            self.show_error_response(
+                f"{len(invalid)} invalid event(s):\n{format_validation_errors(invalid)}"
+            )
+            valid_count = len(events_to_send) - len(invalid)
+            if not valid_count:
+                messagebox.showerror("Error", "No valid events to send (see Response)")
+                return
+            if not messagebox.askyesno(
+                "Invalid events",
+                f"{len(invalid)} of {len(events_to_send)} event(s) are invalid (see Response).\n"
+                f"Send the {valid_count} valid event(s)?"
+            ):
+                return
+
+        indexed = False
+        if self.fold_series_var.get():
+            # Folded events keep their editor positions, like the validation above;
+            # as indexed events they name their calendar themselves
+            calendar_id = self.get_calendar_id()
+            if calendar_id:
+                events_to_send = [
+                    dict(event, calendarId=calendar_id)
+                    if isinstance(event, dict) and not event.get('calendarId') else event
+                    for event in events_to_send
+                ]
+            events_to_send, series = compress_series(events_to_send)
+            indexed = True
+            if series:
+                folded = sum(len(indexes) for indexes in series.values())
+                logging.info(f"Folded {folded} event(s) into {len(series)} recurring series")
+                for line in format_series(series):
+                    logging.info(f"Folded {line}")
+
+        if self.sync_var.get():
+            self.start_sync(events_to_send, indexed)
+            return
+
+        self.start_send(lambda: events_to_send, total=len(events_to_send), source="editor", indexed=indexed)
+        
+    def start_sync(self, events, indexed=False):
+        """Read the events already in the calendar for this range, then diff in the background."""
+        url = self.url_var.get()
+        session = self.get_session()
+        calendar_id = self.get_calendar_id()
+        self.sending = True
         self.send_btn.config(state=tk.DISABLED)
+        self.update_status("Reading existing events from the calendar...")
+        from gcal_sync import plan_sync
+        read_url = self.get_endpoints(url, session).healthy_url()
+        self.run_in_background(
+            lambda: plan_sync(session, read_url, events, calendar_id, indexed),
+            lambda plan: self.on_sync_planned(events, plan),
+            self.on_sync_error
+        )
+        
+    def on_sync_planned(self, events, plan):
+        """Confirm and send the creates and updates found by the calendar diff."""
+        from gcal_sync import CREATE, DELETE, UNCHANGED, UPDATE
+        to_send, settled, counts = plan
+        self.sending = False
+        self.send_btn.config(state=tk.NORMAL)
+        summary = (f"{counts[CREATE]} to create, {counts[UPDATE]} to update, "
+                   f"{counts[DELETE]} to delete, {counts[UNCHANGED]} already in the calendar")
+        self.update_status(f"Sync: {summary}")
+        if not to_send:
+            messagebox.showinfo("Sync", f"Nothing to send: all {len(events)} event(s) are already in the calendar")
+            return
+        if not messagebox.askyesno("Sync", f"{summary}.\nSend {len(to_send)} event(s)?"):
+            return
+        self.start_send(lambda: to_send, total=len(events), source="editor (sync)",
+                        indexed=True, settled=settled)
+        
+    def on_sync_error(self, error):
+        """Report a failed calendar read; nothing was sent."""
+        logging.error(f"Sync error: {error}")
+        self.sending = False
+        self.send_btn.config(state=tk.NORMAL)
+        self.show_error_response(f"Could not read existing events: {error}")
+        messagebox.showerror("Sync", f"Could not read existing events: {error}")
+        
+    def start_send(self, make_events, total, url=None, batch_id=None, source=None,
+                   indexed=False, settled=None):
+        """Send events in the background.
 
-        headers = {
-            'Content-Type': 'application/json'
-        }
+        make_events is called on the worker thread and returns the events
+        (a list or a lazy iterator, of (index, event) pairs when indexed);
+        total is None when the count is unknown. settled entries are
+        reported without a request. Every event is journalled in the outbox;
+        pass the batch_id of an unfinished batch (with make_events=None) to
+        resume it.
+        """
+        # One POST per event (or per chunk), several in flight at once
+        self.start_batch(total)
+        url = url or self.url_var.get()
+        workers = self.get_workers()
+        chunk_size = self.get_chunk_size()
+        session = self.get_session(workers)
+        endpoints = self.get_endpoints(url, session)
+        retry_policy = RetryPolicy(max_attempts=self.get_max_attempts())
+        rate_limit = self.get_rate_limit()
+        if rate_limit != self.rate_limiter.rate:
+            self.rate_limiter.set_rate(rate_limit)
+        dedup_index = self.get_dedup_index() if self.skip_sent_var.get() else None
+        # Indexed events (resumed, synced, edited) already name their calendar
+        calendar_id = self.get_calendar_id() if not indexed and make_events is not None else None
+        outbox = self.get_outbox()
+        indexed = indexed or make_events is None
+        if outbox is not None and batch_id is None:
+            try:
+                batch_id = outbox.create_batch(url, source)
+            except Exception as e:
+                logging.error(f"Error creating outbox batch: {e}")
+                outbox = None
+        self.results_batch_id = batch_id if outbox is not None else None
+
+        from gcal_sender import send_events
 
-        results = []
+        def work():
+            events = outbox.iter_queued(batch_id) if make_events is None else make_events()
+            return send_events(
+                endpoints,
+                events,
+                workers=workers,
+                on_result=lambda entry: self.post_to_ui(self.on_event_result, entry),
+                cancel_event=self.cancel_event,
+                chunk_size=chunk_size,
+                session=session,
+                retry_policy=retry_policy,
+                rate_limiter=self.rate_limiter,
+                dedup_index=dedup_index,
+                keep_results=False,
+                outbox=outbox,
+                batch_id=batch_id,
+                indexed=indexed,
+                metrics=self.metrics,
+                settled=settled,
+                calendar_id=calendar_id,
+                calendar_workers=self.calendar_workers,
+                calendar_rate_limit=self.calendar_rate_limit,
+                compress=self.compress,
+                minimal_responses=self.minimal_responses
+            )
+
+        self.run_in_background(work, self.on_batch_done, self.on_batch_error)
+        
+    def start_batch(self, total):
+        """Reset progress widgets for a new batch."""
+        self.cancel_event.clear()
+        self.batch_total = total
+        self.batch_done = 0
+        self.batch_ok = 0
+        self.batch_failed = 0
+        self.sending = True
+        self.results_view.clear()
+        if total is None:
+            # Streaming: the number of events is only known at the end
+            self.progress.config(mode="indeterminate")
+            self.progress.start(50)
+            self.progress_var.set("0")
+        else:
+            self.progress.config(mode="determinate", maximum=total, value=0)
+            self.progress_var.set(f"0/{total}")
+        self.send_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.update_status(f"Sending {total} event(s)..." if total is not None else "Sending events from file...")
+        
+    def on_event_result(self, entry):
+        """Update the rolling counters with one finished event."""
+        if entry.get('cancelled'):
+            return
+        self.results_view.add(entry)
+        self.batch_done += 1
+        if entry.get('ok'):
+            self.batch_ok += 1
+        else:
+            self.batch_failed += 1
+        if self.batch_total is None:
+            done = f"{self.batch_done}"
+        else:
+            self.progress.config(value=self.batch_done)
+            done = f"{self.batch_done}/{self.batch_total}"
+        self.progress_var.set(f"{done} | OK {self.batch_ok} | Failed {self.batch_failed}")
+        
+    def on_batch_done(self, outcome):
+        """Show the batch report once every event has finished."""
+        _, stats = outcome
+        cancelled = stats['cancelled'] or self.cancel_event.is_set()
+        self.finish_batch()
+        self.show_batch_response(stats)
+        if stats['queued'] and not cancelled:
+            # Events failed for lack of a (good) response: retry once the Web App answers
+            self.resuming = False
+            self.update_status(f"{stats['queued']} event(s) queued - retrying when the Web App is reachable")
+            self.schedule_outbox_flush()
+            return
+        if self.resuming and not cancelled:
+            if self.resume_outbox():
+                return
+        self.resuming = False
+        if stats.get('input_error'):
+            messagebox.showerror("Error", f"Stopped reading events: {stats['input_error']}")
+            self.update_status("Send stopped: invalid events in file")
+        elif cancelled:
+            self.update_status(f"Send cancelled ({stats['cancelled']} queued event(s) not sent)")
+        else:
+            self.update_status(f"Send completed ({stats['events_per_sec']:.1f} events/s)")
+            
+    def sent_results(self, indexes):
+        """Return [(index, event, eventId)] for the listed events the Web App accepted."""
+        outbox = self.get_outbox()
+        if self.sending or outbox is None or self.results_batch_id is None:
+            return []
+        outbox.flush()
+        return outbox.sent_events(self.results_batch_id, indexes)
+        
+    def edit_results(self, indexes):
+        """Load the selected sent events into the editor as 'update' actions."""
+        found = self.sent_results(indexes)
+        if not found:
+            messagebox.showinfo("Edit events", "No sent events with an eventId in the selection")
+            return
+        document = {"events": [mutation_event(event, event_id, 'update') for _, event, event_id in found]}
+        self.exit_stream_mode()
+        self.json_editor.delete(1.0, tk.END)
+        self.json_editor.insert(1.0, json.dumps(document, indent=2, ensure_ascii=False))
+        self.update_status(f"{len(found)} event(s) loaded as updates - edit them and press Send")
+        
+    def delete_results(self, indexes):
+        """Delete the selected sent events from the calendar in one batch."""
+        found = self.sent_results(indexes)
+        if not found:
+            messagebox.showinfo("Delete events", "No sent events with an eventId in the selection")
+            return
+        if not messagebox.askyesno("Delete events", f"Delete {len(found)} event(s) from the calendar?"):
+            return
+        deletes = [(idx, mutation_event(event, event_id, 'delete')) for idx, event, event_id in found]
+        self.start_send(lambda: deletes, total=len(deletes), source="delete", indexed=True)
+        
+    def on_batch_error(self, error):
+        """Report an unexpected failure of the send engine."""
+        logging.error(f"Batch send error: {error}")
+        self.resuming = False
+        self.finish_batch()
+        self.show_error_response(f"Batch send error: {error}")
+        
+    def finish_batch(self):
+        """Re-enable the send controls."""
+        if self.batch_total is None:
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=max(1, self.batch_done), value=self.batch_done)
+        self.sending = False
+        self.send_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        
+    def cancel_send(self):
+        """Stop sending queued events; requests already in flight finish normally."""
+        self.cancel_event.set()
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.update_status("Cancelling...")
+        
+    def run_in_background(self, work, on_done, on_error):
+        """Run work() on a worker thread and hand its outcome back to the Tk thread."""
+        def runner():
+            try:
+                outcome = work()
+            except Exception as e:
+                self.post_to_ui(on_error, e)
+            else:
+                self.post_to_ui(on_done, outcome)
+
+        threading.Thread(target=runner, daemon=True).start()
+        
+    def post_to_ui(self, callback, *args):
+        """Queue a callback to run on the Tk thread (safe from any thread)."""
+        self.ui_queue.put((callback, args))
+        
+    def poll_ui_queue(self):
+        """Run queued UI callbacks without blocking the event loop."""
+        try:
+            for _ in range(UI_POLL_BATCH):
+                callback, args = self.ui_queue.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logging.error(f"UI update error: {e}")
+        self.root.after(UI_POLL_MS, self.poll_ui_queue)
+        
+    def get_session(self, workers=None):
+        """Return the shared HTTP session, resized when the worker count grows."""
+        pool_size = workers or self.get_workers()
+        if self.session is None or self.session.pool_size < pool_size:
+            if self.session is not None:
+                # Requests still in flight keep their connections until they finish
+                self.session.close()
+            from gcal_sender import WebAppSession
+            self.session = WebAppSession(pool_size=pool_size)
+        return self.session
+        
+    def get_endpoints(self, url, session):
+        """Return the endpoint pool of url plus WEB_APP_ENDPOINTS, kept while they are unchanged.
+
+        Keeping the pool carries endpoint health over from one batch to the next.
+        """
+        from gcal_endpoints import EndpointPool, parse_endpoints
+        urls = parse_endpoints(url, self.extra_endpoints)
+        if self.endpoint_pool is None or self.endpoint_pool.urls != urls:
+            if self.endpoint_pool is not None:
+                self.endpoint_pool.close()
+            self.endpoint_pool = EndpointPool(urls, session)
+        self.endpoint_pool.session = session
+        return self.endpoint_pool
+        
+    def get_dedup_index(self):
+        """Return the local index of events already sent, opening it on first use."""
+        if self.dedup_index is None:
+            try:
+                from gcal_store import DEDUP_DB_FILE, DedupIndex
+                self.dedup_index = DedupIndex(DEDUP_DB_FILE)
+            except Exception as e:
+                logging.error(f"Error opening sent events index: {e}")
+                self.update_status("Sent events index unavailable - sending everything")
+        return self.dedup_index
+        
+    def get_outbox(self):
+        """Return the durable outbox, opening it on first use (None if unavailable)."""
+        if self.outbox is None:
+            try:
+                from gcal_store import OUTBOX_DB_FILE, Outbox
+                self.outbox = Outbox(OUTBOX_DB_FILE)
+            except Exception as e:
+                logging.error(f"Error opening outbox: {e}")
+                self.update_status("Outbox unavailable - interrupted sends cannot be resumed")
+        return self.outbox
+        
+    def check_outbox(self):
+        """Offer to resume batches left unfinished by a crash or lost connection."""
+        outbox = self.get_outbox()
+        if outbox is None:
+            return
+        try:
+            outbox.purge_finished()
+            unfinished = outbox.unfinished_batches()
+        except Exception as e:
+            logging.error(f"Error reading outbox: {e}")
+            return
+        if not unfinished:
+            return
+        queued = sum(batch['queued'] for batch in unfinished)
+        if messagebox.askyesno(
+            "Unfinished send",
+            f"{queued} event(s) from {len(unfinished)} earlier batch(es) were not sent.\n"
+            f"Send them now?"
+        ):
+            self.resuming = True
+            self.resume_outbox()
+        else:
+            self.update_status(f"{queued} event(s) waiting in the outbox")
+            
+    def resume_outbox(self):
+        """Resume the oldest unfinished batch; returns False when nothing is queued."""
+        outbox = self.get_outbox()
+        if outbox is None or self.sending:
+            return False
+        try:
+            unfinished = outbox.unfinished_batches()
+        except Exception as e:
+            logging.error(f"Error reading outbox: {e}")
+            return False
+        if not unfinished:
+            return False
+        batch = unfinished[0]
+        self.start_send(None, total=batch['queued'], url=batch['url'], batch_id=batch['id'])
+        self.update_status(f"Resuming {batch['queued']} queued event(s) from {batch['created_at']}...")
+        return True
+        
+    def schedule_outbox_flush(self):
+        """Probe the Web App periodically until queued events can be sent."""
+        if self.outbox_job is None:
+            self.outbox_job = self.root.after(OUTBOX_RETRY_MS, self.probe_connectivity)
+            
+    def probe_connectivity(self):
+        """Check in the background whether the Web App answers again."""
+        self.outbox_job = None
+        if self.sending:
+            self.schedule_outbox_flush()
+            return
+        try:
+            unfinished = self.get_outbox().unfinished_batches()
+        except Exception as e:
+            logging.error(f"Error reading outbox: {e}")
+            return
+        if not unfinished:
+            return
+        url = unfinished[0]['url']
+        session = self.get_session()
+        self.run_in_background(
+            lambda: session.get(url, timeout=10),
+            self.on_connectivity_probe,
+            lambda error: self.schedule_outbox_flush()
+        )
+        
+    def on_connectivity_probe(self, response):
+        """Flush the outbox once the Web App responds; keep probing otherwise."""
+        if response.status_code >= 500 or response.status_code == 429:
+            self.schedule_outbox_flush()
+            return
+        self.resuming = True
+        if not self.resume_outbox():
+            self.resuming = False
+        
+    def on_close(self):
+        """Stop pending sends and close the window."""
+        self.cancel_event.set()
+        if self.endpoint_pool is not None:
+            self.endpoint_pool.close()
+        if self.session is not None:
+            self.session.close()
+        if self.outbox is not None:
+            try:
+                self.outbox.flush()
+            except Exception as e:
+                logging.error(f"Error updating outbox: {e}")
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        self.metrics.flush()
+        self.root.destroy()
+            
+    def get_workers(self):
+        """Return the configured number of concurrent requests."""
+        try:
+            return clamp_workers(self.workers_var.get())
+        except tk.TclError:
+            return DEFAULT_WORKERS
+            
+    def get_chunk_size(self):
+        """Return the configured number of events per request."""
+        try:
+            return clamp_chunk_size(self.chunk_size_var.get())
+        except tk.TclError:
+            return DEFAULT_CHUNK_SIZE
+            
+    def get_max_attempts(self):
+        """Return the configured number of attempts per request."""
         try:
-            logging.info(f"Sending {len(events_to_send)} event(s) to: {self.url_var.get()}")
-            logging.info(f"Headers: Content-Type={headers['Content-Type']}")
-
-            for idx, event_payload in enumerate(events_to_send, start=1):
-                try:
-                    # Detailed log per event (no sensitive data)
-                    logging.info(f"[Event {idx}] Payload: {json.dumps(event_payload, ensure_ascii=False)}")
-
-                    response = requests.post(
-                        self.url_var.get(),
-                        headers=headers,
-                        data=json.dumps(event_payload, ensure_ascii=False),
-                        timeout=20,
-                        verify=True
-                    )
-
-                    result_entry = {
-                        'index': idx,
-                        'status_code': response.status_code,
-                        'ok': 200 <= response.status_code < 300,
-                        'body': None,
-                    }
-                    try:
-                        result_entry['body'] = response.json()
-                    except Exception:
-                        result_entry['body'] = response.text
-
-                    results.append(result_entry)
-                except requests.exceptions.Timeout:
-                    logging.error(f"[Event {idx}] Timeout")
-                    results.append({'index': idx, 'status_code': 0, 'ok': False, 'body': 'Timeout'})
-                except requests.exceptions.ConnectionError:
-                    logging.error(f"[Event {idx}] Connection error")
-                    results.append({'index': idx, 'status_code': 0, 'ok': False, 'body': 'Connection error'})
-                except requests.exceptions.RequestException as e:
-                    logging.error(f"[Event {idx}] Request error: {e}")
-                    results.append({'index': idx, 'status_code': 0, 'ok': False, 'body': f'Request error: {e}'})
-                except Exception as e:
-                    logging.error(f"[Event {idx}] Unexpected error: {e}")
-                    results.append({'index': idx, 'status_code': 0, 'ok': False, 'body': f'Unexpected error: {e}'})
-
-            # Show aggregated result
-            self.show_batch_response(results)
-
-
-            self.update_status("Send completed")
-
-        finally:
-            self.send_btn.config(state=tk.NORMAL)
+            return clamp_attempts(self.attempts_var.get())
+        except tk.TclError:
+            return DEFAULT_MAX_ATTEMPTS
+            
+    def get_calendar_id(self):
+        """Return the calendar for events without a calendarId (None = default calendar)."""
+        return self.calendar_var.get().strip() or None
+        
+    def get_rate_limit(self):
+        """Return the configured requests per second (0 = unlimited)."""
+        try:
+            return clamp_rate_limit(self.rate_limit_var.get())
+        except tk.TclError:
+            return DEFAULT_RATE_LIMIT
             
     def show_response(self, response):
         """Show the request response."""
+        self.response_tabs.select(self.summary_tab)
         self.response_text.config(state=tk.NORMAL)
         self.response_text.delete(1.0, tk.END)
         
@@ -368,12 +1039,13 @@ class GoogleCalendarGUI:
         self.response_text.insert(tk.END, response_text)
         self.response_text.config(state=tk.DISABLED)
 
-    def show_batch_response(self, results):
-        """Show an aggregated summary of responses per event."""
-        total = len(results)
-        succeeded = sum(1 for r in results if r.get('ok'))
-        failed = total - succeeded
+    def show_batch_response(self, stats):
+        """Show an aggregated summary; per-event rows are already in the Events tab."""
+        total = stats['total']
+        failed = stats['failed']
+        succeeded = total - failed - stats['cancelled']
 
+        self.response_tabs.select(self.summary_tab)
         self.response_text.config(state=tk.NORMAL)
         self.response_text.delete(1.0, tk.END)
 
@@ -381,27 +1053,68 @@ class GoogleCalendarGUI:
             f"Total events: {total}",
             f"Success: {succeeded}",
             f"Failures: {failed}",
+        ]
+        if stats.get('input_error'):
+            summary.append(f"Stopped reading events: {stats['input_error']}")
+        if stats.get('invalid'):
+            summary.append(f"Invalid (not sent): {stats['invalid']}")
+        if stats.get('skipped'):
+            summary.append(f"Skipped (already sent): {stats['skipped']}")
+        if stats.get('cancelled'):
+            summary.append(f"Cancelled (not sent): {stats['cancelled']}")
+        if stats.get('queued'):
+            summary.append(f"Queued in outbox for a later resume: {stats['queued']}")
+        summary.append(
+            f"Elapsed: {stats['elapsed']:.2f}s with {stats['workers']} worker(s), "
+            f"{stats['chunk_size']} event(s) per request "
+            f"({stats['events_per_sec']:.1f} events/s)"
+        )
+        if len(stats.get('calendars') or ()) > 1:
+            summary.append(f"Calendars: {', '.join(stats['calendars'])}")
+        if len(stats.get('endpoints') or ()) > 1:
+            summary.append("Endpoints:")
+            for endpoint in stats['endpoints']:
+                summary.append(
+                    f"  {endpoint['url']}: {endpoint['requests']} request(s), {endpoint['errors']} failed"
+                    f"{'' if endpoint['healthy'] else ' (unhealthy)'}"
+                )
+        if stats.get('retried'):
+            summary.append(
+                f"Retried: {stats['retried']} event(s), {stats['backoff']:.1f}s total in backoff"
+            )
+        if stats.get('request_bytes'):
+            summary.append(
+                f"Transferred: {stats['request_bytes'] / 1024:.0f} KiB sent, "
+                f"{stats['response_bytes'] / 1024:.0f} KiB received"
+            )
+        conn = stats.get('connection')
+        if conn and conn['requests']:
+            summary.append(
+                f"Connections: {conn['connections']} opened, {conn['reused']} reused "
+                f"for {conn['requests']} request(s)"
+            )
+            summary.append(
+                f"Connection setup per new connection: DNS {conn['dns'] * 1000:.0f} ms, "
+                f"TCP {conn['tcp'] * 1000:.0f} ms, TLS {conn['tls'] * 1000:.0f} ms; "
+                f"redirect {conn['redirect'] * 1000:.0f} ms per request"
+            )
+            summary.append(
+                f"Estimated time saved by keep-alive: {conn['saved_per_request'] * 1000:.0f} ms per request"
+            )
+        timing = format_timing_summary(stats.get('timing'))
+        if timing:
+            summary += [""] + timing
+        summary += [
             "",
-            "Details per event:",
+            "Details per event: see the Events tab (expand a row for its response body)",
         ]
 
-        for r in results:
-            idx = r.get('index')
-            status = r.get('status_code')
-            ok_flag = 'OK' if r.get('ok') else 'FAILED'
-            body = r.get('body')
-            try:
-                body_text = json.dumps(body, ensure_ascii=False, indent=2) if isinstance(body, (dict, list)) else str(body)
-            except Exception:
-                body_text = str(body)
-            summary.append(f"--- Event {idx} | HTTP {status} | {ok_flag}")
-            summary.append(body_text)
-
         self.response_text.insert(tk.END, "\n".join(summary))
         self.response_text.config(state=tk.DISABLED)
         
     def show_error_response(self, error_msg):
         """Show an error message in the response area."""
+        self.response_tabs.select(self.summary_tab)
         self.response_text.config(state=tk.NORMAL)
         self.response_text.delete(1.0, tk.END)
         self.response_text.insert(tk.END, f"ERROR: {error_msg}")
@@ -439,6 +1152,7 @@ class GoogleCalendarGUI:
             
     def show_debug_info(self):
         """Show debug information about current configuration."""
+        from gcal_store import DEDUP_DB_FILE
         debug_info = f"""
 🔧 DEBUG INFORMATION
 
@@ -449,6 +1163,7 @@ Current Configuration:
 Files:
 • .env exists: {'YES' if os.path.exists('.env') else 'NO'}
 • gcal_gui.log exists: {'YES' if os.path.exists('gcal_gui.log') else 'NO'}
+• {DEDUP_DB_FILE} exists: {'YES' if os.path.exists(DEDUP_DB_FILE) else 'NO'}
 
 JSON in Editor:
 • Content: {'[EMPTY]' if not self.json_editor.get(1.0, tk.END).strip() else '[PRESENT]'}
@@ -518,50 +1233,60 @@ Tips:
             return
             
         self.update_status("Testing Web App...")
+        url = self.url_var.get()
+        session = self.get_session()
         
-        try:
+        def work():
             # Simple GET test
             logging.info("=== DIRECT WEB APP TEST ===")
-            logging.info(f"URL: {self.url_var.get()}")
+            logging.info(f"URL: {url}")
             
-            response = requests.get(self.url_var.get(), timeout=10)
+            response = session.get(url, timeout=10)
             
             logging.info(f"GET Response status: {response.status_code}")
             logging.info(f"GET Response headers: {dict(response.headers)}")
             logging.info(f"GET Response body: {response.text}")
+            return response
             
-            # Show result
-            self.response_text.config(state=tk.NORMAL)
-            self.response_text.delete(1.0, tk.END)
-            
-            result = f"GET Request Result:\n"
-            result += f"HTTP {response.status_code}\n\n"
-            result += f"Headers:\n{json.dumps(dict(response.headers), indent=2)}\n\n"
-            result += f"Body:\n{response.text}"
-            
-            self.response_text.insert(tk.END, result)
-            self.response_text.config(state=tk.DISABLED)
-            
-            if response.status_code == 200:
-                if "doGet" in response.text:
-                    messagebox.showwarning("Warning", 
-                        "Web App responds, but doesn't have doGet() function.\n"
-                        "This is normal - the Web App only accepts POST requests.\n"
-                        "Continue with authentication test.")
-                else:
-                    messagebox.showinfo("Success", "Web App is accessible!")
-                self.update_status("✅ Web App accessible")
+        self.run_in_background(work, self.show_webapp_test_result, self.show_webapp_test_error)
+        
+    def show_webapp_test_result(self, response):
+        """Show the outcome of the direct GET test."""
+        self.response_tabs.select(self.summary_tab)
+        self.response_text.config(state=tk.NORMAL)
+        self.response_text.delete(1.0, tk.END)
+        
+        result = f"GET Request Result:\n"
+        result += f"HTTP {response.status_code}\n\n"
+        result += f"Headers:\n{json.dumps(dict(response.headers), indent=2)}\n\n"
+        result += f"Body:\n{response.text}"
+        
+        self.response_text.insert(tk.END, result)
+        self.response_text.config(state=tk.DISABLED)
+        
+        if response.status_code == 200:
+            if "doGet" in response.text:
+                messagebox.showwarning("Warning", 
+                    "Web App responds, but doesn't have doGet() function.\n"
+                    "This is normal - the Web App only accepts POST requests.\n"
+                    "Continue with authentication test.")
             else:
-                messagebox.showerror("Error", f"Web App returned HTTP {response.status_code}")
-                self.update_status("❌ Web App with problems")
-                
-        except requests.exceptions.ConnectionError:
+                messagebox.showinfo("Success", "Web App is accessible!")
+            self.update_status("✅ Web App accessible")
+        else:
+            messagebox.showerror("Error", f"Web App returned HTTP {response.status_code}")
+            self.update_status("❌ Web App with problems")
+            
+    def show_webapp_test_error(self, error):
+        """Report a failed direct GET test."""
+        import requests
+        if isinstance(error, requests.exceptions.ConnectionError):
             error_msg = "Could not connect to Web App. Check the URL."
             logging.error(error_msg)
             messagebox.showerror("Connection Error", error_msg)
             self.update_status("❌ Connection error")
-        except Exception as e:
-            error_msg = f"Test error: {e}"
+        else:
+            error_msg = f"Test error: {error}"
             logging.error(error_msg)
             messagebox.showerror("Error", error_msg)
             self.update_status("❌ Test error")
@@ -576,6 +1301,15 @@ def main():
     
     # Create and run application
     app = GoogleCalendarGUI(root)
+
+    probe_file = os.getenv(STARTUP_PROBE_ENV)
+    if probe_file:
+        # Startup benchmark: draw the first frame, note the time and exit
+        root.update()
+        with open(probe_file, 'w', encoding='utf-8') as f:
+            f.write(f"{STARTUP_READY_MARK} {time.time()}\n")
+        root.destroy()
+        return
     
     try:
         root.mainloop()
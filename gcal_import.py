@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - CSV and iCalendar importers
+Converts CSV rows (with a column mapping) and iCalendar VEVENTs into the
+event model one at a time, so large exports stream into the send path
+without an intermediate JSON file.
+"""
+
+import csv
+import itertools
+import logging
+import re
+from datetime import datetime, timedelta, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+FORMATS = ('json', 'csv', 'ics')
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.ics': 'ics',
+    '.ical': 'ics',
+    '.icalendar': 'ics',
+}
+CSV_DELIMITERS = ',;\t|'
+# Header names recognised without a mapping (compared case-insensitively)
+CSV_COLUMN_ALIASES = {
+    'title': ('title', 'summary', 'subject', 'name'),
+    'start': ('start', 'start time', 'start date', 'starts', 'dtstart'),
+    'end': ('end', 'end time', 'end date', 'ends', 'dtend'),
+    'description': ('description', 'notes', 'details'),
+    'location': ('location', 'where'),
+    'timeZone': ('timezone', 'time zone'),
+    'calendarId': ('calendarid', 'calendar id', 'calendar'),
+    'recurrence': ('recurrence', 'rrule'),
+    'action': ('action',),
+    'eventId': ('eventid', 'event id'),
+}
+ICS_OBSERVANCES = ('STANDARD', 'DAYLIGHT')
+ICS_TEXT_FIELDS = {'SUMMARY': 'title', 'DESCRIPTION': 'description', 'LOCATION': 'location'}
+# Windows time zone names (used as TZID by Outlook and Exchange) -> IANA,
+# after the CLDR windowsZones table
+WINDOWS_TIME_ZONES = {
+    'Dateline Standard Time': 'Etc/GMT+12',
+    'UTC-11': 'Etc/GMT+11',
+    'Aleutian Standard Time': 'America/Adak',
+    'Hawaiian Standard Time': 'Pacific/Honolulu',
+    'Marquesas Standard Time': 'Pacific/Marquesas',
+    'Alaskan Standard Time': 'America/Anchorage',
+    'UTC-09': 'Etc/GMT+9',
+    'Pacific Standard Time (Mexico)': 'America/Tijuana',
+    'UTC-08': 'Etc/GMT+8',
+    'Pacific Standard Time': 'America/Los_Angeles',
+    'US Mountain Standard Time': 'America/Phoenix',
+    'Mountain Standard Time (Mexico)': 'America/Mazatlan',
+    'Mountain Standard Time': 'America/Denver',
+    'Yukon Standard Time': 'America/Whitehorse',
+    'Central America Standard Time': 'America/Guatemala',
+    'Central Standard Time': 'America/Chicago',
+    'Easter Island Standard Time': 'Pacific/Easter',
+    'Central Standard Time (Mexico)': 'America/Mexico_City',
+    'Canada Central Standard Time': 'America/Regina',
+    'SA Pacific Standard Time': 'America/Bogota',
+    'Eastern Standard Time (Mexico)': 'America/Cancun',
+    'Eastern Standard Time': 'America/New_York',
+    'Haiti Standard Time': 'America/Port-au-Prince',
+    'Cuba Standard Time': 'America/Havana',
+    'US Eastern Standard Time': 'America/Indiana/Indianapolis',
+    'Turks And Caicos Standard Time': 'America/Grand_Turk',
+    'Paraguay Standard Time': 'America/Asuncion',
+    'Atlantic Standard Time': 'America/Halifax',
+    'Venezuela Standard Time': 'America/Caracas',
+    'Central Brazilian Standard Time': 'America/Cuiaba',
+    'SA Western Standard Time': 'America/La_Paz',
+    'Pacific SA Standard Time': 'America/Santiago',
+    'Newfoundland Standard Time': 'America/St_Johns',
+    'Tocantins Standard Time': 'America/Araguaina',
+    'E. South America Standard Time': 'America/Sao_Paulo',
+    'SA Eastern Standard Time': 'America/Cayenne',
+    'Argentina Standard Time': 'America/Argentina/Buenos_Aires',
+    'Greenland Standard Time': 'America/Nuuk',
+    'Montevideo Standard Time': 'America/Montevideo',
+    'Magallanes Standard Time': 'America/Punta_Arenas',
+    'Saint Pierre Standard Time': 'America/Miquelon',
+    'Bahia Standard Time': 'America/Bahia',
+    'UTC-02': 'Etc/GMT+2',
+    'Azores Standard Time': 'Atlantic/Azores',
+    'Cape Verde Standard Time': 'Atlantic/Cape_Verde',
+    'UTC': 'UTC',
+    'GMT Standard Time': 'Europe/London',
+    'Greenwich Standard Time': 'Atlantic/Reykjavik',
+    'Sao Tome Standard Time': 'Africa/Sao_Tome',
+    'Morocco Standard Time': 'Africa/Casablanca',
+    'W. Europe Standard Time': 'Europe/Berlin',
+    'Central Europe Standard Time': 'Europe/Budapest',
+    'Romance Standard Time': 'Europe/Paris',
+    'Central European Standard Time': 'Europe/Warsaw',
+    'W. Central Africa Standard Time': 'Africa/Lagos',
+    'Jordan Standard Time': 'Asia/Amman',
+    'GTB Standard Time': 'Europe/Bucharest',
+    'Middle East Standard Time': 'Asia/Beirut',
+    'Egypt Standard Time': 'Africa/Cairo',
+    'E. Europe Standard Time': 'Europe/Chisinau',
+    'Syria Standard Time': 'Asia/Damascus',
+    'West Bank Standard Time': 'Asia/Hebron',
+    'South Africa Standard Time': 'Africa/Johannesburg',
+    'FLE Standard Time': 'Europe/Kiev',
+    'Israel Standard Time': 'Asia/Jerusalem',
+    'South Sudan Standard Time': 'Africa/Juba',
+    'Kaliningrad Standard Time': 'Europe/Kaliningrad',
+    'Sudan Standard Time': 'Africa/Khartoum',
+    'Libya Standard Time': 'Africa/Tripoli',
+    'Namibia Standard Time': 'Africa/Windhoek',
+    'Arabic Standard Time': 'Asia/Baghdad',
+    'Turkey Standard Time': 'Europe/Istanbul',
+    'Arab Standard Time': 'Asia/Riyadh',
+    'Belarus Standard Time': 'Europe/Minsk',
+    'Russian Standard Time': 'Europe/Moscow',
+    'E. Africa Standard Time': 'Africa/Nairobi',
+    'Volgograd Standard Time': 'Europe/Volgograd',
+    'Iran Standard Time': 'Asia/Tehran',
+    'Arabian Standard Time': 'Asia/Dubai',
+    'Astrakhan Standard Time': 'Europe/Astrakhan',
+    'Azerbaijan Standard Time': 'Asia/Baku',
+    'Russia Time Zone 3': 'Europe/Samara',
+    'Mauritius Standard Time': 'Indian/Mauritius',
+    'Saratov Standard Time': 'Europe/Saratov',
+    'Georgian Standard Time': 'Asia/Tbilisi',
+    'Caucasus Standard Time': 'Asia/Yerevan',
+    'Afghanistan Standard Time': 'Asia/Kabul',
+    'West Asia Standard Time': 'Asia/Tashkent',
+    'Ekaterinburg Standard Time': 'Asia/Yekaterinburg',
+    'Pakistan Standard Time': 'Asia/Karachi',
+    'Qyzylorda Standard Time': 'Asia/Qyzylorda',
+    'India Standard Time': 'Asia/Kolkata',
+    'Sri Lanka Standard Time': 'Asia/Colombo',
+    'Nepal Standard Time': 'Asia/Kathmandu',
+    'Central Asia Standard Time': 'Asia/Almaty',
+    'Bangladesh Standard Time': 'Asia/Dhaka',
+    'Omsk Standard Time': 'Asia/Omsk',
+    'Myanmar Standard Time': 'Asia/Yangon',
+    'SE Asia Standard Time': 'Asia/Bangkok',
+    'Altai Standard Time': 'Asia/Barnaul',
+    'W. Mongolia Standard Time': 'Asia/Hovd',
+    'North Asia Standard Time': 'Asia/Krasnoyarsk',
+    'N. Central Asia Standard Time': 'Asia/Novosibirsk',
+    'Tomsk Standard Time': 'Asia/Tomsk',
+    'China Standard Time': 'Asia/Shanghai',
+    'North Asia East Standard Time': 'Asia/Irkutsk',
+    'Singapore Standard Time': 'Asia/Singapore',
+    'W. Australia Standard Time': 'Australia/Perth',
+    'Taipei Standard Time': 'Asia/Taipei',
+    'Ulaanbaatar Standard Time': 'Asia/Ulaanbaatar',
+    'Aus Central W. Standard Time': 'Australia/Eucla',
+    'Transbaikal Standard Time': 'Asia/Chita',
+    'Tokyo Standard Time': 'Asia/Tokyo',
+    'North Korea Standard Time': 'Asia/Pyongyang',
+    'Korea Standard Time': 'Asia/Seoul',
+    'Yakutsk Standard Time': 'Asia/Yakutsk',
+    'Cen. Australia Standard Time': 'Australia/Adelaide',
+    'AUS Central Standard Time': 'Australia/Darwin',
+    'E. Australia Standard Time': 'Australia/Brisbane',
+    'AUS Eastern Standard Time': 'Australia/Sydney',
+    'West Pacific Standard Time': 'Pacific/Port_Moresby',
+    'Tasmania Standard Time': 'Australia/Hobart',
+    'Vladivostok Standard Time': 'Asia/Vladivostok',
+    'Lord Howe Standard Time': 'Australia/Lord_Howe',
+    'Bougainville Standard Time': 'Pacific/Bougainville',
+    'Russia Time Zone 10': 'Asia/Srednekolymsk',
+    'Magadan Standard Time': 'Asia/Magadan',
+    'Norfolk Standard Time': 'Pacific/Norfolk',
+    'Sakhalin Standard Time': 'Asia/Sakhalin',
+    'Central Pacific Standard Time': 'Pacific/Guadalcanal',
+    'Russia Time Zone 11': 'Asia/Kamchatka',
+    'New Zealand Standard Time': 'Pacific/Auckland',
+    'UTC+12': 'Etc/GMT-12',
+    'Fiji Standard Time': 'Pacific/Fiji',
+    'Chatham Islands Standard Time': 'Pacific/Chatham',
+    'UTC+13': 'Etc/GMT-13',
+    'Tonga Standard Time': 'Pacific/Tongatapu',
+    'Samoa Standard Time': 'Pacific/Apia',
+    'Line Islands Standard Time': 'Pacific/Kiritimati',
+}
+_WINDOWS_TIME_ZONES = {name.lower(): zone for name, zone in WINDOWS_TIME_ZONES.items()}
+
+_ICS_DATETIME = re.compile(r'(\d{4})(\d\d)(\d\d)(?:T(\d\d)(\d\d)(\d\d)(Z)?)?\Z')
+_ICS_DURATION = re.compile(r'([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?\Z')
+_ICS_ESCAPES = re.compile(r'\\(.)')
+_ICS_OFFSET = re.compile(r'([+-])(\d\d)(\d\d)(\d\d)?\Z')
+_ICS_BYDAY = re.compile(r'([+-]?\d*)(MO|TU|WE|TH|FR|SA|SU)\Z')
+_ICS_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+def file_format(path):
+    """Return 'csv', 'ics' or 'json' from a file name's extension."""
+    lower = path.lower()
+    for extension, fmt in FORMAT_EXTENSIONS.items():
+        if lower.endswith(extension):
+            return fmt
+    return 'json'
+
+
+def parse_column_map(text):
+    """Parse "title=Subject, start=Begins" into {'title': 'Subject', 'start': 'Begins'}."""
+    mapping = {}
+    for part in (text or '').split(','):
+        if not part.strip():
+            continue
+        field, sep, column = part.partition('=')
+        field, column = field.strip(), column.strip()
+        if not sep or not column:
+            raise ValueError(f"bad column mapping {part.strip()!r} (use field=Column)")
+        if field not in CSV_COLUMN_ALIASES:
+            raise ValueError(f"unknown event field {field!r} (use {', '.join(CSV_COLUMN_ALIASES)})")
+        mapping[field] = column
+    return mapping
+
+
+def csv_columns(header, column_map=None):
+    """Return {field: column position} for a CSV header row.
+
+    Fields in column_map must name an existing column; the others are
+    found through CSV_COLUMN_ALIASES. Raises ValueError without a title or
+    start column, since no row could then make a valid event.
+    """
+    positions = {}
+    for position, name in enumerate(header):
+        positions.setdefault(name.strip().lower(), position)
+    columns = {}
+    for field, column in (column_map or {}).items():
+        if column.strip().lower() not in positions:
+            raise ValueError(f"CSV has no column {column!r} for '{field}'")
+        columns[field] = positions[column.strip().lower()]
+    for field, aliases in CSV_COLUMN_ALIASES.items():
+        if field in columns:
+            continue
+        for alias in aliases:
+            if alias in positions:
+                columns[field] = positions[alias]
+                break
+    missing = [field for field in ('title', 'start') if field not in columns]
+    if missing:
+        raise ValueError(f"CSV has no {' or '.join(missing)} column; map one with field=Column")
+    return columns
+
+
+def iter_events_from_csv(f, column_map=None):
+    """Yield one event per CSV row, reading the stream row by row.
+
+    The delimiter is detected from the header row. Cells are stripped and
+    empty cells left out, so validation reports missing fields as usual.
+    """
+    header_line = f.readline().lstrip('\ufeff')
+    if not header_line.strip():
+        raise ValueError("CSV file is empty")
+    try:
+        dialect = csv.Sniffer().sniff(header_line, delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        dialect = csv.excel
+    rows = csv.reader(itertools.chain([header_line], f), dialect)
+    columns = csv_columns(next(rows), column_map)
+
+    count = 0
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        event = {}
+        for field, position in columns.items():
+            value = row[position].strip() if position < len(row) else ''
+            if value:
+                event[field] = value
+        count += 1
+        yield event
+    if count == 0:
+        raise ValueError("Event list is empty")
+
+
+def _ics_lines(f):
+    """Yield unfolded iCalendar content lines (continuations start with a space or tab)."""
+    current = None
+    for line in f:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _ics_property(line):
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    # The value starts at the first colon outside a quoted parameter value
+    quoted = False
+    for position, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            break
+    else:
+        return line.upper(), {}, ''
+    name, *params = line[:position].split(';')
+    parameters = {}
+    for param in params:
+        key, _, value = param.partition('=')
+        parameters[key.upper()] = value.strip('"')
+    return name.upper(), parameters, line[position + 1:]
+
+
+def _ics_text(value):
+    """Undo iCalendar TEXT escaping (\\n, \\, \\; \\\\)."""
+    return _ICS_ESCAPES.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+
+def _ics_datetime(value, params):
+    """Return (naive datetime, TZID or None, is UTC) for a DATE or DATE-TIME value."""
+    match = _ICS_DATETIME.match(value.strip())
+    if not match:
+        raise ValueError(f"not an iCalendar date/time: {value!r}")
+    year, month, day, hour, minute, second, utc = match.groups()
+    dt = datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    return dt, params.get('TZID'), bool(utc)
+
+
+def _ics_duration(value):
+    """Return the timedelta of an iCalendar DURATION such as PT1H30M or P1D."""
+    match = _ICS_DURATION.match(value.strip())
+    if not match or not any(match.groups()[1:]):
+        raise ValueError(f"not an iCalendar duration: {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                         minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == '-' else duration
+
+
+def _ics_offset(value):
+    """Return the timedelta of a UTC offset such as +0100 or -053000 (None when unreadable)."""
+    match = _ICS_OFFSET.match(value.strip())
+    if not match:
+        return None
+    sign, hours, minutes, seconds = match.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds or 0))
+    return -offset if sign == '-' else offset
+
+
+def _nth_weekday(year, month, weekday, n):
+    """Return the day of the nth (from the end when negative) weekday of a month."""
+    if n > 0:
+        first = datetime(year, month, 1)
+        return 1 + (weekday - first.weekday()) % 7 + 7 * (n - 1)
+    last = datetime(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last.day - (last.weekday() - weekday) % 7 - 7 * (-n - 1)
+
+
+class _VTimezone(tzinfo):
+    """Fixed offsets of a VTIMEZONE without a known IANA name.
+
+    Each STANDARD/DAYLIGHT observance starts at its DTSTART and, with a
+    yearly RRULE (BYMONTH and BYDAY, e.g. -1SU), again every year; a time
+    takes the TZOFFSETTO of the latest observance started before it.
+    """
+
+    def __init__(self, tzid, observances):
+        self.tzid = tzid
+        self.observances = sorted(observances, key=lambda observance: observance[0])
+
+    def _onsets(self, start, rule, year):
+        if not rule:
+            return [start]
+        until = rule.get('UNTIL', '')
+        try:
+            until = _ics_datetime(until, {})[0] if until else None
+            month = int(rule.get('BYMONTH', start.month))
+            match = _ICS_BYDAY.match(rule.get('BYDAY', ''))
+            onsets = []
+            for candidate in (year - 1, year):
+                day = start.day
+                if match:
+                    day = _nth_weekday(candidate, month, _ICS_WEEKDAYS.index(match.group(2)),
+                                       int(match.group(1) or 1))
+                onset = start.replace(year=candidate, month=month, day=day)
+                if onset >= start and (until is None or onset <= until):
+                    onsets.append(onset)
+            return onsets or [start]
+        except ValueError:
+            return [start]
+
+    def utcoffset(self, dt):
+        if dt is None or not self.observances:
+            return None
+        naive = dt.replace(tzinfo=None)
+        latest = None
+        for start, offset, rule in self.observances:
+            for onset in self._onsets(start, rule, naive.year):
+                if onset <= naive and (latest is None or onset > latest[0]):
+                    latest = (onset, offset)
+        return (latest or (None, self.observances[0][1]))[1]
+
+    def dst(self, dt):
+        return None
+
+    def tzname(self, dt):
+        return self.tzid
+
+
+def _iana_zone(name):
+    """Return name when it is a known IANA time zone, else None."""
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+    return name
+
+
+def resolve_time_zone(tzid, vtimezones=None):
+    """Return (IANA name or None, tzinfo or None) for an iCalendar TZID.
+
+    Tries the TZID as an IANA name (also the tail of a prefixed one such
+    as "/mozilla.org/20050126_1/Europe/Berlin"), then as a Windows name
+    (WINDOWS_TIME_ZONES), then the X-LIC-LOCATION of its VTIMEZONE block.
+    Failing those, the offsets defined in the VTIMEZONE block are used,
+    without a name; (None, None) when nothing matches.
+    """
+    if not tzid:
+        return None, None
+    name = tzid.strip()
+    parts = name.strip('/').split('/')
+    candidates = ['/'.join(parts[i:]) for i in range(len(parts))]
+    candidates.append(_WINDOWS_TIME_ZONES.get(name.lower()))
+    definition = (vtimezones or {}).get(tzid, {})
+    candidates.append(definition.get('location'))
+    for candidate in candidates:
+        zone = candidate and _iana_zone(candidate)
+        if zone:
+            return zone, ZoneInfo(zone)
+    if definition.get('observances'):
+        return None, _VTimezone(tzid, definition['observances'])
+    return None, None
+
+
+def _format_ics_time(dt, zone, utc, event_zone):
+    """Return the ISO-8601 text of a parsed DTSTART/DTEND.
+
+    zone is the (IANA name, tzinfo) pair of resolve_time_zone(). Times in
+    the event's own zone stay without an offset (read in its 'timeZone');
+    times in another known zone get their UTC offset.
+    """
+    if utc:
+        return dt.isoformat() + 'Z'
+    name, tz = zone
+    if tz is not None and (name is None or name != event_zone):
+        return dt.replace(tzinfo=tz).isoformat()
+    return dt.isoformat()
+
+
+def _is_ics_date(params, value):
+    """True for a DATE (all-day) rather than a DATE-TIME value."""
+    return params.get('VALUE', '').upper() == 'DATE' or len(value.strip()) == 8
+
+
+def _ics_occurrence(params, value, vtimezones=None):
+    """Return the ISO-8601 text of an EXDATE or RECURRENCE-ID value (as is when unreadable)."""
+    try:
+        dt, tz_name, utc = _ics_datetime(value, params)
+    except ValueError:
+        return value.strip()
+    if _is_ics_date(params, value):
+        return dt.date().isoformat()
+    return _format_ics_time(dt, resolve_time_zone(tz_name, vtimezones), utc, None)
+
+
+def _all_day_end(props, start):
+    """Return the exclusive end date of an all-day event (one day without DTEND/DURATION)."""
+    if 'DTEND' in props:
+        try:
+            return _ics_datetime(props['DTEND'][1], props['DTEND'][0])[0].date()
+        except ValueError:
+            return props['DTEND'][1]  # reported by validation
+    if 'DURATION' in props:
+        try:
+            return start + timedelta(days=_ics_duration(props['DURATION'][1]).days)
+        except ValueError:
+            return props['DURATION'][1]
+    return start + timedelta(days=1)
+
+
+def _vevent_to_event(props, vtimezones=None):
+    """Build an event from the properties of one VEVENT; None to leave it out."""
+    if props.get('STATUS', ({}, ''))[1].upper() == 'CANCELLED':
+        return None
+    event = {}
+    for name, field in ICS_TEXT_FIELDS.items():
+        if name in props and props[name][1]:
+            event[field] = _ics_text(props[name][1])
+
+    if 'DTSTART' in props:
+        params, value = props['DTSTART']
+        try:
+            start, tz_name, utc = _ics_datetime(value, params)
+        except ValueError:
+            event['start'] = value  # reported by validation
+        else:
+            if _is_ics_date(params, value):
+                # All-day: dates without a time zone, the end date exclusive
+                end = _all_day_end(props, start.date())
+                event['allDay'] = True
+                event['start'] = start.date().isoformat()
+                event['end'] = end.isoformat() if hasattr(end, 'isoformat') else end
+            else:
+                zone = resolve_time_zone(tz_name, vtimezones)
+                event_zone = zone[0]
+                if event_zone:
+                    event['timeZone'] = event_zone
+                elif tz_name and zone[1] is None:
+                    event['timeZone'] = tz_name  # unknown: reported by validation
+                event['start'] = _format_ics_time(start, zone, utc, event_zone)
+                end_value = None
+                if 'DTEND' in props:
+                    params, value = props['DTEND']
+                    try:
+                        end, end_tz, end_utc = _ics_datetime(value, params)
+                        end_value = _format_ics_time(end, resolve_time_zone(end_tz, vtimezones),
+                                                     end_utc, event_zone)
+                    except ValueError:
+                        end_value = value
+                elif 'DURATION' in props:
+                    try:
+                        end_value = _format_ics_time(start + _ics_duration(props['DURATION'][1]),
+                                                     zone, utc, event_zone)
+                    except ValueError:
+                        end_value = props['DURATION'][1]
+                if end_value is not None:
+                    event['end'] = end_value
+
+    if 'RRULE' in props:
+        event['recurrence'] = 'RRULE:' + props['RRULE'][1]
+        excluded = [
+            _ics_occurrence(params, text, vtimezones)
+            for params, value in props.get('EXDATE', [])
+            for text in value.split(',') if text.strip()
+        ]
+        if excluded:
+            event['recurrenceExceptions'] = excluded
+    return event
+
+
+def _add_observance(vtimezone, props):
+    """Add a STANDARD/DAYLIGHT block as (DTSTART, TZOFFSETTO, RRULE parts) to a VTIMEZONE."""
+    offset = _ics_offset(props.get('TZOFFSETTO', ({}, ''))[1])
+    try:
+        start = _ics_datetime(props.get('DTSTART', ({}, ''))[1], {})[0]
+    except ValueError:
+        start = datetime(1970, 1, 1)
+    if offset is None:
+        return
+    rule = {}
+    for part in props.get('RRULE', ({}, ''))[1].split(';'):
+        name, _, value = part.partition('=')
+        if name.strip():
+            rule[name.strip().upper()] = value.strip().upper()
+    vtimezone.setdefault('observances', []).append((start, offset, rule))
+
+
+def iter_events_from_ics(f):
+    """Yield one event per VEVENT of an iCalendar stream, reading it line by line.
+
+    SUMMARY, DESCRIPTION and LOCATION become title, description and
+    location; DTSTART/DTEND (or DURATION) become start/end, and RRULE the
+    'recurrence'. A TZID becomes the event's 'timeZone' once mapped to an
+    IANA name (see resolve_time_zone); a zone only defined by its VTIMEZONE
+    block gives times with a fixed UTC offset. DATE values make an all-day
+    event ("allDay": true, dates with an exclusive end). Cancelled events
+    are left out.
+
+    A series with excluded (EXDATE) or changed occurrences (RECURRENCE-ID)
+    lists them in 'recurrenceExceptions', which validation rejects: sent as
+    a whole, the series would bring those occurrences back. Series are
+    yielded last, once every changed occurrence in the file is known.
+    """
+    lines = _ics_lines(f)
+    first = next((line for line in lines if line.strip()), '').lstrip('\ufeff')
+    if first.strip().upper() != 'BEGIN:VCALENDAR':
+        raise ValueError("Not an iCalendar file (expected BEGIN:VCALENDAR)")
+
+    components = ['VCALENDAR']
+    props = None
+    count = 0
+    vtimezones = {}  # TZID -> {'location': X-LIC-LOCATION, 'observances': [...]}
+    vtimezone = None
+    series = []  # (UID, event) of recurring events
+    changed = {}  # UID -> occurrences overridden by their own VEVENT
+    for line in lines:
+        if not line.strip():
+            continue
+        name, params, value = _ics_property(line)
+        if name == 'BEGIN':
+            components.append(value.strip().upper())
+            if components[-1] == 'VTIMEZONE':
+                vtimezone = {}
+            elif components[-1] == 'VEVENT' or (vtimezone is not None and components[-1] in ICS_OBSERVANCES):
+                props = {}
+        elif name == 'END':
+            component = components.pop() if len(components) > 1 else None
+            if component == 'VTIMEZONE' and vtimezone is not None:
+                if vtimezone.get('tzid'):
+                    vtimezones[vtimezone['tzid']] = vtimezone
+                vtimezone = None
+            elif component in ICS_OBSERVANCES and vtimezone is not None and props is not None:
+                _add_observance(vtimezone, props)
+                props = None
+            elif component == 'VEVENT' and props is not None:
+                uid = props.get('UID', ({}, ''))[1].strip()
+                if 'RECURRENCE-ID' in props:
+                    changed.setdefault(uid, []).append(_ics_occurrence(*props['RECURRENCE-ID'], vtimezones))
+                    props = None
+                    continue
+                event = _vevent_to_event(props, vtimezones)
+                props = None
+                if event is None:
+                    continue
+                if 'recurrence' in event:
+                    series.append((uid, event))
+                    continue
+                count += 1
+                yield event
+        elif components[-1] == 'VTIMEZONE' and vtimezone is not None:
+            if name == 'TZID':
+                vtimezone['tzid'] = value.strip()
+            elif name == 'X-LIC-LOCATION':
+                vtimezone['location'] = value.strip()
+        elif (components[-1] == 'VEVENT' or components[-1] in ICS_OBSERVANCES) and props is not None:
+            if name == 'EXDATE':
+                props.setdefault(name, []).append((params, value))
+            else:
+                props.setdefault(name, (params, value))
+
+    for uid, event in series:
+        occurrences = changed.pop(uid, [])
+        if occurrences:
+            event['recurrenceExceptions'] = event.get('recurrenceExceptions', []) + occurrences
+        count += 1
+        yield event
+    for uid, occurrences in changed.items():
+        logging.error(f"Skipped {len(occurrences)} changed occurrence(s) of series {uid or '(no UID)'}, "
+                        f"which is not in the file")
+    if count == 0:
+        raise ValueError("Event list is empty")
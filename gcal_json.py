@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - JSON backend
+Uses orjson when it is installed (pip install orjson) and the standard
+library otherwise. Hashes that must stay stable, such as idempotency keys,
+keep using the standard json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def dumps_bytes(obj):
+    """Serialise obj to compact UTF-8 JSON bytes (the POST body format)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits: the standard library copes
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps(obj):
+    """Serialise obj to a compact JSON string."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(data):
+    """Parse JSON from str or bytes; errors are json.JSONDecodeError (or a subclass)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Request timing metrics
+Collects per-request timings (queue wait, rate limit wait, serialisation,
+connect, time to first byte, total) from the send engine, appends them to
+a JSON Lines file and serves them as Prometheus text on a local port.
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+
+PHASES = (
+    ('queue', "queue wait"),
+    ('rate_wait', "rate limit wait"),
+    ('serialize', "serialisation"),
+    ('connect', "connect"),
+    ('ttfb', "first byte"),
+    ('total', "total"),
+)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_SAMPLES = 10000  # per phase and batch, for percentiles
+HISTOGRAM_WIDTH = 30
+
+
+def clamp_port(value):
+    """Return a TCP port for the metrics endpoint (0 = disabled)."""
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return port if 0 < port < 65536 else 0
+
+
+def new_timing():
+    """Return an empty per-request timing record (seconds)."""
+    return {phase: 0.0 for phase, _ in PHASES}
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Histogram:
+    """Per-bucket counts over LATENCY_BUCKETS plus +Inf (not thread-safe)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+
+class SendMetrics:
+    """Thread-safe collector for the timing of every request.
+
+    Lifetime histograms feed the Prometheus endpoint; per-batch samples
+    (reset by start_batch) feed the summary shown after each batch. With
+    a path, one JSON line per request is appended to that file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8') if path else None
+        self.histograms = {phase: Histogram() for phase, _ in PHASES}
+        self.requests = 0
+        self.events = 0
+        self.retries = 0
+        self.failures = 0
+        self.start_batch()
+
+    def start_batch(self):
+        """Forget the samples of the previous batch."""
+        with self.lock:
+            self.batch_requests = 0
+            self.batch_retries = 0
+            self.batch_histogram = Histogram()
+            self.samples = {phase: [] for phase, _ in PHASES}
+
+    def record(self, timing, first_index, events, status_code, ok, attempts):
+        """Record one request (a single event or a chunk of events)."""
+        line = None
+        if self.file is not None:
+            record = {
+                'ts': round(time.time(), 3),
+                'index': first_index,
+                'events': events,
+                'status_code': status_code,
+                'ok': ok,
+                'attempts': attempts,
+                'request_bytes': timing.get('request_bytes', 0),
+                'response_bytes': timing.get('response_bytes', 0),
+            }
+            record.update((f"{phase}_ms", round(timing.get(phase, 0.0) * 1000, 3)) for phase, _ in PHASES)
+            line = json.dumps(record)
+        with self.lock:
+            self.requests += 1
+            self.events += events
+            self.retries += attempts - 1
+            self.failures += 0 if ok else 1
+            self.batch_requests += 1
+            self.batch_retries += attempts - 1
+            for phase, _ in PHASES:
+                value = timing.get(phase, 0.0)
+                self.histograms[phase].observe(value)
+                samples = self.samples[phase]
+                if len(samples) < MAX_SAMPLES:
+                    samples.append(value)
+                else:
+                    # Reservoir sampling keeps percentiles fair on huge batches
+                    slot = random.randrange(self.batch_requests)
+                    if slot < MAX_SAMPLES:
+                        samples[slot] = value
+            self.batch_histogram.observe(timing.get('total', 0.0))
+            if line is not None:
+                self.file.write(line + '\n')
+
+    def batch_summary(self):
+        """Return percentiles (seconds) per phase and the total-time histogram of the batch."""
+        with self.lock:
+            phases = {}
+            for phase, _ in PHASES:
+                values = sorted(self.samples[phase])
+                phases[phase] = {
+                    'p50': percentile(values, 50),
+                    'p95': percentile(values, 95),
+                    'p99': percentile(values, 99),
+                    'max': values[-1] if values else None,
+                }
+            return {
+                'requests': self.batch_requests,
+                'retries': self.batch_retries,
+                'phases': phases,
+                'histogram': list(zip(LATENCY_BUCKETS + (math.inf,), self.batch_histogram.counts)),
+            }
+
+    def flush(self):
+        """Write buffered JSON lines to disk."""
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def prometheus_text(self):
+        """Return the lifetime metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, help_text, value in (
+                ('gcal_requests_total', "Requests sent to the Web App", self.requests),
+                ('gcal_events_total', "Events sent to the Web App", self.events),
+                ('gcal_retries_total', "Retried attempts", self.retries),
+                ('gcal_failed_requests_total', "Requests that failed after all attempts", self.failures),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+            for phase, label in PHASES:
+                name = f"gcal_request_{phase}_seconds"
+                histogram = self.histograms[phase]
+                lines += [f"# HELP {name} Request {label} time", f"# TYPE {name} histogram"]
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum {histogram.sum}")
+                lines.append(f"{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Flush and close the JSON Lines file."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def format_timing_summary(summary):
+    """Return the lines of a readable timing report for batch_summary() output."""
+    if not summary or not summary['requests']:
+        return []
+
+    def ms(value):
+        return f"{value * 1000:8.1f}" if value is not None else f"{'-':>8}"
+
+    lines = [
+        f"Request timing over {summary['requests']} request(s), {summary['retries']} retried attempt(s) (ms):",
+        f"  {'':<16}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}",
+    ]
+    for phase, label in PHASES:
+        values = summary['phases'][phase]
+        lines.append(
+            f"  {label:<16}{ms(values['p50'])}{ms(values['p95'])}{ms(values['p99'])}{ms(values['max'])}"
+        )
+
+    histogram = summary['histogram']
+    largest = max(count for _, count in histogram)
+    # Trim empty buckets at both ends
+    used = [i for i, (_, count) in enumerate(histogram) if count]
+    lines.append("Total time per request:")
+    for bound, count in histogram[used[0]:used[-1] + 1]:
+        label = "> 60 s" if math.isinf(bound) else f"<= {bound * 1000:g} ms"
+        bar = '#' * round(count / largest * HISTOGRAM_WIDTH) if largest else ''
+        lines.append(f"  {label:>12} |{bar:<{HISTOGRAM_WIDTH}}| {count}")
+    return lines
+
+
+class MetricsServer:
+    """Serves SendMetrics.prometheus_text() on http://127.0.0.1:<port>/metrics."""
+
+    def __init__(self, metrics, port):
+        # Imported here: http.server is only needed when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics_ref = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics_ref.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Metrics endpoint on http://127.0.0.1:{self.port}/metrics")
+
+    def close(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
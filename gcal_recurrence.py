@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Recurring series folding
+Detects regular daily and weekly runs in a flat event list and folds each
+run into one event with an RRULE 'recurrence', which the Web App creates
+as a single event series (one request and one calendar entry instead of
+one per occurrence).
+"""
+
+import json
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from gcal_events import check_event, parse_datetime
+
+MIN_SERIES_EVENTS = 3
+FOLD_BLOCKING_FIELDS = ('recurrence', 'allDay', 'eventId', 'idempotencyKey')
+
+
+def fixed_zone_name(offset):
+    """Return the IANA name of a whole-hour fixed UTC offset, or None."""
+    seconds = int(offset.total_seconds())
+    if seconds == 0:
+        return 'UTC'
+    if seconds % 3600:
+        return None
+    # Etc/GMT zones have the sign inverted: UTC+01:00 is Etc/GMT-1
+    name = f"Etc/GMT{-seconds // 3600:+d}"
+    try:
+        ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        return None
+    return name
+
+
+def _candidate(event):
+    """Return (group key, local start, start, end) for an event that may be folded, or None.
+
+    Events only fold with events that are identical apart from start and
+    end, last as long and start at the same wall-clock time in the same
+    zone: the event's 'timeZone', or its fixed UTC offset otherwise.
+    """
+    if not isinstance(event, dict) or event.get('action', 'create') != 'create':
+        return None
+    if any(field in event for field in FOLD_BLOCKING_FIELDS):
+        return None
+    errors, start, end = check_event(event)
+    if errors:
+        return None
+    start_dt, end_dt = parse_datetime(start), parse_datetime(end)
+    zone_name = event.get('timeZone') or fixed_zone_name(start_dt.utcoffset())
+    if zone_name is None:
+        return None
+    local = start_dt.astimezone(ZoneInfo(zone_name)).replace(tzinfo=None)
+    rest = {field: value for field, value in event.items() if field not in ('start', 'end')}
+    key = (json.dumps(rest, sort_keys=True, default=str), zone_name, local.time(), end_dt - start_dt)
+    return key, local, start, end
+
+
+def _regular_runs(members, min_events):
+    """Yield runs of at least min_events members spaced by the same number of days.
+
+    members are (local start, position, start, end) tuples sorted by local start.
+    """
+    run = members[:1]
+    step = None
+    for member in members[1:]:
+        gap = member[0] - run[-1][0]
+        if step is not None and gap == step:
+            run.append(member)
+            continue
+        if step is not None and len(run) >= min_events:
+            yield run
+            run, step = [member], None
+            continue
+        # Start again from the previous event when the spacing is usable
+        if gap.days >= 1:
+            run, step = [run[-1], member], gap
+        else:
+            run, step = [member], None
+    if step is not None and len(run) >= min_events:
+        yield run
+
+
+def series_rule(step_days, count):
+    """Return the RRULE of count occurrences every step_days days."""
+    if step_days % 7 == 0:
+        return f"RRULE:FREQ=WEEKLY;INTERVAL={step_days // 7};COUNT={count}"
+    return f"RRULE:FREQ=DAILY;INTERVAL={step_days};COUNT={count}"
+
+
+def compress_series(events, min_events=MIN_SERIES_EVENTS):
+    """Fold regular runs of identical events into recurring series.
+
+    Returns (events, series): events are (index, event) pairs in input
+    order, index being the event's 1-based position in the input, to send
+    with indexed=True so results keep the input numbering. Each series
+    takes the index of its first occurrence; series maps that index to
+    the indexes of every input event the series replaces. Only creates
+    without an eventId, idempotencyKey or recurrence fold; invalid events
+    pass through untouched so the send still reports them.
+    """
+    events = list(events)
+    groups = {}
+    for position, event in enumerate(events):
+        candidate = _candidate(event)
+        if candidate is not None:
+            key, local, start, end = candidate
+            groups.setdefault(key, []).append((local, position, start, end))
+
+    replaced = {}
+    dropped = set()
+    series = {}
+    for (_, zone_name, _, _), members in groups.items():
+        if len(members) < min_events:
+            continue
+        members.sort()
+        for run in _regular_runs(members, min_events):
+            _, first, start, end = run[0]
+            step_days = (run[1][0] - run[0][0]).days
+            replaced[first] = dict(
+                events[first],
+                start=start,
+                end=end,
+                recurrence=series_rule(step_days, len(run)),
+                timeZone=zone_name
+            )
+            dropped.update(position for _, position, _, _ in run[1:])
+            series[first + 1] = [position + 1 for _, position, _, _ in run]
+
+    folded = [
+        (position + 1, replaced.get(position, event))
+        for position, event in enumerate(events)
+        if position not in dropped
+    ]
+    return folded, dict(sorted(series.items()))
+
+
+def format_series(series):
+    """Return one line per folded series naming the input events it covers."""
+    return [
+        f"event {first}: one series for events {', '.join(str(idx) for idx in indexes)}"
+        for first, indexes in series.items()
+    ]
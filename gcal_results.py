@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Per-event results table
+Rows are added as results arrive; a response body is only rendered when
+its row is expanded, so huge batches never build one giant report.
+"""
+
+import bisect
+import json
+import tkinter as tk
+from tkinter import ttk
+
+REFILL_ROWS = 500  # rows re-inserted per Tk tick when the filter changes
+SUMMARY_CHARS = 200
+PLACEHOLDER = "…"
+
+
+def result_flag(entry):
+    """Return the one-word outcome shown for a result entry."""
+    if entry.get('cancelled'):
+        return 'CANCELLED'
+    if entry.get('skipped'):
+        return 'SKIPPED'
+    if entry.get('invalid'):
+        return 'INVALID'
+    return 'OK' if entry.get('ok') else 'FAILED'
+
+
+def result_summary(entry):
+    """Return a one-line description of a response body."""
+    body = entry.get('body')
+    if isinstance(body, dict):
+        if body.get('errors'):
+            text = '; '.join(str(error) for error in body['errors'])
+        else:
+            text = body.get('eventId') or body.get('message') or body.get('status') or ''
+    else:
+        text = '' if body is None else str(body)
+    text = str(text).replace('\n', ' ')
+    return text[:SUMMARY_CHARS]
+
+
+class ResultsView(ttk.Frame):
+    """Treeview of per-event results with a failures-only filter.
+
+    on_edit and on_delete, when given, receive the event indexes of the
+    selected rows (or of every listed row when nothing is selected).
+    """
+
+    COLUMNS = (
+        ('status', "HTTP", 60),
+        ('result', "Result", 90),
+        ('attempts', "Attempts", 70),
+        ('detail', "Event ID / message", 400),
+    )
+
+    def __init__(self, master, on_edit=None, on_delete=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.entries = {}
+        self.shown = []  # sorted indexes of the rows in the tree
+        self.refill_job = None
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        toolbar = ttk.Frame(self)
+        toolbar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        self.failures_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            toolbar,
+            text="Failures only",
+            variable=self.failures_only_var,
+            command=self.refill
+        ).pack(side=tk.LEFT)
+        if on_edit is not None:
+            ttk.Button(
+                toolbar,
+                text="Edit selected…",
+                command=lambda: on_edit(self.selected_indexes())
+            ).pack(side=tk.LEFT, padx=(10, 0))
+        if on_delete is not None:
+            ttk.Button(
+                toolbar,
+                text="Delete selected…",
+                command=lambda: on_delete(self.selected_indexes())
+            ).pack(side=tk.LEFT, padx=(5, 0))
+        self.count_var = tk.StringVar(value="")
+        ttk.Label(toolbar, textvariable=self.count_var).pack(side=tk.RIGHT)
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=[name for name, _, _ in self.COLUMNS],
+            show="tree headings",
+            height=8
+        )
+        self.tree.heading('#0', text="Event")
+        self.tree.column('#0', width=140, stretch=False)
+        for name, heading, width in self.COLUMNS:
+            self.tree.heading(name, text=heading, anchor="w")
+            self.tree.column(name, width=width, stretch=(name == 'detail'))
+        self.tree.tag_configure('failed', foreground="#b00020")
+        self.tree.tag_configure('body', font=("Consolas", 9))
+        self.tree.bind('<<TreeviewOpen>>', self.on_open)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+    def clear(self):
+        """Remove every row (start of a new batch)."""
+        self.cancel_refill()
+        self.entries = {}
+        self.shown = []
+        self.tree.delete(*self.tree.get_children())
+        self.update_count()
+
+    def add(self, entry):
+        """Add one result; rows stay ordered by event index."""
+        self.entries[entry['index']] = entry
+        if self.is_visible(entry) and not self.tree.exists(str(entry['index'])):
+            self.insert_row(entry)
+        self.update_count()
+
+    def selected_indexes(self):
+        """Return the indexes of the selected events, or of every listed event."""
+        selected = [int(iid) for iid in self.tree.selection() if iid.isdigit()]
+        return sorted(selected) if selected else list(self.shown)
+
+    def is_visible(self, entry):
+        """Return True when the entry passes the current filter."""
+        return not self.failures_only_var.get() or not entry.get('ok')
+
+    def insert_row(self, entry):
+        """Insert a collapsed row at its sorted position."""
+        idx = entry['index']
+        position = bisect.bisect(self.shown, idx)
+        self.shown.insert(position, idx)
+        failed = not entry.get('ok')
+        iid = self.tree.insert(
+            '', position,
+            iid=str(idx),
+            text=f"Event {idx}",
+            values=(
+                entry.get('status_code'),
+                result_flag(entry),
+                entry.get('attempts', 1),
+                result_summary(entry),
+            ),
+            tags=('failed',) if failed else ()
+        )
+        # Placeholder child so the row can be expanded; the body is rendered on open
+        self.tree.insert(iid, 'end', text=PLACEHOLDER)
+
+    def on_open(self, event):
+        """Render the response body of the row being expanded."""
+        iid = self.tree.focus()
+        children = self.tree.get_children(iid)
+        if len(children) != 1 or self.tree.item(children[0], 'text') != PLACEHOLDER:
+            return
+        entry = self.entries.get(int(iid)) if iid.isdigit() else None
+        if entry is None:
+            return
+        self.tree.delete(children[0])
+        body = entry.get('body')
+        try:
+            body_text = json.dumps(body, ensure_ascii=False, indent=2) if isinstance(body, (dict, list)) else str(body)
+        except Exception:
+            body_text = str(body)
+        if entry.get('attempts', 1) > 1:
+            body_text += f"\n({entry['attempts']} attempts, {entry.get('backoff', 0.0):.1f}s backoff)"
+        for line in body_text.splitlines():
+            self.tree.insert(iid, 'end', text=line, tags=('body',))
+
+    def refill(self):
+        """Rebuild the rows for the current filter, a slice per Tk tick."""
+        self.cancel_refill()
+        self.shown = []
+        self.tree.delete(*self.tree.get_children())
+        pending = iter(sorted(self.entries))
+        self.refill_step(pending)
+
+    def refill_step(self, pending):
+        """Insert the next slice of rows and reschedule until done."""
+        self.refill_job = None
+        for count, idx in enumerate(pending, start=1):
+            entry = self.entries[idx]
+            # Rows that arrived during the refill are already in place
+            if self.is_visible(entry) and not self.tree.exists(str(idx)):
+                self.insert_row(entry)
+            if count >= REFILL_ROWS:
+                self.refill_job = self.after(1, self.refill_step, pending)
+                break
+        self.update_count()
+
+    def cancel_refill(self):
+        """Stop an in-progress refill."""
+        if self.refill_job is not None:
+            self.after_cancel(self.refill_job)
+            self.refill_job = None
+
+    def update_count(self):
+        """Show how many rows are listed."""
+        total = len(self.entries)
+        if self.failures_only_var.get():
+            self.count_var.set(f"{len(self.shown)} shown of {total}")
+        else:
+            self.count_var.set(f"{total} event(s)")
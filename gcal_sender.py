@@ -0,0 +1,846 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Send engine for the Apps Script Web App
+Sends events concurrently with a bounded worker pool, either one event
+per POST or packed in chunks for the Web App bulk endpoint.
+"""
+
+import base64
+import gzip
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from gcal_events import normalize_event
+from gcal_endpoints import EndpointPool
+from gcal_json import dumps_bytes, loads as json_loads
+from gcal_metrics import new_timing
+from gcal_settings import (
+    DEFAULT_CALENDAR, DEFAULT_CHUNK_SIZE, DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE_LIMIT, DEFAULT_WORKERS,
+    MAX_ATTEMPTS, MAX_CHUNK_SIZE, MAX_WORKERS, RetryPolicy, TokenBucket, clamp_attempts,
+    clamp_chunk_size, clamp_rate_limit, clamp_workers
+)
+from gcal_store import REQUEST_ERROR_STATUS, entry_status, event_key, is_create
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+REQUEST_TIMEOUT = 20
+BULK_EVENT_TIMEOUT = 2  # extra seconds allowed per event in a bulk request
+MAX_REQUEST_TIMEOUT = 360  # Apps Script execution limit
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+INFLIGHT_PER_WORKER = 2  # queued requests per worker when streaming input
+DEDUP_LOOKUP_BLOCK = 500  # events looked up in the dedup index at once
+GZIP_MIN_BYTES = 4 * 1024  # smaller bodies are sent as they are
+GZIP_LEVEL = 6
+MINIMAL_RESPONSE = 'minimal'  # bulk responses as [index, eventId] tuples
+
+
+class ConnectionTimings:
+    """Thread-safe counters for connection setup and redirect timings."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.redirects = 0
+        self.redirect_time = 0.0
+        self.connections = 0
+        self.tcp_time = 0.0
+        self.tls_time = 0.0
+        self.dns_by_host = {}
+        self.local = threading.local()  # setup time spent by the current thread
+
+    def add_connection(self, tcp, tls):
+        """Record a newly opened connection (DNS + TCP, then TLS)."""
+        self.local.connect = getattr(self.local, 'connect', 0.0) + tcp + tls
+        with self.lock:
+            self.connections += 1
+            self.tcp_time += tcp
+            self.tls_time += tls
+
+    def add_dns(self, host, seconds):
+        """Record the lookup time of a host (measured once per host)."""
+        self.local.connect = getattr(self.local, 'connect', 0.0) + seconds
+        with self.lock:
+            self.dns_by_host[host] = seconds
+
+    def take_connect_time(self):
+        """Return and reset the connection setup time spent by the calling thread."""
+        seconds = getattr(self.local, 'connect', 0.0)
+        self.local.connect = 0.0
+        return seconds
+
+    def add_request(self, response):
+        """Record a finished request, including the redirects it followed."""
+        redirect_time = sum(r.elapsed.total_seconds() for r in response.history)
+        with self.lock:
+            self.requests += 1
+            self.redirects += len(response.history)
+            self.redirect_time += redirect_time
+
+    def snapshot(self):
+        """Return a copy of the counters."""
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'redirects': self.redirects,
+                'redirect_time': self.redirect_time,
+                'connections': self.connections,
+                'tcp_time': self.tcp_time,
+                'tls_time': self.tls_time,
+                'dns': dict(self.dns_by_host),
+            }
+
+
+def summarize_timings(before, after):
+    """Compare two ConnectionTimings snapshots and estimate pooling savings.
+
+    A reused connection skips DNS, TCP connect and TLS handshake, so each
+    reuse saves roughly the average setup cost of a new connection. Times
+    are in seconds, averaged per request.
+    """
+    requests_made = after['requests'] - before['requests']
+    http_requests = requests_made + after['redirects'] - before['redirects']
+    connections = after['connections'] - before['connections']
+    reused = max(0, http_requests - connections)
+
+    # Setup costs are averaged over the whole session, so a batch that only
+    # reused connections from earlier batches still gets an estimate.
+    dns = sum(after['dns'].values()) / len(after['dns']) if after['dns'] else 0.0
+    if after['connections']:
+        # _new_conn() covers name resolution and TCP connect together
+        tcp = max(0.0, after['tcp_time'] / after['connections'] - dns)
+        tls = after['tls_time'] / after['connections']
+    else:
+        tcp = tls = 0.0
+    redirect = (after['redirect_time'] - before['redirect_time']) / requests_made if requests_made else 0.0
+
+    saved = reused * (dns + tcp + tls)
+    return {
+        'requests': requests_made,
+        'connections': connections,
+        'reused': reused,
+        'dns': dns,
+        'tcp': tcp,
+        'tls': tls,
+        'redirect': redirect,
+        'saved_per_request': saved / requests_made if requests_made else 0.0,
+    }
+
+
+def timed_pool_classes(timings):
+    """Return urllib3 pool classes whose connections report setup timings."""
+
+    def timed(connection_cls):
+        class TimedConnection(connection_cls):
+            def _new_conn(self):
+                if self._dns_host not in timings.dns_by_host:
+                    started = time.perf_counter()
+                    try:
+                        socket.getaddrinfo(self._dns_host, self.port, type=socket.SOCK_STREAM)
+                    except OSError:
+                        pass  # the real connect below reports the error
+                    timings.add_dns(self._dns_host, time.perf_counter() - started)
+                started = time.perf_counter()
+                sock = super()._new_conn()
+                self._tcp_time = time.perf_counter() - started
+                return sock
+
+            def connect(self):
+                started = time.perf_counter()
+                super().connect()
+                total = time.perf_counter() - started
+                timings.add_connection(self._tcp_time, max(0.0, total - self._tcp_time))
+
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed(HTTPSConnection)
+
+    return {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class WebAppSession(requests.Session):
+    """Keep-alive session with a connection pool sized to the worker count.
+
+    Apps Script answers every call with a 302 to script.googleusercontent.com,
+    so both hosts get a pool and connections are reused across events and
+    batches. Connection setup and redirect timings are recorded in timings.
+    """
+
+    def __init__(self, pool_size=DEFAULT_WORKERS):
+        super().__init__()
+        self.pool_size = pool_size
+        self.timings = ConnectionTimings()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        adapter.poolmanager.pool_classes_by_scheme = timed_pool_classes(self.timings)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        self.timings.add_request(response)
+        return response
+
+
+class SendCancelled(Exception):
+    """Raised when a batch is cancelled before a payload was sent."""
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo or timezone.utc)).total_seconds())
+
+
+def gzip_body(data):
+    """Wrap a JSON body as {"gzip": base64 of its gzip}; Apps Script only reads text bodies.
+
+    Returns data unchanged when compressing does not make it smaller.
+    """
+    packed = b'{"gzip":"' + base64.b64encode(gzip.compress(data, GZIP_LEVEL)) + b'"}'
+    return packed if len(packed) < len(data) else data
+
+
+def expand_minimal(ids, count):
+    """Turn a minimal bulk response into one result dict per event, or None if incomplete.
+
+    ids holds [index, eventId] for successes and [index, null, message]
+    for failures, index being the position in the request.
+    """
+    items = [None] * count
+    for item in ids:
+        if not isinstance(item, list) or not item or not isinstance(item[0], int) or not 0 <= item[0] < count:
+            return None
+        if len(item) > 1 and item[1] is not None:
+            items[item[0]] = {'status': 'ok', 'eventId': item[1]}
+        else:
+            items[item[0]] = {'status': 'error', 'message': item[2] if len(item) > 2 else 'Unknown error'}
+    return None if None in items else items
+
+
+def read_body(response):
+    """Return the parsed JSON body of a response, or its text when it is not JSON.
+
+    Only bodies that look like JSON are parsed, so HTML error pages are not
+    run through the decoder first.
+    """
+    content = response.content
+    if 'json' in response.headers.get('Content-Type', '') or content[:1] in (b'{', b'['):
+        try:
+            return json_loads(content)
+        except ValueError:
+            pass
+    return response.text
+
+
+class WebAppClient:
+    """Sends payloads to a Web App URL (or an EndpointPool) with retries and rate limiting."""
+
+    def __init__(self, session, url, retry_policy=None, rate_limiter=None, cancel_event=None,
+                 calendar_limiter=None, compress=False, minimal=False, slots=None):
+        self.session = session
+        self.compress = compress  # gzip large bodies for endpoints that support it
+        self.minimal = minimal  # ask for minimal bulk responses
+        self.endpoints = url if isinstance(url, EndpointPool) else EndpointPool([url])
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.calendar_limiter = calendar_limiter  # extra limit of one calendar's queue
+        self.slots = slots  # semaphore capping requests in flight across clients
+        self.cancel_event = cancel_event
+
+    def post_once(self, data, label, timeout=REQUEST_TIMEOUT, timing=None, url=None):
+        """POST an already serialised JSON body once and return (status_code, ok, body, retry_after).
+
+        Timeouts and connection errors are returned as status 0, other
+        request errors as REQUEST_ERROR_STATUS (-1), with a short message body.
+        retry_after is None when the failure is not worth retrying, otherwise
+        the server's Retry-After hint in seconds (0.0 when absent).
+        Connect and first-byte times are added to timing. url defaults to
+        the first endpoint.
+        """
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8'
+        }
+        timings = getattr(self.session, 'timings', None)
+        if timings is not None:
+            timings.take_connect_time()
+        try:
+            response = self.session.post(
+                url or self.endpoints.urls[0],
+                headers=headers,
+                data=data,
+                timeout=timeout,
+                verify=True
+            )
+            if timing is not None:
+                # Time to the first response headers, before any redirect
+                first = response.history[0] if response.history else response
+                timing['ttfb'] = first.elapsed.total_seconds()
+                timing['request_bytes'] = timing.get('request_bytes', 0) + len(data)
+                timing['response_bytes'] = timing.get('response_bytes', 0) + len(response.content)
+
+            body = read_body(response)
+            retry_after = None
+            if response.status_code in RETRY_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After')) or 0.0
+            return response.status_code, 200 <= response.status_code < 300, body, retry_after
+        except requests.exceptions.Timeout:
+            logging.error(f"[{label}] Timeout")
+            return 0, False, 'Timeout', 0.0
+        except requests.exceptions.ConnectionError:
+            logging.error(f"[{label}] Connection error")
+            return 0, False, 'Connection error', 0.0
+        except requests.exceptions.RequestException as e:
+            logging.error(f"[{label}] Request error: {e}")
+            return REQUEST_ERROR_STATUS, False, f'Request error: {e}', None
+        except Exception as e:
+            logging.error(f"[{label}] Unexpected error: {e}")
+            return REQUEST_ERROR_STATUS, False, f'Unexpected error: {e}', None
+        finally:
+            if timing is not None and timings is not None:
+                timing['connect'] += timings.take_connect_time()
+
+    def post(self, payload, label, timeout=REQUEST_TIMEOUT):
+        """POST with retries and return (status_code, ok, body, attempts, backoff, timing).
+
+        backoff is the total time spent waiting between attempts; timing
+        holds the phase times of the request in seconds (see gcal_metrics).
+        Each attempt goes to the least busy healthy endpoint; a retry after a
+        transport error or server failure moves to another healthy endpoint
+        straight away, without backing off. With slots, each attempt holds
+        one of them while it is rate limited and on the wire, not while it
+        waits for the calendar limiter or backs off.
+        """
+        attempts = 0
+        backoff = 0.0
+        endpoint = None
+        timing = new_timing()
+        started = time.perf_counter()
+        # Serialised (and compressed) once per request, whatever the number of attempts
+        data = dumps_bytes(payload)
+        compressed = None
+        timing['serialize'] = time.perf_counter() - started
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            # Detailed log per request (no sensitive data), only built when INFO is on
+            logging.info(f"[{label}] Payload: {data.decode('utf-8')}")
+        while True:
+            waited = time.perf_counter()
+            # The calendar's own limit comes before a shared slot, so a
+            # throttled calendar never holds a slot the others could use
+            if self.calendar_limiter is not None:
+                self.calendar_limiter.acquire(self.cancel_event)
+            if self.slots is not None:
+                self.slots.acquire()
+            try:
+                self.rate_limiter.acquire(self.cancel_event)
+                timing['rate_wait'] += time.perf_counter() - waited
+                if attempts == 0 and self.cancel_event is not None and self.cancel_event.is_set():
+                    raise SendCancelled(label)
+                attempts += 1
+                endpoint = self.endpoints.acquire(exclude=endpoint)
+                status_code = 0
+                try:
+                    body_bytes = data
+                    if self.compress and len(data) >= GZIP_MIN_BYTES and self.endpoints.supports(endpoint, 'gzip'):
+                        if compressed is None:
+                            packing = time.perf_counter()
+                            compressed = gzip_body(data)
+                            timing['serialize'] += time.perf_counter() - packing
+                        body_bytes = compressed
+                    status_code, ok, body, retry_after = self.post_once(
+                        body_bytes, label, timeout=timeout, timing=timing, url=endpoint.url
+                    )
+                finally:
+                    self.endpoints.release(endpoint, status_code <= 0 or status_code in RETRY_STATUS_CODES)
+            finally:
+                if self.slots is not None:
+                    self.slots.release()
+            timing['total'] = time.perf_counter() - started
+            if ok or retry_after is None or attempts >= self.retry_policy.max_attempts:
+                return status_code, ok, body, attempts, backoff, timing
+
+            if status_code != 429 and self.endpoints.has_alternative(endpoint):
+                logging.info(f"[{label}] Attempt {attempts} failed (HTTP {status_code}) on {endpoint.url}, "
+                             f"failing over")
+                continue
+            delay = self.retry_policy.delay(attempts, retry_after)
+            logging.info(f"[{label}] Attempt {attempts} failed (HTTP {status_code}), retrying in {delay:.1f}s")
+            if self.cancel_event is not None:
+                if self.cancel_event.wait(delay):
+                    # Cancelled while backing off: keep the last failure
+                    return status_code, ok, body, attempts, backoff, timing
+            else:
+                time.sleep(delay)
+            backoff += delay
+
+    def send_event(self, idx, event_payload, timeout=REQUEST_TIMEOUT):
+        """Send a single event and return its result entry.
+
+        Apps Script answers errors with HTTP 200 too, so only a body with
+        status "ok" counts as success (as for each item of send_chunk).
+        """
+        status_code, ok, body, attempts, backoff, timing = self.post(event_payload, f"Event {idx}", timeout=timeout)
+        return {
+            'index': idx,
+            'status_code': status_code,
+            'ok': ok and isinstance(body, dict) and body.get('status') == 'ok',
+            'body': body,
+            'attempts': attempts,
+            'backoff': backoff,
+            'timing': timing,
+        }
+
+    def send_chunk(self, chunk):
+        """Send several (index, event) pairs in one bulk POST.
+
+        Returns one result entry per event, in chunk order.
+        """
+        first, last = chunk[0][0], chunk[-1][0]
+        timeout = min(MAX_REQUEST_TIMEOUT, REQUEST_TIMEOUT + BULK_EVENT_TIMEOUT * len(chunk))
+        payload = {'events': [event_payload for _, event_payload in chunk]}
+        if self.minimal:
+            # Deployments without minimal responses ignore it and send full results
+            payload['response'] = MINIMAL_RESPONSE
+        status_code, ok, body, attempts, backoff, timing = self.post(
+            payload,
+            f"Events {first}-{last}",
+            timeout=timeout
+        )
+
+        items = body.get('results') if isinstance(body, dict) else None
+        if isinstance(body, dict) and isinstance(body.get('ids'), list):
+            items = expand_minimal(body['ids'], len(chunk))
+        if ok and (not isinstance(items, list) or len(items) != len(chunk)):
+            # Deployment without the bulk endpoint, or a request-level error
+            logging.error(f"[Events {first}-{last}] No per-event results in response")
+            body = {'status': 'error', 'message': 'Web App did not return per-event results', 'response': body}
+            ok = False
+
+        if not ok:
+            # The whole chunk shares the same outcome
+            return [
+                {
+                    'index': idx,
+                    'status_code': status_code,
+                    'ok': False,
+                    'body': body,
+                    'attempts': attempts,
+                    'backoff': backoff,
+                    'timing': timing,
+                }
+                for idx, _ in chunk
+            ]
+
+        return [
+            {
+                'index': idx,
+                'status_code': status_code,
+                'ok': isinstance(item, dict) and item.get('status') == 'ok',
+                'body': item,
+                'attempts': attempts,
+                'backoff': backoff,
+                'timing': timing,
+            }
+            for (idx, _), item in zip(chunk, items)
+        ]
+
+
+def cancelled_entry(idx):
+    """Return the result entry for an event that was never sent."""
+    return {'index': idx, 'status_code': 0, 'ok': False, 'body': 'Cancelled', 'cancelled': True}
+
+
+def skipped_entry(idx, event_id, reason='already sent'):
+    """Return the result entry for an event found in the dedup index (or the calendar)."""
+    return {
+        'index': idx,
+        'status_code': 0,
+        'ok': True,
+        'body': {'status': 'ok', 'eventId': event_id, 'skipped': reason},
+        'skipped': True,
+        'attempts': 0,
+        'backoff': 0.0,
+    }
+
+
+def invalid_entry(idx, errors):
+    """Return the result entry for an event rejected by validation."""
+    return {
+        'index': idx,
+        'status_code': 0,
+        'ok': False,
+        'body': {'status': 'invalid', 'errors': errors},
+        'invalid': True,
+        'attempts': 0,
+        'backoff': 0.0,
+    }
+
+
+def with_idempotency_key(event):
+    """Return the event payload carrying its idempotency key."""
+    if not isinstance(event, dict) or 'idempotencyKey' in event:
+        return event
+    keyed = dict(event)
+    keyed['idempotencyKey'] = event_key(event)
+    return keyed
+
+
+def event_calendar(event):
+    """Return the calendar an event is sent to."""
+    if isinstance(event, dict) and event.get('calendarId'):
+        return event['calendarId']
+    return DEFAULT_CALENDAR
+
+
+def make_calendar_chunks(items, chunk_size):
+    """Split (index, event) pairs into (calendar, chunk) pairs, one calendar per chunk.
+
+    Each calendar fills its own chunk, so at most one partial chunk per
+    calendar is held back until the input ends.
+    """
+    pending = {}
+    for item in items:
+        calendar = event_calendar(item[1])
+        chunk = pending.setdefault(calendar, [])
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            del pending[calendar]
+            yield calendar, chunk
+    for calendar, chunk in pending.items():
+        yield calendar, chunk
+
+
+def make_chunks(items, chunk_size):
+    """Split (index, event) pairs into lists of at most chunk_size pairs."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CalendarQueue:
+    """Requests of one calendar: own workers, window, backlog and rate limit.
+
+    At most window chunks are submitted at a time; the others wait in the
+    backlog, so a slow calendar never holds back the input of the others.
+    """
+
+    def __init__(self, calendar, client, workers, window, name):
+        self.calendar = calendar
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.window = window
+        self.inflight = 0
+        self.backlog = deque()
+
+    def has_room(self):
+        """Return True when another chunk can be submitted."""
+        return self.inflight < self.window
+
+    def shutdown(self):
+        """Wait for the submitted requests and stop the workers."""
+        self.executor.shutdown(wait=True)
+
+
+def send_events(url, events, workers=DEFAULT_WORKERS, on_result=None, cancel_event=None,
+                chunk_size=DEFAULT_CHUNK_SIZE, session=None, retry_policy=None, rate_limiter=None,
+                dedup_index=None, keep_results=True, validate=True, outbox=None, batch_id=None,
+                indexed=False, metrics=None, settled=None, calendar_id=None, calendar_workers=None,
+                calendar_rate_limit=0, compress=False, minimal_responses=False):
+    """Send events concurrently and return (results, stats).
+
+    events may be any iterable, including a lazy stream from a file: it is
+    consumed incrementally and only a bounded window of requests is queued.
+    Results are sorted by input position, so result N always describes
+    event N; with keep_results=False they are not retained (use on_result).
+    With chunk_size > 1, events are packed into bulk POSTs of that size.
+    on_result is called as each event finishes (from worker threads);
+    once cancel_event is set, no more events are read and those still
+    waiting in the queue are skipped (marked 'cancelled' in the outbox).
+    Pass a WebAppSession to reuse connections across batches; otherwise a
+    session is created for this batch only. Share one TokenBucket between
+    concurrent batches so they stay under the Apps Script quota together.
+    With validate=True, events are checked and normalised first and invalid
+    ones are reported without a network call. Every event carries an
+    idempotencyKey; with a DedupIndex, events whose key is already recorded
+    are skipped without any network call, and successful sends are recorded.
+    With an Outbox and batch_id, every event is journalled as pending before
+    its request and its outcome recorded afterwards, so the batch can be
+    resumed; pass indexed=True when events yields (index, event) pairs, as
+    Outbox.iter_queued() does. With a SendMetrics, the timing of every
+    request is recorded and stats['timing'] summarises the batch.
+    settled entries (e.g. events a calendar sync found unchanged) are
+    reported and counted first, without any request.
+    Events without a 'calendarId' are sent to calendar_id (the Web App's
+    default calendar when None or 'primary'). Each calendar has its own
+    queue of requests, never mixed in one chunk, with at most
+    calendar_workers requests in flight (default: workers) and its own
+    calendar_rate_limit in requests per second (0 = only the shared
+    rate_limiter applies); workers still caps the requests in flight overall.
+    url may also be an EndpointPool, to spread requests over several Web
+    App deployments (stats['endpoints'] has the requests of this batch per
+    endpoint). With compress, bodies of at least GZIP_MIN_BYTES are sent
+    gzipped to endpoints that announce it; with minimal_responses, bulk
+    requests ask for [index, eventId] results. stats['request_bytes'] and
+    stats['response_bytes'] count the bytes of every request sent.
+    """
+    workers = clamp_workers(workers)
+    calendar_workers = clamp_workers(calendar_workers) if calendar_workers else workers
+    calendar_workers = min(calendar_workers, workers)
+    if calendar_id == DEFAULT_CALENDAR:
+        calendar_id = None
+    own_session = session is None
+    if own_session:
+        session = WebAppSession(pool_size=workers)
+    rate_limiter = rate_limiter or TokenBucket()
+    endpoints = url if isinstance(url, EndpointPool) else EndpointPool([url], session)
+    chunk_size = clamp_chunk_size(chunk_size)
+    logging.info(f"Sending events to: {endpoints} with {workers} worker(s), "
+                 f"{chunk_size} event(s) per request")
+
+    results = []
+    tally = {
+        'total': 0, 'failed': 0, 'invalid': 0, 'cancelled': 0, 'skipped': 0,
+        'retried': 0, 'backoff': 0.0, 'queued': 0, 'request_bytes': 0, 'response_bytes': 0,
+    }
+
+    def collect(entry):
+        """Count a finished entry (always called on the calling thread)."""
+        tally['total'] += 1
+        tally['failed'] += 0 if entry.get('ok') or entry.get('cancelled') else 1
+        tally['invalid'] += 1 if entry.get('invalid') else 0
+        tally['cancelled'] += 1 if entry.get('cancelled') else 0
+        tally['skipped'] += 1 if entry.get('skipped') else 0
+        tally['retried'] += 1 if entry.get('attempts', 1) > 1 else 0
+        tally['backoff'] += entry.get('backoff', 0.0)
+        if outbox is not None and entry_status(entry) in ('pending', 'retry'):
+            tally['queued'] += 1
+        if keep_results:
+            results.append(entry)
+
+    def report(entry):
+        """Collect an entry settled without a request and notify on_result."""
+        collect(entry)
+        if outbox is not None:
+            # Settles resumed events that were sent (or broke) since
+            outbox.record(batch_id, [entry])
+        if on_result is not None:
+            on_result(entry)
+
+    def valid_events():
+        """Yield (index, keyed event) pairs; invalid events are reported."""
+        for idx, event in (events if indexed else enumerate(events, start=1)):
+            if validate:
+                event, errors = normalize_event(event)
+                if errors:
+                    report(invalid_entry(idx, errors))
+                    continue
+            if calendar_id is not None and isinstance(event, dict) and not event.get('calendarId'):
+                event = dict(event, calendarId=calendar_id)
+            yield idx, with_idempotency_key(event)
+
+    def unsent_events():
+        """Yield (index, event) pairs to send; events already sent are reported as skipped."""
+        for block in make_chunks(valid_events(), DEDUP_LOOKUP_BLOCK):
+            known = {}
+            if dedup_index is not None:
+                known = dedup_index.lookup(
+                    event['idempotencyKey'] for _, event in block if is_create(event)
+                )
+            to_send = []
+            for idx, event in block:
+                event_id = known.get(event.get('idempotencyKey')) if is_create(event) else None
+                if event_id is None:
+                    to_send.append((idx, event))
+                    continue
+                report(skipped_entry(idx, event_id))
+            if outbox is not None:
+                # Journal the block before any of it goes on the wire
+                outbox.enqueue(batch_id, to_send)
+            yield from to_send
+
+    def record_sent(chunk, entries):
+        """Store the eventIds of successful creates in the dedup index.
+
+        Deleted events are forgotten instead, so recreating one is sent
+        again; updates are not recorded (see is_create).
+        """
+        recorded = []
+        deleted = []
+        for (_, event), entry in zip(chunk, entries):
+            if not entry['ok'] or not isinstance(event, dict):
+                continue
+            if event.get('action') == 'delete':
+                deleted.append(event.get('eventId'))
+            elif is_create(event) and isinstance(entry['body'], dict) and entry['body'].get('eventId'):
+                recorded.append((event['idempotencyKey'], entry['body']['eventId']))
+        dedup_index.forget_event_ids(deleted)
+        dedup_index.add_many(recorded)
+
+    queues = {}
+    # Overall cap on requests in flight across every calendar
+    slots = threading.BoundedSemaphore(workers)
+    # Keep a bounded window of queued requests per calendar (and a bounded
+    # backlog overall) so large inputs are never fully materialised
+    window = calendar_workers * INFLIGHT_PER_WORKER
+    max_backlog = workers * INFLIGHT_PER_WORKER
+    pending = {}  # future -> CalendarQueue
+    bytes_lock = threading.Lock()  # byte counters are updated from worker threads
+
+    def calendar_queue(calendar):
+        queue = queues.get(calendar)
+        if queue is None:
+            limiter = TokenBucket(calendar_rate_limit) if calendar_rate_limit else None
+            client = WebAppClient(session, endpoints, retry_policy, rate_limiter, cancel_event, limiter,
+                                  compress=compress, minimal=minimal_responses, slots=slots)
+            queue = queues[calendar] = CalendarQueue(calendar, client, calendar_workers, window,
+                                                     f'gcal-send-{len(queues)}')
+        return queue
+
+    def submit(queue, chunk):
+        future = queue.executor.submit(run, queue, chunk, time.perf_counter())
+        queue.inflight += 1
+        pending[future] = queue
+
+    def drain(block):
+        """Collect finished requests (waiting for one when block) and refill their windows."""
+        done, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            queue = pending.pop(future)
+            queue.inflight -= 1
+            for entry in future.result():
+                collect(entry)
+            while queue.backlog and queue.has_room():
+                submit(queue, queue.backlog.popleft())
+
+    def run(queue, chunk, submitted):
+        try:
+            queue_wait = time.perf_counter() - submitted
+            if cancel_event is not None and cancel_event.is_set():
+                raise SendCancelled()
+            if chunk_size == 1:
+                entries = [queue.client.send_event(chunk[0][0], chunk[0][1])]
+            else:
+                entries = queue.client.send_chunk(chunk)
+        except SendCancelled:
+            entries = [cancelled_entry(idx) for idx, _ in chunk]
+        else:
+            # Every entry of a chunk shares the timing of its request
+            first = entries[0]
+            first['timing']['queue'] = queue_wait
+            with bytes_lock:
+                tally['request_bytes'] += first['timing'].get('request_bytes', 0)
+                tally['response_bytes'] += first['timing'].get('response_bytes', 0)
+            if metrics is not None:
+                metrics.record(first['timing'], first['index'], len(entries),
+                               first['status_code'], all(entry['ok'] for entry in entries),
+                               first['attempts'])
+        if dedup_index is not None:
+            try:
+                record_sent(chunk, entries)
+            except Exception as e:
+                logging.error(f"Error updating sent events index: {e}")
+        if outbox is not None:
+            try:
+                outbox.record(batch_id, entries)
+            except Exception as e:
+                logging.error(f"Error updating outbox: {e}")
+        if on_result is not None:
+            for entry in entries:
+                on_result(entry)
+        return entries
+
+    input_error = None
+    if metrics is not None:
+        metrics.start_batch()
+    for entry in settled or ():
+        report(entry)
+    timings_before = session.timings.snapshot()
+    endpoints_before = endpoints.snapshot()
+    started = time.perf_counter()
+    try:
+        try:
+            for calendar, chunk in make_calendar_chunks(unsent_events(), chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    break  # the rest of the input is not read
+                queue = calendar_queue(calendar)
+                if queue.has_room():
+                    submit(queue, chunk)
+                else:
+                    queue.backlog.append(chunk)
+                if pending:
+                    drain(block=False)
+                # Stop reading while the calendars are behind
+                while sum(len(queue.backlog) for queue in queues.values()) >= max_backlog:
+                    drain(block=True)
+        except Exception as e:
+            # Invalid input part-way through a stream: report what was sent
+            logging.error(f"Error reading events: {e}")
+            input_error = str(e)
+        while pending:
+            drain(block=True)
+    finally:
+        for queue in queues.values():
+            queue.shutdown()
+        if outbox is not None:
+            try:
+                outbox.flush()
+                if cancel_event is not None and cancel_event.is_set():
+                    # Journalled but never handed to a worker: not to be resumed
+                    outbox.cancel_pending(batch_id)
+            except Exception as e:
+                logging.error(f"Error updating outbox: {e}")
+        if metrics is not None:
+            metrics.flush()
+        if own_session:
+            session.close()
+    elapsed = time.perf_counter() - started
+
+    if keep_results:
+        results.sort(key=lambda r: r['index'])
+    sent = tally['total'] - tally['cancelled'] - tally['skipped'] - tally['invalid']
+    stats = dict(tally)
+    stats.update({
+        'workers': workers,
+        'chunk_size': chunk_size,
+        'elapsed': elapsed,
+        'events_per_sec': sent / elapsed if elapsed > 0 else 0.0,
+        'calendars': sorted(queues),
+        'endpoints': [
+            # Counters of this batch only; a shared pool keeps counting
+            dict(after, requests=after['requests'] - before['requests'], errors=after['errors'] - before['errors'])
+            for before, after in zip(endpoints_before, endpoints.snapshot())
+        ],
+        'connection': summarize_timings(timings_before, session.timings.snapshot()),
+        'input_error': input_error,
+        'timing': metrics.batch_summary() if metrics is not None else None,
+    })
+    logging.info(f"Batch finished: {stats['total']} event(s) in {elapsed:.2f}s "
+                 f"({stats['events_per_sec']:.1f} events/s)")
+    return results, stats
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Send settings
+Defaults and accepted ranges of the send settings, the retry policy and
+the rate limiter. Free of the network stack, so the window can be built
+without importing requests.
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 30  # Apps Script allows 30 simultaneous executions per user
+DEFAULT_CHUNK_SIZE = 1  # 1 = one event per POST (works with any deployment)
+MAX_CHUNK_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 3
+MAX_ATTEMPTS = 10
+DEFAULT_RATE_LIMIT = 10  # requests per second across all workers, 0 = unlimited
+DEFAULT_CALENDAR = 'primary'  # the Web App's default calendar
+
+
+def clamp_workers(value):
+    """Return a worker count within the supported range."""
+    try:
+        workers = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_WORKERS
+    return max(1, min(MAX_WORKERS, workers))
+
+
+def clamp_attempts(value):
+    """Return a max attempt count within the supported range."""
+    try:
+        attempts = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_ATTEMPTS
+    return max(1, min(MAX_ATTEMPTS, attempts))
+
+
+def clamp_rate_limit(value):
+    """Return a non-negative requests-per-second limit (0 = unlimited)."""
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RATE_LIMIT
+    return max(0.0, rate)
+
+
+def clamp_chunk_size(value):
+    """Return a chunk size within the supported range."""
+    try:
+        chunk_size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_CHUNK_SIZE
+    return max(1, min(MAX_CHUNK_SIZE, chunk_size))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient failures."""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = clamp_attempts(max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        """Return the wait before the next attempt (attempt is 1-based).
+
+        A Retry-After hint from the server is honoured as a minimum.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every sender thread.
+
+    rate is in requests per second; a rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, capacity=None):
+        self.lock = threading.Lock()
+        self.set_rate(rate, capacity)
+
+    def set_rate(self, rate, capacity=None):
+        """Change the rate without losing the bucket (used when settings change)."""
+        with self.lock:
+            self.rate = max(0.0, float(rate or 0))
+            self.capacity = capacity or max(1.0, self.rate)
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+
+    def acquire(self, cancel_event=None):
+        """Take one token, waiting if needed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                if self.rate <= 0:
+                    return waited
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return waited
+            else:
+                time.sleep(wait)
+            waited += wait
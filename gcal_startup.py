@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Startup benchmark
+Checks how long the GUI takes to come up and that the network, storage and
+.env modules stay out of the startup path (they are imported on first use):
+
+    python gcal_startup.py --runs 5 --budget-ms 150 -o startup.json
+    python gcal_startup.py --exe dist/gcal_gui.exe
+
+The import check runs 'python -X importtime -c "import gcal_gui"'; the
+window check starts the GUI (or a PyInstaller build) with GCAL_STARTUP_PROBE
+set, which makes it exit as soon as the first frame is drawn. Exits 1 when
+the import time is over budget or a deferred module is imported at startup.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTUP_FORMAT_VERSION = 1
+DEFAULT_BUDGET_MS = 150
+DEFAULT_RUNS = 5
+WINDOW_TIMEOUT = 60
+TOP_OFFENDERS = 10
+PROBE_ENV = 'GCAL_STARTUP_PROBE'  # gcal_gui.STARTUP_PROBE_ENV, not imported to keep this cheap
+READY_MARK = 'gcal-ready'
+DEFERRED_MODULES = ('requests', 'urllib3', 'sqlite3', 'dotenv', 'http.server', 'gcal_sender', 'gcal_store')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(text):
+    """Parse -X importtime output into [(module, depth, self ms, cumulative ms)]."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # the header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip(' ')
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, depth, self_us / 1000, cumulative_us / 1000))
+    return rows
+
+
+def module_subtree(rows, module):
+    """Return (the module's row, rows of everything it imported first), or (None, [])."""
+    for position, row in enumerate(rows):
+        if row[0] == module and row[1] == 0:
+            start = position
+            while start > 0 and rows[start - 1][1] > 0:
+                start -= 1
+            return row, rows[start:position]
+    return None, []
+
+
+def measure_imports(python):
+    """Import gcal_gui in a fresh interpreter; return the import report."""
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', 'import gcal_gui'],
+        cwd=HERE, capture_output=True, text=True, timeout=WINDOW_TIMEOUT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import gcal_gui failed: {result.stderr.strip().splitlines()[-1:]}")
+    row, subtree = module_subtree(parse_importtime(result.stderr), 'gcal_gui')
+    if row is None:
+        raise RuntimeError("no import time reported for gcal_gui")
+    loaded = {name for name, _, _, _ in subtree}
+    offenders = sorted(subtree, key=lambda item: item[2], reverse=True)[:TOP_OFFENDERS]
+    return {
+        'cumulative_ms': row[3],
+        'modules': len(subtree) + 1,
+        'deferred_loaded': [name for name in DEFERRED_MODULES if name in loaded],
+        'top_self_ms': [{'module': name, 'self_ms': round(self_ms, 2)} for name, _, self_ms, _ in offenders],
+    }
+
+
+def time_process(command):
+    """Return the wall time in seconds of running command to completion."""
+    started = time.time()
+    subprocess.run(command, cwd=HERE, capture_output=True, timeout=WINDOW_TIMEOUT)
+    return time.time() - started
+
+
+def time_to_window(command):
+    """Start the GUI with the startup probe; return seconds until its first frame.
+
+    Raises RuntimeError when the GUI exits without drawing (no display).
+    """
+    fd, probe_file = tempfile.mkstemp(prefix='gcal_startup_', suffix='.txt')
+    os.close(fd)
+    try:
+        env = dict(os.environ, **{PROBE_ENV: probe_file})
+        started = time.time()
+        result = subprocess.run(command, cwd=HERE, env=env, capture_output=True, text=True,
+                                timeout=WINDOW_TIMEOUT)
+        with open(probe_file, encoding='utf-8') as f:
+            mark = f.read().split()
+        if len(mark) != 2 or mark[0] != READY_MARK:
+            lines = (result.stderr or '').strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"exited with status {result.returncode}")
+        return float(mark[1]) - started
+    finally:
+        os.unlink(probe_file)
+
+
+def summary_ms(values):
+    """Return median/min/max of seconds values in milliseconds."""
+    return {
+        'median': statistics.median(values) * 1000,
+        'min': min(values) * 1000,
+        'max': max(values) * 1000,
+    }
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='gcal_startup.py',
+        description='Measure GUI startup time and check that heavy modules are imported lazily.'
+    )
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='window starts to time')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='maximum cumulative import time of gcal_gui')
+    parser.add_argument('--exe', help='time a built executable instead of python gcal_gui.py')
+    parser.add_argument('--python', default=sys.executable, help='interpreter to measure')
+    parser.add_argument('--no-window', dest='window', action='store_false',
+                        help='only check imports')
+    parser.add_argument('-o', '--output', help="JSON report file ('-' = stdout)")
+    return parser
+
+
+def main(argv=None):
+    """Run the import check and the window timing, print a summary and return the exit code."""
+    args = build_parser().parse_args(argv)
+    report = {
+        'version': STARTUP_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'budget_ms': args.budget_ms,
+    }
+    failed = False
+
+    if args.exe:
+        report['imports'] = None
+    else:
+        imports = measure_imports(args.python)
+        report['imports'] = imports
+        over = imports['cumulative_ms'] > args.budget_ms
+        failed = over or bool(imports['deferred_loaded'])
+        print(f"import gcal_gui: {imports['cumulative_ms']:.1f} ms over {imports['modules']} modules "
+              f"(budget {args.budget_ms:.0f} ms{', OVER' if over else ''})", file=sys.stderr)
+        for item in imports['top_self_ms'][:5]:
+            print(f"  {item['self_ms']:7.2f} ms  {item['module']}", file=sys.stderr)
+        if imports['deferred_loaded']:
+            print(f"  loaded at startup but should be deferred: {', '.join(imports['deferred_loaded'])}",
+                  file=sys.stderr)
+
+    report['window'] = None
+    if args.window:
+        command = [args.exe] if args.exe else [args.python, os.path.join(HERE, 'gcal_gui.py')]
+        try:
+            times = [time_to_window(command) for _ in range(max(1, args.runs))]
+        except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+            report['window'] = {'skipped': str(e)}
+            print(f"time to first window: skipped ({e})", file=sys.stderr)
+        else:
+            baseline = [time_process([args.python, '-c', 'pass']) for _ in range(max(1, args.runs))]
+            report['window'] = {
+                'runs': len(times),
+                'command': command,
+                'time_to_window_ms': summary_ms(times),
+                'interpreter_baseline_ms': summary_ms(baseline),
+            }
+            window = report['window']['time_to_window_ms']
+            print(f"time to first window: median {window['median']:.0f} ms, min {window['min']:.0f} ms "
+                  f"(bare interpreter {report['window']['interpreter_baseline_ms']['median']:.0f} ms)",
+                  file=sys.stderr)
+
+    report['ok'] = not failed
+    if args.output:
+        text = json.dumps(report, indent=2)
+        if args.output == '-':
+            print(text)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Local on-disk state
+Keeps an index of events already created so re-sends can skip them, and
+a durable outbox so interrupted batches can be resumed.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from gcal_json import dumps as json_dumps, loads as json_loads
+
+DEDUP_DB_FILE = 'gcal_sent.db'
+KEY_FIELDS = ('title', 'start', 'end', 'location')
+SQLITE_MAX_PARAMS = 500
+OUTBOX_DB_FILE = 'gcal_outbox.db'
+OUTBOX_FLUSH_ROWS = 200
+OUTBOX_FLUSH_SECONDS = 1.0
+OUTBOX_PAGE_SIZE = 500
+OUTBOX_KEEP_DAYS = 30
+NO_RESPONSE_STATUS = 0  # status_code of timeouts and connection errors
+REQUEST_ERROR_STATUS = -1  # status_code of other failed requests (not retried)
+TRANSIENT_STATUS_CODES = {NO_RESPONSE_STATUS, 429, 500, 502, 503, 504}
+
+
+def event_key(event):
+    """Return the idempotency key of an event (hash of title/start/end/location).
+
+    Updates and deletes also hash their action and eventId, series their
+    recurrence and events for another calendar than the default one their
+    calendarId, so each one is distinct from a single create of the same
+    content in the default calendar (whose keys are unchanged).
+    """
+    if isinstance(event, dict):
+        fields = {field: event.get(field) for field in KEY_FIELDS}
+        if event.get('recurrence') is not None:
+            fields['recurrence'] = event['recurrence']
+        if event.get('calendarId') not in (None, '', 'primary'):
+            fields['calendarId'] = event['calendarId']
+        action = event.get('action')
+        if action is not None and action != 'create':
+            fields['action'] = action
+            fields['eventId'] = event.get('eventId')
+    else:
+        fields = event
+    canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def is_create(event):
+    """Return True for events that create a calendar event (the only ones the dedup index covers).
+
+    Updates and deletes are never skipped: two different edits of one
+    event can share a key, since the key hashes only part of the event.
+    """
+    return isinstance(event, dict) and event.get('action', 'create') in (None, 'create')
+
+
+def entry_status(entry):
+    """Return the outbox status for a send result entry.
+
+    'retry' marks transient failures (timeout or connection error, 429, 5xx) that a later
+    resume should send again; 'cancelled' events are never resumed.
+    """
+    if entry.get('cancelled'):
+        return 'cancelled'
+    if entry.get('ok'):
+        return 'sent'
+    if entry.get('invalid'):
+        return 'failed'
+    if entry.get('status_code') in TRANSIENT_STATUS_CODES:
+        return 'retry'
+    return 'failed'
+
+
+class DedupIndex:
+    """SQLite index of idempotency key -> eventId for successful creates.
+
+    Safe to share between sender threads.
+    """
+
+    def __init__(self, path=DEDUP_DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sent_events ("
+            " key TEXT PRIMARY KEY,"
+            " event_id TEXT NOT NULL,"
+            " sent_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sent_events_event_id ON sent_events (event_id)")
+        self.conn.commit()
+
+    def lookup(self, keys):
+        """Return {key: eventId} for the keys already in the index."""
+        keys = list(keys)
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+                batch = keys[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ','.join('?' * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, event_id FROM sent_events WHERE key IN ({placeholders})",
+                    batch
+                )
+                found.update(rows)
+        return found
+
+    def add_many(self, pairs):
+        """Record successfully created events as (key, eventId) pairs in one commit."""
+        pairs = list(pairs)
+        if not pairs:
+            return
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sent_events (key, event_id) VALUES (?, ?)",
+                pairs
+            )
+            self.conn.commit()
+
+    def forget_event_ids(self, event_ids):
+        """Drop every key recorded for these eventIds (events deleted from the calendar)."""
+        event_ids = list(event_ids)
+        if not event_ids:
+            return
+        with self.lock:
+            for start in range(0, len(event_ids), SQLITE_MAX_PARAMS):
+                batch = event_ids[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ','.join('?' * len(batch))
+                self.conn.execute(f"DELETE FROM sent_events WHERE event_id IN ({placeholders})", batch)
+            self.conn.commit()
+
+    def count(self):
+        """Return the number of events in the index."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sent_events").fetchone()[0]
+
+    def clear(self):
+        """Forget every recorded event."""
+        with self.lock:
+            self.conn.execute("DELETE FROM sent_events")
+            self.conn.commit()
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            self.conn.close()
+
+
+class Outbox:
+    """Durable SQLite journal of every event handed to the sender.
+
+    Events are enqueued (durably) before their request is sent; results are
+    buffered and written in batches. Events left 'pending' (never finished)
+    or 'retry' (transient failure) are resent by a later resume; events the
+    user cancelled are marked 'cancelled' and stay unsent. Anything
+    lost between two flushes is resent too, which the idempotency keys make
+    safe.
+    """
+
+    def __init__(self, path=OUTBOX_DB_FILE, flush_rows=OUTBOX_FLUSH_ROWS, flush_seconds=OUTBOX_FLUSH_SECONDS):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL,"
+            " source TEXT,"
+            " created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " batch_id INTEGER NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " status_code INTEGER,"
+            " response TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+            " PRIMARY KEY (batch_id, idx))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS outbox_status ON outbox (batch_id, status)")
+        self.conn.commit()
+
+    def create_batch(self, url, source=None):
+        """Start a new batch and return its id."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO batches (url, source) VALUES (?, ?)", (url, source)
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def enqueue(self, batch_id, items):
+        """Durably record (index, event) pairs as pending, in one commit."""
+        rows = [
+            (batch_id, idx, json_dumps(event))
+            for idx, event in items
+        ]
+        if not rows:
+            return
+        with self.lock:
+            # Resumed events are already in the journal
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (batch_id, idx, payload) VALUES (?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def record(self, batch_id, entries):
+        """Buffer send results; written once enough rows or time have accumulated."""
+        with self.lock:
+            for entry in entries:
+                body = entry.get('body')
+                self.buffer.append((
+                    entry_status(entry),
+                    entry.get('status_code'),
+                    json_dumps(body) if body is not None else None,
+                    entry.get('attempts', 0),
+                    batch_id,
+                    entry['index'],
+                ))
+            due = (len(self.buffer) >= self.flush_rows
+                   or time.monotonic() - self.last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered results to disk."""
+        with self.lock:
+            rows, self.buffer = self.buffer, []
+            self.last_flush = time.monotonic()
+            if not rows:
+                return
+            self.conn.executemany(
+                "UPDATE outbox SET status = ?, status_code = ?, response = ?,"
+                " attempts = attempts + ?, updated_at = CURRENT_TIMESTAMP"
+                " WHERE batch_id = ? AND idx = ?",
+                rows
+            )
+            self.conn.commit()
+
+    def cancel_pending(self, batch_id):
+        """Mark the events of a batch still pending as cancelled; return their number."""
+        self.flush()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP"
+                " WHERE batch_id = ? AND status = 'pending'",
+                (batch_id,)
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def unfinished_batches(self):
+        """Return [{'id', 'url', 'source', 'created_at', 'queued'}] for batches with queued events."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT b.id, b.url, b.source, b.created_at, COUNT(*)"
+                " FROM batches b JOIN outbox o ON o.batch_id = b.id"
+                " WHERE o.status IN ('pending', 'retry')"
+                " GROUP BY b.id ORDER BY b.id"
+            ).fetchall()
+        return [
+            {'id': row[0], 'url': row[1], 'source': row[2], 'created_at': row[3], 'queued': row[4]}
+            for row in rows
+        ]
+
+    def iter_queued(self, batch_id, page_size=OUTBOX_PAGE_SIZE):
+        """Yield (index, event) pairs still to send, reading one page at a time."""
+        last_idx = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT idx, payload FROM outbox"
+                    " WHERE batch_id = ? AND status IN ('pending', 'retry') AND idx > ?"
+                    " ORDER BY idx LIMIT ?",
+                    (batch_id, last_idx, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for idx, payload in rows:
+                yield idx, json_loads(payload)
+            last_idx = rows[-1][0]
+
+    def latest_batch_id(self):
+        """Return the id of the most recent batch, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(id) FROM batches").fetchone()
+        return row[0]
+
+    def sent_events(self, batch_id, indexes=None):
+        """Return [(index, event, eventId), ...] for events of a batch the Web App accepted.
+
+        Only creates and updates are returned (deleted events have no event
+        left to edit); indexes restricts the result to those positions.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT idx, payload, response FROM outbox"
+                " WHERE batch_id = ? AND status = 'sent' ORDER BY idx",
+                (batch_id,)
+            ).fetchall()
+        wanted = set(indexes) if indexes is not None else None
+        found = []
+        for idx, payload, response in rows:
+            if wanted is not None and idx not in wanted:
+                continue
+            event = json_loads(payload)
+            body = json_loads(response) if response else None
+            event_id = body.get('eventId') if isinstance(body, dict) else None
+            if event_id and isinstance(event, dict) and event.get('action') != 'delete':
+                found.append((idx, event, event_id))
+        return found
+
+    def purge_finished(self, days=OUTBOX_KEEP_DAYS):
+        """Delete batches with nothing left to send that are older than days."""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM batches WHERE created_at < datetime('now', ?)"
+                " AND id NOT IN (SELECT batch_id FROM outbox WHERE status IN ('pending', 'retry'))",
+                (f'-{days} days',)
+            )
+            self.conn.execute("DELETE FROM outbox WHERE batch_id NOT IN (SELECT id FROM batches)")
+            self.conn.commit()
+
+    def close(self):
+        """Flush and close the database."""
+        self.flush()
+        with self.lock:
+            self.conn.close()
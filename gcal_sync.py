@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Read-back sync
+Reads the events already in the calendar for the time range of a batch
+(doGet with start/end) and classifies each event to send as create,
+update or unchanged, so only creates and updates are written. Explicit
+updates and deletes (events with an 'action') are sent as they are.
+"""
+
+import logging
+
+from gcal_events import check_event, parse_datetime
+from gcal_json import loads as json_loads
+from gcal_sender import DEFAULT_CALENDAR, skipped_entry
+from gcal_store import event_key
+
+SYNC_TIMEOUT = 60
+CREATE = 'create'
+UPDATE = 'update'
+UNCHANGED = 'unchanged'
+DELETE = 'delete'
+COMPARED_FIELDS = ('title', 'description', 'location')
+
+
+def event_range(events):
+    """Return (earliest start, latest end) of the valid events as ISO strings, or None."""
+    earliest = latest = None
+    for event in events:
+        errors, start, end = check_event(event)
+        if errors or start is None:
+            continue
+        start_dt = parse_datetime(start)
+        end_dt = parse_datetime(end)
+        if earliest is None or start_dt < earliest:
+            earliest = start_dt
+        if latest is None or end_dt > latest:
+            latest = end_dt
+    if earliest is None:
+        return None
+    return earliest.isoformat(), latest.isoformat()
+
+
+def fetch_existing_events(session, url, start, end, calendar_id=None, timeout=SYNC_TIMEOUT):
+    """Return the calendar events overlapping [start, end) as read by doGet.
+
+    Raises ValueError when the Web App does not support range queries.
+    """
+    logging.info(f"Reading existing events of {calendar_id or DEFAULT_CALENDAR} from {start} to {end}")
+    params = {'start': start, 'end': end}
+    if calendar_id and calendar_id != DEFAULT_CALENDAR:
+        params['calendarId'] = calendar_id
+    response = session.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    try:
+        body = json_loads(response.content)
+    except ValueError:
+        raise ValueError("Web App does not support range queries (update google-apps-script.gs)")
+    if not isinstance(body, dict) or body.get('status') != 'ok' or not isinstance(body.get('events'), list):
+        message = body.get('message') if isinstance(body, dict) else None
+        raise ValueError(f"Range query failed: {message or body!r}")
+    return body['events']
+
+
+def _instant(value):
+    """Return the aware datetime of an ISO string, or None."""
+    try:
+        return parse_datetime(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _same_content(event, start, end, existing):
+    """Return True when an existing calendar event already matches the event."""
+    for field in COMPARED_FIELDS:
+        if (event.get(field) or '') != (existing.get(field) or ''):
+            return False
+    return _instant(existing.get('start')) == start and _instant(existing.get('end')) == end
+
+
+def diff_events(events, existing):
+    """Classify events against the calendar and return [(index, action, payload), ...].
+
+    An event matches an existing one by its 'eventId', its idempotency key
+    or, failing that (except for series), by title and start time (each calendar event is
+    matched at most once). Matches with the same title, times, description
+    and location are unchanged; other matches become updates carrying the
+    eventId. Invalid events are returned as creates so the send reports
+    them; explicit updates and deletes keep their action.
+    """
+    by_id = {}
+    by_key = {}
+    by_title_start = {}
+    for item in existing:
+        if not isinstance(item, dict) or not item.get('eventId'):
+            continue
+        by_id[item['eventId']] = item
+        if item.get('idempotencyKey'):
+            by_key[item['idempotencyKey']] = item
+        start = _instant(item.get('start'))
+        by_title_start.setdefault((item.get('title'), start), []).append(item)
+
+    matched = set()
+    plan = []
+    for idx, event in enumerate(events, start=1):
+        errors, start, end = check_event(event)
+        if errors:
+            plan.append((idx, CREATE, event))
+            continue
+        action = event.get('action', CREATE)
+        if action != CREATE:
+            if event.get('eventId') in by_id:
+                matched.add(event['eventId'])
+            plan.append((idx, action, event))
+            continue
+        start_dt, end_dt = parse_datetime(start), parse_datetime(end)
+
+        candidates = []
+        if event.get('eventId') in by_id:
+            candidates.append(by_id[event['eventId']])
+        key = event.get('idempotencyKey') or event_key(dict(event, start=start, end=end))
+        if key in by_key:
+            candidates.append(by_key[key])
+        recurring = event.get('recurrence') is not None
+        if not recurring:
+            candidates += by_title_start.get((event.get('title'), start_dt), [])
+        match = next((item for item in candidates if item['eventId'] not in matched), None)
+
+        if match is None:
+            plan.append((idx, CREATE, event))
+            continue
+        matched.add(match['eventId'])
+        if recurring:
+            # Occurrences cannot be compared one by one: the key covers the series
+            if match.get('idempotencyKey') == key:
+                plan.append((idx, UNCHANGED, dict(event, eventId=match['eventId'])))
+            else:
+                plan.append((idx, UPDATE, dict(event, action=UPDATE, eventId=match['eventId'])))
+            continue
+        if _same_content(event, start_dt, end_dt, match):
+            plan.append((idx, UNCHANGED, dict(event, eventId=match['eventId'])))
+        else:
+            # Updates are partial: clear description and location explicitly
+            plan.append((idx, UPDATE, dict(
+                event,
+                action=UPDATE,
+                eventId=match['eventId'],
+                description=event.get('description') or '',
+                location=event.get('location') or ''
+            )))
+    return plan
+
+
+def plan_sync(session, url, events, calendar_id=None, indexed=False):
+    """Read the calendars and diff events (or (index, event) pairs when indexed) against them.
+
+    Returns (to_send, settled, counts): to_send holds (index, payload)
+    pairs for creates, updates and deletes (send them with indexed=True), settled
+    holds skipped result entries for unchanged events (pass them to
+    send_events as settled), counts maps each action to its number of events.
+    Events are compared with their own 'calendarId', or calendar_id; each
+    calendar is read once.
+    """
+    counts = {CREATE: 0, UPDATE: 0, DELETE: 0, UNCHANGED: 0}
+    by_calendar = {}
+    for idx, event in (events if indexed else enumerate(events, start=1)):
+        calendar = DEFAULT_CALENDAR
+        if isinstance(event, dict):
+            calendar = event.get('calendarId') or calendar_id or DEFAULT_CALENDAR
+            if calendar != DEFAULT_CALENDAR and not event.get('calendarId'):
+                # Same payload (and idempotency key) as send_events would build
+                event = dict(event, calendarId=calendar)
+        by_calendar.setdefault(calendar, []).append((idx, event))
+
+    to_send = []
+    settled = []
+    for calendar, members in by_calendar.items():
+        calendar_events = [event for _, event in members]
+        time_range = event_range(calendar_events)
+        existing = fetch_existing_events(session, url, *time_range, calendar_id=calendar) if time_range else []
+        for (idx, _), (_, action, payload) in zip(members, diff_events(calendar_events, existing)):
+            counts[action] += 1
+            if action == UNCHANGED:
+                settled.append(skipped_entry(idx, payload['eventId'], 'unchanged in calendar'))
+            else:
+                to_send.append((idx, payload))
+    to_send.sort(key=lambda item: item[0])
+    return to_send, settled, counts
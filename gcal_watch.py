@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Calendar GUI - Watched folder ingestion
+Waits for event files (JSON, JSON Lines, CSV, iCalendar) to appear in an
+inbox folder and hands each one to a callback once it has stopped
+changing. On Linux the folder is watched with inotify; elsewhere, or when
+inotify is unavailable, it is polled. Files are processed one at a time
+in the calling process:
+
+    python gcal_cli.py watch inbox/
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import math
+import os
+import select
+import shutil
+import struct
+import sys
+import time
+
+WATCH_EXTENSIONS = ('.json', '.jsonl', '.ndjson', '.csv', '.tsv', '.ics', '.ical', '.icalendar')
+IGNORED_SUFFIXES = ('.tmp', '.part', '.crdownload', '~')
+DEFAULT_DEBOUNCE = 2.0  # seconds a file must stay unchanged before it is read
+DEFAULT_POLL_INTERVAL = 5.0  # seconds between scans without inotify (and between safety scans with it)
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_READ_SIZE = 64 * 1024
+
+
+def clamp_debounce(value):
+    """Return a debounce time in seconds (DEFAULT_DEBOUNCE when value is not a number)."""
+    try:
+        debounce = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_DEBOUNCE
+    if not math.isfinite(debounce):
+        return DEFAULT_DEBOUNCE
+    return max(0.0, debounce)
+
+
+def is_event_file(name):
+    """Return True for names the watcher picks up (hidden and partial files are skipped)."""
+    lower = name.lower()
+    if name.startswith('.') or lower.endswith(IGNORED_SUFFIXES):
+        return False
+    return lower.endswith(WATCH_EXTENSIONS)
+
+
+def unique_path(folder, name):
+    """Return a path for name in folder that does not exist yet."""
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        return path
+    stem, ext = os.path.splitext(name)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    counter = 1
+    while True:
+        path = os.path.join(folder, f"{stem}.{stamp}-{counter}{ext}")
+        if not os.path.exists(path):
+            return path
+        counter += 1
+
+
+def move_with_report(path, folder, reports):
+    """Move a processed file and its report files into folder; return the new file path.
+
+    reports are paths whose names start with a dot and end with the
+    report suffix ('.<name>.results.jsonl'); they are renamed after the
+    file's new name.
+    """
+    os.makedirs(folder, exist_ok=True)
+    target = unique_path(folder, os.path.basename(path))
+    shutil.move(path, target)
+    prefix = '.' + os.path.basename(path)
+    for report in reports:
+        if os.path.exists(report):
+            suffix = os.path.basename(report)[len(prefix):]
+            shutil.move(report, target + suffix)
+    return target
+
+
+class InotifyWatch:
+    """Wakes up on writes to a folder (Linux). Raises OSError where unsupported."""
+
+    def __init__(self, folder):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # No IN_MODIFY: a file being written is followed through its mtime instead
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds; return the names that changed (may be empty)."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + 16 <= len(data):
+            _, _, _, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            names.add(os.fsdecode(name))
+            offset += 16 + length
+        return names
+
+    def close(self):
+        """Stop watching."""
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Reports event files in a folder once they have been unchanged for debounce seconds.
+
+    Every file is reported once per appearance: moving it away and back
+    (or replacing it) makes it new again.
+    """
+
+    def __init__(self, folder, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True):
+        self.folder = folder
+        self.debounce = clamp_debounce(debounce)
+        self.poll_interval = max(0.1, poll_interval)
+        self.seen = {}  # name -> (size, mtime_ns) already reported
+        self.notifier = None
+        if use_inotify:
+            try:
+                self.notifier = InotifyWatch(folder)
+            except (OSError, AttributeError) as e:
+                logging.info(f"inotify unavailable ({e}), polling {folder} every {self.poll_interval:.0f}s")
+
+    @property
+    def mode(self):
+        """'inotify' or 'polling'."""
+        return 'inotify' if self.notifier is not None else 'polling'
+
+    def scan(self):
+        """Return (ready paths oldest first, seconds until the next pending file settles or None)."""
+        now = time.time()
+        ready = []
+        next_due = None
+        present = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not is_event_file(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue  # removed while scanning
+                present.add(entry.name)
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self.seen.get(entry.name) == signature:
+                    continue
+                age = now - stat.st_mtime
+                if age >= self.debounce:
+                    ready.append((stat.st_mtime, entry.path, entry.name, signature))
+                else:
+                    remaining = self.debounce - age
+                    next_due = remaining if next_due is None else min(next_due, remaining)
+        # Forget files that left the folder so they are picked up if they come back
+        for name in set(self.seen) - present:
+            del self.seen[name]
+        ready.sort()
+        for _, _, name, signature in ready:
+            self.seen[name] = signature
+        return [item[1] for item in ready], next_due
+
+    def wait(self, next_due, stop_event):
+        """Sleep until a change, the next file settles, a safety scan is due or stop_event is set."""
+        timeout = self.poll_interval if next_due is None else min(self.poll_interval, next_due + 0.05)
+        if self.notifier is None:
+            stop_event.wait(timeout)
+            return
+        # Wake up regularly so a stop request is seen promptly
+        deadline = time.monotonic() + timeout
+        while not stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Report files written next to the inbox files do not count
+            if any(is_event_file(name) for name in self.notifier.wait(min(remaining, 0.5))):
+                return
+
+    def close(self):
+        """Stop watching."""
+        if self.notifier is not None:
+            self.notifier.close()
+            self.notifier = None
+
+
+def watch_folder(folder, process, stop_event, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL,
+                 once=False, use_inotify=True):
+    """Call process(path) for each event file that settles in folder until stop_event is set.
+
+    With once, files already in the folder are processed (waiting for
+    those still being written) and the function returns. Returns the
+    number of files processed.
+    """
+    watcher = FolderWatcher(folder, debounce, poll_interval, use_inotify)
+    logging.info(f"Watching {folder} ({watcher.mode})")
+    processed = 0
+    try:
+        while not stop_event.is_set():
+            ready, next_due = watcher.scan()
+            for path in ready:
+                if stop_event.is_set():
+                    break
+                process(path)
+                processed += 1
+            if once and not ready and next_due is None:
+                break
+            if not ready:
+                watcher.wait(next_due, stop_event)
+    finally:
+        watcher.close()
+    return processed
@@ -1,32 +1,297 @@
+const IDEMPOTENCY_TAG = "idempotencyKey";
+const IDEMPOTENCY_CACHE_SECONDS = 21600;  // CacheService maximum (6 hours)
+const CAPABILITIES = ["gzip", "minimal"];  // optional request features, see doGet
+const RRULE_WEEKDAYS = {
+  MO: "MONDAY", TU: "TUESDAY", WE: "WEDNESDAY", TH: "THURSDAY",
+  FR: "FRIDAY", SA: "SATURDAY", SU: "SUNDAY"
+};
+
 function doPost(e) {
   try {
-    // Read request body (assuming it comes in JSON)
-    const data = JSON.parse(e.postData.contents);
+    // Read request body (JSON, or gzipped JSON wrapped as { "gzip": base64 })
+    const data = readRequest(e);
 
-    // Get calendar (uses your calendarId if not default)
-    const cal = CalendarApp.getDefaultCalendar();
+    // Each calendar is looked up once per request, then reused
+    const calendars = {};
 
-    // Create event
-    const start = new Date(data.start);  // ISO format: "2025-10-05T10:00:00Z"
-    const end = new Date(data.end);
-    const event = cal.createEvent(data.title, start, end, {
-      description: data.description || "",
-      location: data.location || ""
-    });
+    // Bulk request: { "events": [ ... ] } -> one result per event, same order
+    if (Array.isArray(data.events)) {
+      const results = data.events.map(function (item) {
+        try {
+          return handleEvent(getCalendar(calendars, item.calendarId), item);
+        } catch (err) {
+          return { status: "error", message: err.message };
+        }
+      });
+      if (data.response === "minimal") {
+        // Only [index, eventId] (or [index, null, message]) per event
+        return jsonOutput({ status: "ok", ids: results.map(minimalResult) });
+      }
+      return jsonOutput({ status: "ok", results: results });
+    }
 
-    // Response for caller
-    return ContentService.createTextOutput(
-      JSON.stringify({ status: "ok", eventId: event.getId() })
-    ).setMimeType(ContentService.MimeType.JSON);
+    // Single event; response for caller
+    return jsonOutput(handleEvent(getCalendar(calendars, data.calendarId), data));
 
   } catch (err) {
-    return ContentService.createTextOutput(
-      JSON.stringify({ status: "error", message: err.message })
-    ).setMimeType(ContentService.MimeType.JSON);
+    return jsonOutput({ status: "error", message: err.message });
+  }
+}
+
+function readRequest(e) {
+  const data = JSON.parse(e.postData.contents);
+  if (typeof data.gzip === "string") {
+    const blob = Utilities.newBlob(Utilities.base64Decode(data.gzip), "application/x-gzip");
+    return JSON.parse(Utilities.ungzip(blob).getDataAsString("UTF-8"));
+  }
+  return data;
+}
+
+function minimalResult(result, index) {
+  if (result.status === "ok") {
+    return [index, result.eventId];
+  }
+  return [index, null, result.message || result.status];
+}
+
+function getCalendar(calendars, calendarId) {
+  // "primary" or no calendarId: the default calendar of the script owner
+  const id = calendarId || "primary";
+  if (!(id in calendars)) {
+    calendars[id] = id === "primary" ? CalendarApp.getDefaultCalendar() : CalendarApp.getCalendarById(id);
+  }
+  if (!calendars[id]) {
+    throw new Error("Calendar not found: " + id);
+  }
+  return calendars[id];
+}
+
+function handleEvent(cal, data) {
+  // "action": "update" / "delete" act on the event with the given eventId
+  if (data.action === "update") {
+    return updateEventFromData(cal, data);
+  }
+  if (data.action === "delete") {
+    return deleteEventFromData(cal, data);
+  }
+  return createOrFindEvent(cal, data);
+}
+
+function createOrFindEvent(cal, data) {
+  // Retried requests carry the same idempotencyKey: return the existing event
+  const key = data.idempotencyKey;
+  if (key) {
+    const existing = findEventByKey(cal, key, data);
+    if (existing) {
+      return { status: "ok", eventId: existing.getId(), duplicate: true };
+    }
+  }
+
+  const event = createEventFromData(cal, data);
+  if (key) {
+    event.setTag(IDEMPOTENCY_TAG, key);
+    CacheService.getScriptCache().put("idem:" + key, event.getId(), IDEMPOTENCY_CACHE_SECONDS);
+  }
+  return { status: "ok", eventId: event.getId() };
+}
+
+function findEventByKey(cal, key, data) {
+  // Fast path: recently created events are cached by key
+  const cachedId = CacheService.getScriptCache().get("idem:" + key);
+  if (cachedId) {
+    const cached = cal.getEventById(cachedId);
+    if (cached) {
+      return cached;
+    }
+  }
+
+  // Slow path: look for the tag among events in the same time range
+  const start = eventStart(data);
+  const end = eventEnd(data);
+  if (isNaN(start.getTime()) || isNaN(end.getTime())) {
+    return null;
+  }
+  const candidates = cal.getEvents(start, end);
+  for (let i = 0; i < candidates.length; i++) {
+    if (candidates[i].getTag(IDEMPOTENCY_TAG) === key) {
+      return candidates[i];
+    }
+  }
+  return null;
+}
+
+function allDayDate(value) {
+  // "YYYY-MM-DD" as midnight in the script's time zone
+  const parts = String(value).split("-");
+  return new Date(Number(parts[0]), Number(parts[1]) - 1, Number(parts[2]));
+}
+
+function eventStart(data) {
+  return data.allDay ? allDayDate(data.start) : new Date(data.start);
+}
+
+function eventEnd(data) {
+  return data.allDay ? allDayDate(data.end) : new Date(data.end);
+}
+
+function createEventFromData(cal, data) {
+  // Create event
+  const start = eventStart(data);  // ISO format: "2025-10-05T10:00:00Z", or "2025-10-05" when allDay
+  const end = eventEnd(data);
+  const options = {
+    description: data.description || "",
+    location: data.location || ""
+  };
+  // "allDay": true takes dates; the end date is exclusive, as in iCalendar
+  if (data.allDay) {
+    if (data.recurrence) {
+      return cal.createAllDayEventSeries(data.title, start, buildRecurrence(data.recurrence, data.timeZone), options);
+    }
+    return cal.createAllDayEvent(data.title, start, end, options);
+  }
+  // "recurrence": "RRULE:..." creates one series instead of a single event
+  if (data.recurrence) {
+    return cal.createEventSeries(data.title, start, end, buildRecurrence(data.recurrence, data.timeZone), options);
   }
+  return cal.createEvent(data.title, start, end, options);
 }
 
-function doGet() {
-  return ContentService.createTextOutput("OK");
+function buildRecurrence(rrule, timeZone) {
+  // Supported subset: FREQ, INTERVAL, COUNT or UNTIL, BYDAY (weekly)
+  const parts = {};
+  String(rrule).replace(/^RRULE:/i, "").split(";").forEach(function (part) {
+    const pair = part.split("=");
+    parts[pair[0].trim().toUpperCase()] = (pair[1] || "").trim().toUpperCase();
+  });
+  const recurrence = CalendarApp.newRecurrence();
+  let rule;
+  switch (parts.FREQ) {
+    case "DAILY": rule = recurrence.addDailyRule(); break;
+    case "WEEKLY": rule = recurrence.addWeeklyRule(); break;
+    case "MONTHLY": rule = recurrence.addMonthlyRule(); break;
+    case "YEARLY": rule = recurrence.addYearlyRule(); break;
+    default: throw new Error("Unsupported recurrence: " + rrule);
+  }
+  if (parts.INTERVAL) {
+    rule = rule.interval(Number(parts.INTERVAL));
+  }
+  if (parts.BYDAY) {
+    rule = rule.onlyOnWeekdays(parts.BYDAY.split(",").map(function (day) {
+      return CalendarApp.Weekday[RRULE_WEEKDAYS[day]];
+    }));
+  }
+  if (parts.COUNT) {
+    rule.times(Number(parts.COUNT));
+  } else if (parts.UNTIL) {
+    const u = parts.UNTIL;
+    rule.until(new Date(Date.UTC(
+      Number(u.substr(0, 4)), Number(u.substr(4, 2)) - 1, Number(u.substr(6, 2)),
+      Number(u.substr(9, 2) || 0), Number(u.substr(11, 2) || 0), Number(u.substr(13, 2) || 0)
+    )));
+  }
+  if (timeZone) {
+    recurrence.setTimeZone(timeZone);
+  }
+  return recurrence;
 }
 
+function updateEventFromData(cal, data) {
+  // A series is updated as a whole; its times change through its recurrence
+  const event = !data.eventId ? null
+    : data.recurrence ? cal.getEventSeriesById(data.eventId)
+    : cal.getEventById(data.eventId);
+  if (!event) {
+    return { status: "error", message: "Event not found: " + data.eventId };
+  }
+  // Only the fields present in the request change
+  if (data.title) {
+    event.setTitle(data.title);
+  }
+  if (data.recurrence) {
+    if (data.start && data.end) {
+      const recurrence = buildRecurrence(data.recurrence, data.timeZone);
+      if (data.allDay) {
+        event.setRecurrence(recurrence, eventStart(data));
+      } else {
+        event.setRecurrence(recurrence, eventStart(data), eventEnd(data));
+      }
+    }
+  } else if (data.start && data.end) {
+    if (data.allDay) {
+      event.setAllDayDates(eventStart(data), eventEnd(data));
+    } else {
+      event.setTime(eventStart(data), eventEnd(data));
+    }
+  }
+  if (data.description !== undefined) {
+    event.setDescription(data.description || "");
+  }
+  if (data.location !== undefined) {
+    event.setLocation(data.location || "");
+  }
+  return { status: "ok", eventId: event.getId(), updated: true };
+}
+
+function deleteEventFromData(cal, data) {
+  if (!data.eventId) {
+    return { status: "error", message: "Missing eventId" };
+  }
+  // A single event is a series of one, so this also removes whole series
+  const series = cal.getEventSeriesById(data.eventId);
+  // Already gone (e.g. a retried delete): nothing to do
+  if (!series) {
+    return { status: "ok", eventId: data.eventId, deleted: false };
+  }
+  const key = series.getTag(IDEMPOTENCY_TAG);
+  series.deleteEventSeries();
+  if (key) {
+    CacheService.getScriptCache().remove("idem:" + key);
+  }
+  return { status: "ok", eventId: data.eventId, deleted: true };
+}
+
+function eventToJson(event) {
+  return {
+    eventId: event.getId(),
+    title: event.getTitle(),
+    start: event.getStartTime().toISOString(),
+    end: event.getEndTime().toISOString(),
+    description: event.getDescription(),
+    location: event.getLocation(),
+    allDay: event.isAllDayEvent(),
+    idempotencyKey: event.getTag(IDEMPOTENCY_TAG)
+  };
+}
+
+function jsonOutput(payload) {
+  return ContentService.createTextOutput(
+    JSON.stringify(payload)
+  ).setMimeType(ContentService.MimeType.JSON);
+}
+
+function doGet(e) {
+  const params = (e && e.parameter) || {};
+
+  // Optional features the client may use with this deployment
+  if (params.capabilities) {
+    return jsonOutput({ status: "ok", capabilities: CAPABILITIES });
+  }
+
+  // Health check (no range): plain "OK"
+  if (!params.start || !params.end) {
+    return ContentService.createTextOutput("OK");
+  }
+
+  // Range query: events overlapping [start, end), for the client-side diff
+  try {
+    const start = new Date(params.start);
+    const end = new Date(params.end);
+    if (isNaN(start.getTime()) || isNaN(end.getTime())) {
+      return jsonOutput({ status: "error", message: "Invalid 'start' or 'end'" });
+    }
+    const cal = getCalendar({}, params.calendarId);
+    return jsonOutput({ status: "ok", events: cal.getEvents(start, end).map(eventToJson) });
+  } catch (err) {
+    return jsonOutput({ status: "error", message: err.message });
+  }
+}